@@ -1,309 +1,479 @@
 # agents.py
 import os
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
-import re
+import asyncio
+import contextlib
+import random
+import time
+import functools
 import logging
 import traceback
+from json_repair import repair_json
+from schemas import SchemaError, check as check_schema
+from fake_model import FakeModel
+import metrics
+
+# google.generativeai, python-dotenv 등 불러오는 데 오래 걸리는 패키지는
+# 모델을 실제로 사용하는 시점에 불러옵니다. (report, enqueue 등 DB만 쓰는 명령의 시작 시간 단축)
+
+# 오류 로그 파일
+LOG_FILE = 'easytool_errors.log'
 
-# 로깅 설정
-logging.basicConfig(
-    filename='easytool_errors.log',
-    level=logging.ERROR,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger('easytool')
 
-# .env 파일에서 환경 변수를 로드하고 기존 환경 변수를 덮어씁니다.
-load_dotenv(override=True)
-API_KEY = os.getenv("GOOGLE_API_KEY")
+# 기본으로 사용하는 Gemini 모델
+DEFAULT_MODEL_NAME = 'gemini-2.5-flash'
+
+# 선택할 수 있는 모델 제공자 (fake: API 키 없이 동작하는 FakeModel)
+MODEL_PROVIDERS = ('gemini', 'fake')
+
+# API 호출 속도 제한 기본값 (Gemini 2.5 Flash 무료 등급 기준)
+DEFAULT_REQUESTS_PER_MINUTE = 10
+DEFAULT_TOKENS_PER_MINUTE = 250000
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_TIMEOUT_SECONDS = 180
+DEFAULT_MAX_RETRIES = 5
 
 class PipelineError(Exception):
     """파이프라인 실행 중 오류 발생 시 사용할 사용자 정의 예외"""
     pass
 
-def setup_gemini():
+def configure_logging(filename=LOG_FILE):
+    """오류 로그를 파일에 기록하도록 설정합니다. (프로그램 진입점에서 한 번 호출)"""
+    logging.basicConfig(
+        filename=filename,
+        level=logging.ERROR,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+@functools.lru_cache(maxsize=None)
+def retryable_errors():
+    """잠시 후 다시 시도하면 성공할 수 있는 오류 (할당량 초과, 일시적 서버 오류, 시간 초과)"""
+    from google.api_core import exceptions as google_exceptions
+    return (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+        asyncio.TimeoutError,
+    )
+
+def load_api_key():
+    """.env 파일에서 환경 변수를 로드하고(기존 환경 변수를 덮어씀) Gemini API 키를 반환합니다."""
+    from dotenv import load_dotenv
+    load_dotenv(override=True)
+    return os.getenv("GOOGLE_API_KEY")
+
+def setup_gemini(model_name=DEFAULT_MODEL_NAME):
     """Gemini API 클라이언트를 설정하고 모델을 반환합니다."""
     try:
-        genai.configure(api_key=API_KEY)
+        import google.generativeai as genai
+        genai.configure(api_key=load_api_key())
         # 사용하시는 환경에 맞춰 모델명을 확인해주세요.
-        return genai.GenerativeModel('gemini-2.5-flash')
+        return genai.GenerativeModel(model_name)
     except Exception as e:
         logger.error(f"Gemini 설정 오류: {str(e)}", exc_info=True)
         raise PipelineError(f"❌ Gemini 설정 오류: {e}")
 
-def sanitize_json_string(json_str):
+def setup_model(provider='gemini', model_name=None, **fake_options):
+    """
+    선택한 제공자의 모델을 만들어 반환합니다.
+    파이프라인은 generate_content(prompt, generation_config)와
+    generate_content_async(prompt, generation_config, stream)만 사용하므로, 이 두 메서드를 가진 객체면 됩니다.
+    'fake'는 fake_options(latency, error_rate 등)로 FakeModel을 만듭니다.
     """
-    JSON 문자열에서 제어 문자와 유효하지 않은 문자를 제거하여 유효한 JSON 문자열로 변환합니다.
+    if provider == 'gemini':
+        return setup_gemini(model_name or DEFAULT_MODEL_NAME)
+    if provider == 'fake':
+        return FakeModel(**fake_options)
+    raise PipelineError(f"지원하지 않는 모델 제공자입니다: {provider} (지원: {', '.join(MODEL_PROVIDERS)})")
+
+def estimate_tokens(text):
+    """API 호출 전 토큰 수를 대략적으로 추정합니다. (문자 3개당 1토큰)"""
+    return max(1, len(text) // 3)
+
+class TokenBucket:
+    """
+    asyncio용 토큰 버킷 속도 제한기.
+    분당 rate_per_minute 만큼 토큰이 채워지며, 최대 capacity까지 모아 둘 수 있습니다.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = None
+        self._loop = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    async def acquire(self, amount=1):
+        """토큰이 충분히 채워질 때까지 기다린 뒤 amount만큼 사용합니다."""
+        # 한 번에 capacity보다 많이 요청하면 영원히 기다리게 되므로 상한을 둡니다.
+        amount = min(amount, self.capacity)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate_per_second)
+
+    def consume(self, amount):
+        """기다리지 않고 토큰을 사용합니다. 잔량이 음수가 되면 이후 요청이 그만큼 늦춰집니다."""
+        self._refill()
+        self.tokens -= amount
+
+class RateLimitedModel:
+    """
+    Gemini 모델을 감싸 요청 수/토큰 수 속도 제한, 동시 실행 수 제한,
+    재시도 가능한 오류에 대한 지수 백오프(지터 포함), 호출별 시간 제한을 적용합니다.
+    requests_per_minute/tokens_per_minute가 None이면 해당 속도 제한을 적용하지 않습니다. (예: fake 모델)
+    감싸지 않은 속성(model_name, generate_content 등)은 원래 모델로 위임합니다.
+    """
+
+    def __init__(self, model, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 timeout=DEFAULT_TIMEOUT_SECONDS, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=2.0, backoff_max=60.0):
+        self._model = model
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = None
+        self._loop = None
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def _get_semaphore(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore, self._loop = asyncio.Semaphore(self.max_in_flight), loop
+        return self._semaphore
+
+    def backoff_delay(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (full jitter 지수 백오프)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _acquire(self, estimated_tokens):
+        """요청 1회와 추정 토큰 수만큼 속도 제한 버킷에서 기다렸다가 사용합니다."""
+        if self.request_bucket:
+            await self.request_bucket.acquire(1)
+        if self.token_bucket:
+            await self.token_bucket.acquire(estimated_tokens)
+
+    def _settle_usage(self, response, estimated_tokens):
+        """실제 사용량이 추정치보다 많으면 차이만큼 토큰 버킷에서 추가로 차감합니다."""
+        usage = getattr(response, 'usage_metadata', None)
+        total_tokens = getattr(usage, 'total_token_count', 0) or 0
+        if self.token_bucket and total_tokens > estimated_tokens:
+            self.token_bucket.consume(total_tokens - estimated_tokens)
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        estimated_tokens = estimate_tokens(prompt)
+        semaphore = self._get_semaphore()
+        attempt = 0
+        while True:
+            await self._acquire(estimated_tokens)
+            try:
+                async with semaphore:
+                    response = await asyncio.wait_for(
+                        generate_content_async(self._model, prompt, generation_config=generation_config),
+                        self.timeout
+                    )
+            except retryable_errors() as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                attempt += 1
+                metrics.record_retry()
+                logger.warning(f"재시도 가능한 오류 발생, {delay:.1f}초 후 재시도합니다 ({attempt}/{self.max_retries}): {e!r}")
+                await asyncio.sleep(delay)
+                continue
+            self._settle_usage(response, estimated_tokens)
+            return response
+
+    async def stream_content_async(self, prompt, generation_config=None):
+        """
+        응답을 조각(chunk) 단위 텍스트로 넘겨주는 비동기 제너레이터입니다.
+        첫 조각을 받기 전의 재시도 가능한 오류만 재시도하며, 시간 제한은 조각 사이의 대기 시간에 적용됩니다.
+        """
+        estimated_tokens = estimate_tokens(prompt)
+        semaphore = self._get_semaphore()
+        attempt = 0
+        while True:
+            await self._acquire(estimated_tokens)
+            async with semaphore:
+                chunks = stream_content_async(self._model, prompt, generation_config)
+                try:
+                    try:
+                        first_chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                    except StopAsyncIteration:
+                        return
+                    except retryable_errors() as e:
+                        if attempt >= self.max_retries:
+                            raise
+                        delay = self.backoff_delay(attempt)
+                        attempt += 1
+                        metrics.record_retry()
+                        logger.warning(f"재시도 가능한 오류 발생, {delay:.1f}초 후 재시도합니다 ({attempt}/{self.max_retries}): {e!r}")
+                    else:
+                        received = len(first_chunk)
+                        yield first_chunk
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                            except StopAsyncIteration:
+                                break
+                            received += len(chunk)
+                            yield chunk
+                        # 스트리밍 응답은 사용량 메타데이터 대신 받은 텍스트 길이로 정산합니다.
+                        if self.token_bucket:
+                            self.token_bucket.consume(estimate_tokens(' ' * received))
+                        return
+                finally:
+                    # 재시도하거나 중간에 멈출 때 버린 스트림이 연결을 붙잡고 있지 않도록 닫습니다.
+                    await chunks.aclose()
+            await asyncio.sleep(delay)
+
+def parse_json_response(response_text, schema=None):
+    """
+    AI의 JSON 응답을 파싱합니다.
+    그대로 파싱되지 않으면 repair_json으로 한 번에 복구한 뒤 다시 파싱하고,
+    그래도 실패하면 json.JSONDecodeError를 발생시킵니다.
+    schema를 넘기면 파싱한 결과를 검사해, 맞지 않으면 SchemaError를 발생시킵니다.
     """
-    if not json_str:
-        return json_str
-    
-    # 허용된 제어 문자: \b, \t, \n, \f, \r
-    allowed_escapes = ['\b', '\t', '\n', '\f', '\r']
-    
-    # 문자열 내 모든 제어 문자를 처리
-    result = ""
-    i = 0
-    while i < len(json_str):
-        if json_str[i] in ['\b', '\t', '\n', '\f', '\r']:
-            # 허용된 이스케이프 시퀀스는 유지
-            result += json_str[i]
-        elif ord(json_str[i]) < 32 or ord(json_str[i]) == 127:
-            # 기타 제어 문자는 제거
-            pass
-        else:
-            result += json_str[i]
-        i += 1
-    
-    # 특수 케이스: JSON 내 이스케이프되지 않은 제어 문자 처리
-    result = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', result)
-    
-    # 잘못된 이스케이프 시퀀스 수정 (예: \x, \e 등 JSON에서 허용되지 않는 이스케이프)
-    # JSON에서 허용되는 이스케이프 시퀀스: \" \\ \/ \b \f \n \r \t \uXXXX
-    result = re.sub(r'\\([^"\\/' + 'bfnrtu])', r'\1', result)
-    
-    # 유효하지 않은 유니코드 이스케이프 시퀀스 처리
     try:
-        # 이 단계에서 문자열이 유효한지 확인
-        json.loads(result)
+        result = json.loads(response_text)
+    except json.JSONDecodeError:
+        pass
+    else:
+        check_response_schema(result, schema)
+        metrics.record_json_path('strict')
         return result
+
+    repaired_text = repair_json(response_text)
+    try:
+        result = json.loads(repaired_text)
     except json.JSONDecodeError as e:
-        # 로깅: 첫 번째 정리 시도 실패
-        logger.error(f"JSON 정리 첫 번째 시도 실패: {str(e)}")
-        logger.debug(f"문제가 있는 JSON 문자열 샘플: {result[:200]}")
-        
-        # 여전히 문제가 있는 경우, 더 강력한 정리 시도
-        try:
-            # 모든 내용을 문자열로 취급하고 다시 직렬화
-            parsed = json.loads(result.replace('\\"', '"').replace('\\', '\\\\'))
-            return json.dumps(parsed)
-        except Exception as e2:
-            # 로깅: 두 번째 정리 시도 실패
-            logger.error(f"JSON 정리 두 번째 시도 실패: {str(e2)}")
-            
-            # 마지막 시도: 문제가 있는 부분을 모두 제거
-            return re.sub(r'[^\x20-\x7E\t\n\r]', '', result)
-
-def fix_invalid_escapes(json_str):
+        # 로그에 더 자세한 정보 기록 (오류 위치 전후 50자)
+        logger.error(f"JSON 파싱 실패: {e}")
+        logger.error(f"파싱 오류 위치: {e.lineno}행 {e.colno}열 (문자 위치: {e.pos})")
+        logger.error(f"문제 문자 주변 컨텍스트: {repaired_text[max(0, e.pos - 50):e.pos + 50]}")
+        logger.error(f"전체 응답 텍스트 길이: {len(response_text)} 문자")
+        print(f"JSON 파싱 실패: {e}")
+        print(f"원본 텍스트 일부: {response_text[:100]}...")
+        metrics.record_json_path('failed')
+        raise
+    check_response_schema(result, schema)
+    logger.info("JSON 복구 후 파싱 성공")
+    metrics.record_json_path('repaired')
+    return result
+
+def check_response_schema(result, schema):
     """
-    JSON에서 허용되지 않는 이스케이프 시퀀스를 수정합니다.
-    특히 'Invalid escape' 오류를 해결하기 위한 함수입니다.
+    schema가 있으면 결과를 검사하고, 맞지 않으면 기록을 남긴 뒤 SchemaError를 발생시킵니다.
+    스키마 위반 횟수는 JSON 파싱 경로와 따로 세므로 모델 수정으로 복구되어도 보고서에 남습니다.
     """
-    if not json_str:
-        return json_str
-    
-    # JSON에서 허용되는 이스케이프 시퀀스: \" \\ \/ \b \f \n \r \t \uXXXX
-    # 문자열을 순회하며 잘못된 이스케이프 시퀀스를 찾아 수정
-    result = ""
-    i = 0
-    while i < len(json_str):
-        # 백슬래시를 발견한 경우
-        if json_str[i] == '\\' and i + 1 < len(json_str):
-            next_char = json_str[i + 1]
-            # 허용된 이스케이프 시퀀스인 경우
-            if next_char in '"\\/' + 'bfnrtu':
-                result += json_str[i:i+2]  # 백슬래시와 다음 문자 유지
-                i += 2
-            # 유니코드 이스케이프 시퀀스인 경우 (\uXXXX)
-            elif next_char == 'u' and i + 5 < len(json_str):
-                # 4자리 16진수 확인
-                if all(c in '0123456789abcdefABCDEF' for c in json_str[i+2:i+6]):
-                    result += json_str[i:i+6]  # 유효한 유니코드 이스케이프
-                    i += 6
-                else:
-                    # 유효하지 않은 유니코드 이스케이프는 백슬래시 제거
-                    result += json_str[i+1]
-                    i += 2
-            else:
-                # 허용되지 않는 이스케이프 시퀀스는 백슬래시 제거
-                result += next_char
-                i += 2
-        else:
-            result += json_str[i]
-            i += 1
-    
+    if schema is None:
+        return
+    try:
+        check_schema(result, schema)
+    except SchemaError as e:
+        logger.error(f"JSON 스키마 검증 실패: {e}")
+        metrics.record_schema_error()
+        metrics.record_json_path('schema_invalid')
+        raise
+
+def build_json_fix_prompt(response_text, problems=None):
+    """모델에게 깨진 JSON을 다시 정리해 달라고 요청하는 프롬프트를 만듭니다."""
+    details = f"\n    다음 문제도 함께 고쳐주세요: {'; '.join(problems)}\n" if problems else ""
+    return f"""
+    다음 텍스트를 유효한 JSON으로 수정해주세요. 특히 콤마 누락, 따옴표 불일치 등의 문제를 해결해주세요:
+
+    {response_text}
+    {details}
+    수정된 JSON만 반환해주세요. 다른 설명은 필요 없습니다.
+    """
+
+def json_fix_request(response_text, error, schema=None):
+    """JSON 수정 요청의 (프롬프트, 생성 설정)을 만듭니다. 스키마가 있으면 수정 응답에도 스키마를 적용합니다."""
+    problems = error.errors if isinstance(error, SchemaError) else None
+    config = {"response_mime_type": "application/json", "response_schema": schema} if schema else None
+    return build_json_fix_prompt(response_text, problems), config
+
+def parse_model_fixed_json(fixed_text, schema=None):
+    """모델이 다시 정리해 준 JSON 응답을 파싱합니다."""
+    result = parse_json_response(fixed_text, schema)
+    logger.info("모델을 통한 JSON 수정 후 파싱 성공")
+    metrics.record_json_path('model_fix')
     return result
 
-def fix_missing_commas(json_str):
+def update_cached_response(model, prompt, generation_config, result=None):
     """
-    JSON 문자열에서 누락된 콤마를 감지하고 수정합니다.
-    특히 'Expecting ',' delimiter' 오류를 해결하기 위한 함수입니다.
+    응답 캐시를 쓰는 모델(CachedModel)이면 파싱하지 못한 원래 응답이 다시 쓰이지 않게 합니다.
+    모델이 고쳐 준 결과(result)가 있으면 그 JSON으로 바꿔 저장하고, 없으면 캐시에서 지웁니다.
     """
-    # 객체 내에서 누락된 콤마 수정 (속성 사이)
-    # 예: {"a": 1 "b": 2} -> {"a": 1, "b": 2}
-    json_str = re.sub(r'(\d+|true|false|null|"[^"]*")\s*("[\w\s]+"\s*:)', r'\1, \2', json_str)
-    
-    # 배열 내에서 누락된 콤마 수정 (요소 사이)
-    # 예: [1 2 3] -> [1, 2, 3]
-    json_str = re.sub(r'(\d+|true|false|null|"[^"]*")\s+(\d+|true|false|null|")', r'\1, \2', json_str)
-    
-    return json_str
-
-def run_ai_agent(model, agent_name, prompt, is_json_output=False):
+    if result is None:
+        invalidate = getattr(model, 'invalidate', None)
+        if invalidate:
+            invalidate(prompt, generation_config)
+        return
+    replace_cached = getattr(model, 'replace_cached', None)
+    if replace_cached:
+        replace_cached(prompt, generation_config, json.dumps(result, ensure_ascii=False))
+
+def json_output_config(is_json_output, response_schema=None, generation_config=None):
+    """생성 설정을 만듭니다. JSON 응답이면 MIME 형식을, 스키마가 있으면 response_schema를 추가합니다."""
+    config = dict(generation_config or {})
+    if is_json_output:
+        config["response_mime_type"] = "application/json"
+        if response_schema is not None:
+            config["response_schema"] = response_schema
+    return config
+
+def run_ai_agent(model, agent_name, prompt, is_json_output=False, response_schema=None):
     """
     모든 AI Agent의 API 호출을 처리하는 단일 범용 함수.
+    response_schema(schemas.py)를 넘기면 모델에 응답 스키마로 전달하고, 받은 JSON도 같은 스키마로 검사합니다.
     실패 시 PipelineError를 발생시킵니다.
     """
     # 시작 메시지 출력 제거 (main.py에서 출력함)
-    try:
-        config = {"response_mime_type": "application/json"} if is_json_output else {}
-        response = model.generate_content(prompt, generation_config=config)
-        
-        if is_json_output:
-            # JSON 응답의 경우 제어 문자 제거 후 파싱
-            response_text = response.text
-            
-            # 응답이 JSON으로 시작하지 않는 경우 처리
-            if not response_text.strip().startswith('{'):
-                # JSON 블록 찾기
-                json_match = re.search(r'({[\s\S]*})', response_text)
-                if json_match:
-                    response_text = json_match.group(1)
-                else:
-                    logger.warning(f"JSON 블록을 찾을 수 없음: {response_text[:100]}...")
-            
-            # 잘못된 이스케이프 시퀀스 수정 (첫 번째 시도)
-            response_text = fix_invalid_escapes(response_text)
-            
-            # 누락된 콤마 수정 (새로 추가)
-            response_text = fix_missing_commas(response_text)
-            
-            sanitized_text = sanitize_json_string(response_text)
-            
-            try:
-                result = json.loads(sanitized_text)
-            except json.JSONDecodeError as e:
-                # JSON 파싱 실패 시 디버깅 정보 출력 및 로깅
-                error_msg = f"JSON 파싱 실패: {e}"
-                print(error_msg)
-                print(f"원본 텍스트 일부: {response_text[:100]}...")
-                
-                # 로그에 더 자세한 정보 기록
-                logger.error(error_msg)
-                
-                # 문제가 발생한 위치 주변의 문자열 로깅 (오류 위치 전후 50자)
-                error_pos = e.pos
-                start_pos = max(0, error_pos - 50)
-                end_pos = min(len(response_text), error_pos + 50)
-                context = response_text[start_pos:end_pos]
-                
-                logger.error(f"파싱 오류 위치: {e.lineno}행 {e.colno}열 (문자 위치: {e.pos})")
-                logger.error(f"문제 문자 주변 컨텍스트: {context}")
-                logger.error(f"전체 응답 텍스트 길이: {len(response_text)} 문자")
-                
-                # 이스케이프 문자 분석
-                escape_positions = [(m.start(), m.group()) for m in re.finditer(r'\\[^"\\/' + 'bfnrtu]', sanitized_text)]
-                if escape_positions:
-                    logger.error(f"잘못된 이스케이프 시퀀스 발견: {escape_positions}")
-                
-                # 마지막 시도: 문자열을 완전히 정리
+    with metrics.agent_call(agent_name):
+        try:
+            config = json_output_config(is_json_output, response_schema)
+            response = model.generate_content(prompt, generation_config=config)
+            metrics.record_usage(response)
+
+            if is_json_output:
                 try:
-                    # 모든 제어 문자 제거
-                    clean_text = re.sub(r'[^\x20-\x7E]', '', response_text)
-                    
-                    # 잘못된 이스케이프 시퀀스 수정
-                    clean_text = fix_invalid_escapes(clean_text)
-                    
-                    # 누락된 콤마 수정 (새로 추가)
-                    clean_text = fix_missing_commas(clean_text)
-                    
-                    # 따옴표 정리 (새로 추가)
-                    # 중첩된 따옴표 문제 해결 시도
-                    clean_text = re.sub(r'(?<!\\)\\{2,}"', '\\"', clean_text)
-                    
-                    # 중괄호와 대괄호 균형 확인 및 수정 (새로 추가)
-                    open_braces = clean_text.count('{')
-                    close_braces = clean_text.count('}')
-                    if open_braces > close_braces:
-                        clean_text += '}' * (open_braces - close_braces)
-                    elif close_braces > open_braces:
-                        clean_text = '{' * (close_braces - open_braces) + clean_text
-                    
-                    open_brackets = clean_text.count('[')
-                    close_brackets = clean_text.count(']')
-                    if open_brackets > close_brackets:
-                        clean_text += ']' * (open_brackets - close_brackets)
-                    elif close_brackets > open_brackets:
-                        clean_text = '[' * (close_brackets - open_brackets) + clean_text
-                    
-                    # 마지막 속성 뒤에 콤마가 있으면 제거 (새로 추가)
-                    clean_text = re.sub(r',\s*}', '}', clean_text)
-                    clean_text = re.sub(r',\s*]', ']', clean_text)
-                    
-                    result = json.loads(clean_text)
-                    logger.info("최종 정리 시도로 JSON 파싱 성공")
-                except Exception as final_e:
-                    logger.critical(f"모든 JSON 파싱 시도 실패: {final_e}")
-                    logger.debug(f"최종 정리 시도 실패한 텍스트: {clean_text[:200]}")
-                    
-                    # 마지막 수단: 모든 백슬래시를 이중 백슬래시로 변경 후 시도
+                    result = parse_json_response(response.text, response_schema)
+                except (json.JSONDecodeError, SchemaError) as e:
+                    # 최후의 수단: 모델에게 다시 요청하기
                     try:
-                        escaped_text = response_text.replace('\\', '\\\\')
-                        # 이중 백슬래시를 다시 단일 백슬래시로 변환
-                        valid_escapes = '"\\/' + 'bfnrtu'
-                        for char in valid_escapes:
-                            escaped_text = escaped_text.replace('\\\\' + char, '\\' + char)
-                        
-                        # 새로 추가: 더 강력한 정규식 기반 JSON 정리
-                        # 1. 모든 속성 이름에 따옴표 추가
-                        escaped_text = re.sub(r'([{,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1"\2":', escaped_text)
-                        
-                        # 2. 누락된 콤마 수정 (다시 시도)
-                        escaped_text = fix_missing_commas(escaped_text)
-                        
-                        # 3. 중괄호와 대괄호 균형 다시 확인
-                        open_braces = escaped_text.count('{')
-                        close_braces = escaped_text.count('}')
-                        if open_braces > close_braces:
-                            escaped_text += '}' * (open_braces - close_braces)
-                        
-                        result = json.loads(escaped_text)
-                        logger.info("백슬래시 이스케이프 처리 후 JSON 파싱 성공")
-                    except Exception:
-                        # 정확한 오류 위치와 내용을 로그에 기록
-                        if isinstance(e, json.JSONDecodeError):
-                            logger.critical(f"JSON 파싱 최종 실패 - 오류 위치: 행 {e.lineno}, 열 {e.colno}, 위치 {e.pos}")
-                            if e.pos < len(response_text):
-                                # 오류 발생 지점의 문자와 그 주변 문자열 기록
-                                error_char = response_text[e.pos] if e.pos < len(response_text) else "문자열 끝"
-                                logger.critical(f"오류 발생 문자: '{error_char}' (ASCII: {ord(error_char) if e.pos < len(response_text) else 'N/A'})")
-                        
-                        # 최후의 수단: 모델에게 다시 요청하기
-                        try:
-                            # 원본 응답에 문제가 있으므로 모델에게 JSON 형식으로 다시 정리해달라고 요청
-                            fix_prompt = f"""
-                            다음 텍스트를 유효한 JSON으로 수정해주세요. 특히 콤마 누락, 따옴표 불일치 등의 문제를 해결해주세요:
-                            
-                            {response_text}
-                            
-                            수정된 JSON만 반환해주세요. 다른 설명은 필요 없습니다.
-                            """
-                            
-                            fix_response = model.generate_content(fix_prompt)
-                            fixed_json = fix_response.text.strip()
-                            
-                            # 응답에서 JSON 블록 추출
-                            json_match = re.search(r'({[\s\S]*})', fixed_json)
-                            if json_match:
-                                fixed_json = json_match.group(1)
-                            
-                            # 수정된 JSON 파싱 시도
-                            result = json.loads(fixed_json)
-                            logger.info("모델을 통한 JSON 수정 후 파싱 성공")
-                        except Exception as model_fix_error:
-                            logger.critical(f"모델을 통한 JSON 수정 시도도 실패: {model_fix_error}")
-                            raise PipelineError(f"AI 응답을 JSON으로 파싱할 수 없습니다: {e}")
-        else:
-            result = response.text
-            
-        if not result:
-            logger.error("AI 응답 결과가 비어 있음")
-            raise PipelineError("결과물이 비어 있습니다.")
-        # 완료 메시지도 삭제 (main.py에서만 표시)
-        return result
-    except Exception as e:
-        logger.error(f"'{agent_name}' Agent 실행 중 오류 발생: {str(e)}", exc_info=True)
-        raise PipelineError(f"'{agent_name}' Agent 실행 중 오류 발생: {e}")
+                        fix_prompt, fix_config = json_fix_request(response.text, e, response_schema)
+                        fix_response = model.generate_content(fix_prompt, generation_config=fix_config)
+                        metrics.record_usage(fix_response)
+                        result = parse_model_fixed_json(fix_response.text, response_schema)
+                    except Exception as model_fix_error:
+                        logger.critical(f"모델을 통한 JSON 수정 시도도 실패: {model_fix_error}")
+                        update_cached_response(model, prompt, config)
+                        raise PipelineError(f"AI 응답을 JSON으로 파싱할 수 없습니다: {e}")
+                    update_cached_response(model, prompt, config, result)
+            else:
+                result = response.text
+
+            if not result:
+                logger.error("AI 응답 결과가 비어 있음")
+                raise PipelineError("결과물이 비어 있습니다.")
+            # 완료 메시지도 삭제 (main.py에서만 표시)
+            return result
+        except Exception as e:
+            logger.error(f"'{agent_name}' Agent 실행 중 오류 발생: {str(e)}", exc_info=True)
+            raise PipelineError(f"'{agent_name}' Agent 실행 중 오류 발생: {e}")
+
+async def generate_content_async(model, prompt, generation_config=None):
+    """
+    모델의 비동기 생성 API를 호출합니다.
+    비동기 API가 없는 모델은 블로킹 호출을 별도 스레드에서 실행합니다.
+    """
+    generate = getattr(model, 'generate_content_async', None)
+    if generate is None:
+        return await asyncio.to_thread(model.generate_content, prompt, generation_config=generation_config)
+    return await generate(prompt, generation_config=generation_config)
+
+async def stream_content_async(model, prompt, generation_config=None):
+    """
+    모델 응답을 조각 단위 텍스트로 넘겨주는 비동기 제너레이터입니다.
+    래퍼 모델(RateLimitedModel, CachedModel)의 stream_content_async가 있으면 그것을 사용하고,
+    스트리밍을 지원하지 않는 모델은 전체 응답을 한 조각으로 넘겨줍니다.
+    """
+    stream = getattr(model, 'stream_content_async', None)
+    if stream is not None:
+        # 이 제너레이터가 중간에 닫히면 감싼 모델의 스트림도 바로 닫습니다.
+        async with contextlib.aclosing(stream(prompt, generation_config=generation_config)) as chunks:
+            async for text in chunks:
+                yield text
+        return
+
+    generate = getattr(model, 'generate_content_async', None)
+    if generate is None:
+        response = await asyncio.to_thread(model.generate_content, prompt, generation_config=generation_config)
+        yield response.text
+        return
+
+    response = await generate(prompt, generation_config=generation_config, stream=True)
+    async for chunk in response:
+        if chunk.text:
+            yield chunk.text
+
+async def run_ai_agent_async(model, agent_name, prompt, is_json_output=False, on_chunk=None, generation_config=None,
+                             response_schema=None, use_cache=True):
+    """
+    run_ai_agent의 비동기 버전입니다.
+    RateLimitedModel로 감싼 모델을 넘기면 요청 속도 제한, 동시 실행 제한, 재시도가 함께 적용됩니다.
+    on_chunk를 넘기면 응답을 스트리밍으로 받으며, 도착한 텍스트 조각마다 on_chunk(text)를 호출합니다.
+    generation_config로 temperature 같은 생성 설정을 추가할 수 있습니다.
+    response_schema를 넘기면 모델에 응답 스키마로 전달하고, 받은 JSON도 같은 스키마로 검사합니다.
+    use_cache가 거짓이면 응답 캐시(CachedModel)를 거치지 않고 항상 모델을 호출합니다. (예: 최종결정자)
+    실패 시 PipelineError를 발생시킵니다.
+    """
+    if not use_cache:
+        model = getattr(model, 'uncached', model)
+    with metrics.agent_call(agent_name):
+        try:
+            config = json_output_config(is_json_output, response_schema, generation_config)
+            if on_chunk is None:
+                response = await generate_content_async(model, prompt, generation_config=config)
+                metrics.record_usage(response)
+                response_text = response.text
+            else:
+                parts = []
+                async for text in stream_content_async(model, prompt, generation_config=config):
+                    parts.append(text)
+                    on_chunk(text)
+                response_text = ''.join(parts)
+                # 스트리밍 응답에는 사용량 메타데이터가 없으므로 길이로 추정합니다.
+                metrics.record_estimated_usage(estimate_tokens(prompt), estimate_tokens(response_text))
+
+            if is_json_output:
+                try:
+                    result = parse_json_response(response_text, response_schema)
+                except (json.JSONDecodeError, SchemaError) as e:
+                    # 최후의 수단: 모델에게 다시 요청하기 (이 호출에도 속도 제한이 적용됨)
+                    try:
+                        fix_prompt, fix_config = json_fix_request(response_text, e, response_schema)
+                        fix_response = await generate_content_async(model, fix_prompt, generation_config=fix_config)
+                        metrics.record_usage(fix_response)
+                        result = parse_model_fixed_json(fix_response.text, response_schema)
+                    except Exception as model_fix_error:
+                        logger.critical(f"모델을 통한 JSON 수정 시도도 실패: {model_fix_error}")
+                        # 캐시를 사용하는 모델이라면 파싱할 수 없는 응답이 다시 사용되지 않도록 제거
+                        await asyncio.to_thread(update_cached_response, model, prompt, config)
+                        raise PipelineError(f"AI 응답을 JSON으로 파싱할 수 없습니다: {e}")
+                    # 다음 실행에서 같은 응답을 다시 고치지 않도록 고친 결과를 캐시에 저장
+                    await asyncio.to_thread(update_cached_response, model, prompt, config, result)
+            else:
+                result = response_text
+
+            if not result:
+                logger.error("AI 응답 결과가 비어 있음")
+                raise PipelineError("결과물이 비어 있습니다.")
+            return result
+        except Exception as e:
+            logger.error(f"'{agent_name}' Agent 실행 중 오류 발생: {str(e)}", exc_info=True)
+            raise PipelineError(f"'{agent_name}' Agent 실행 중 오류 발생: {e}")
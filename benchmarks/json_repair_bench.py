@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+JSON 복구 엔진 벤치마크입니다.
+
+작성자 응답과 같은 형태(800단어 이상의 article_markdown 포함)의 JSON에 AI가 자주 만드는
+오류를 주입한 코퍼스를 만들어, json_repair.repair_json의 파싱 성공률과 KB당 처리 시간을 측정합니다.
+benchmarks/corpus/ 폴더에 실제로 수집한 응답(*.txt)을 넣어 두면 함께 측정합니다.
+
+사용법:
+    python benchmarks/json_repair_bench.py [--samples 200] [--seed 7]
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_repair import repair_json  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+WORDS = ("cron expression schedule server minute hour 크론 표현식 변환 도구 사용자 설정 "
+         "`* * * * *` **client-side** \\* escaped\\_markdown C:\\Users\\path \"quoted\" value").split(' ')
+
+def make_article(rng, word_count=900):
+    """마크다운 본문(표, 인용구, 코드 포함)을 만듭니다."""
+    lines = ["## Introduction", "> Have you ever struggled with cron?"]
+    while sum(len(line.split()) for line in lines) < word_count:
+        lines.append(' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))))
+        if rng.random() < 0.1:
+            lines.append("| Field | Value |\n|---|---|\n| minute | 0-59 |")
+        if rng.random() < 0.1:
+            lines.append("### " + ' '.join(rng.choice(WORDS) for _ in range(3)))
+    return '\n\n'.join(lines)
+
+def make_payload(rng):
+    return {
+        "title": "Cron Expression Guide",
+        "meta_description": "Learn cron expressions step by step.",
+        "article_markdown": make_article(rng),
+        "faq_json_ld": json.dumps({"@context": "https://schema.org", "@type": "FAQPage", "mainEntity": []}),
+    }
+
+# --- AI 응답에서 자주 보이는 오류 주입 ---
+
+def raw_newlines(text):
+    return text.replace('\\n', '\n')
+
+def invalid_escapes(text):
+    return text.replace('\\\\*', '\\*').replace('\\\\_', '\\_').replace('\\\\U', '\\U')
+
+def missing_comma(text):
+    return text.replace('",\n  "meta_description"', '"\n  "meta_description"', 1)
+
+def trailing_comma(text):
+    end = text.rfind('}')
+    return text + ',' if end < 0 else text[:end] + ',\n' + text[end:]
+
+def truncated(text):
+    end = text.rfind('"faq_json_ld"')
+    return text if end < 0 else text[:end].rstrip().rstrip(',')
+
+def unescaped_quotes(text):
+    return text.replace('\\"quoted\\"', '"quoted"')
+
+def code_fence(text):
+    return "Here is the JSON you asked for:\n```json\n" + text + "\n```\nLet me know!"
+
+def control_chars(text):
+    return text.replace('schedule', 'sche\x01dule').replace('server', 'ser\x0bver')
+
+def unquoted_keys(text):
+    return text.replace('"title":', 'title:').replace('"meta_description":', 'meta_description:')
+
+FAULTS = [raw_newlines, invalid_escapes, missing_comma, trailing_comma, truncated,
+          unescaped_quotes, code_fence, control_chars, unquoted_keys]
+
+def build_corpus(samples, seed):
+    """(이름, 응답 원문, 기대하는 title 값) 목록을 만듭니다."""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(samples):
+        payload = make_payload(rng)
+        text = json.dumps(payload, ensure_ascii=False, indent=2)
+        faults = rng.sample(FAULTS, rng.randint(1, 3))
+        for fault in faults:
+            text = fault(text)
+        name = '+'.join(fault.__name__ for fault in faults)
+        corpus.append((f"synthetic-{index}:{name}", text, payload['title']))
+
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, '*.txt'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            corpus.append((os.path.basename(path), f.read(), None))
+    return corpus
+
+def run(corpus, repeat):
+    strict_ok = repaired_ok = field_ok = 0
+    per_kb_us = []
+    failures = []
+    for name, text, expected_title in corpus:
+        try:
+            json.loads(text)
+            strict_ok += 1
+        except json.JSONDecodeError:
+            pass
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            repaired = repair_json(text)
+        elapsed = (time.perf_counter() - started) / repeat
+        per_kb_us.append(elapsed * 1e6 / max(len(text.encode('utf-8')) / 1024, 0.001))
+
+        try:
+            result = json.loads(repaired)
+        except json.JSONDecodeError as e:
+            failures.append((name, str(e)))
+            continue
+        repaired_ok += 1
+        if expected_title is None or (isinstance(result, dict) and result.get('title') == expected_title
+                                      and result.get('article_markdown')):
+            field_ok += 1
+    return strict_ok, repaired_ok, field_ok, per_kb_us, failures
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON 복구 엔진 벤치마크')
+    parser.add_argument('--samples', type=int, default=200, help='합성 응답 개수 (기본값: 200)')
+    parser.add_argument('--seed', type=int, default=7, help='난수 시드 (기본값: 7)')
+    parser.add_argument('--repeat', type=int, default=5, help='응답별 반복 측정 횟수 (기본값: 5)')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.samples, args.seed)
+    total_kb = sum(len(text.encode('utf-8')) for _, text, _ in corpus) / 1024
+    strict_ok, repaired_ok, field_ok, per_kb_us, failures = run(corpus, args.repeat)
+    total = len(corpus)
+    per_kb_us.sort()
+
+    print(f"📦 코퍼스: {total}건, 총 {total_kb:.0f}KB (평균 {total_kb / total:.1f}KB)")
+    print(f"   - json.loads 그대로 성공: {strict_ok}/{total} ({strict_ok / total:.1%})")
+    print(f"   - repair_json 후 파싱 성공: {repaired_ok}/{total} ({repaired_ok / total:.1%})")
+    print(f"   - 필드(title, article_markdown) 보존: {field_ok}/{total} ({field_ok / total:.1%})")
+    print(f"   - KB당 처리 시간: 중앙값 {statistics.median(per_kb_us):.1f}µs, "
+          f"p95 {per_kb_us[int(len(per_kb_us) * 0.95) - 1]:.1f}µs")
+    for name, error in failures[:10]:
+        print(f"   ❌ {name}: {error}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+파이프라인 전체(작성자 → 편집자 → 최종결정자 → DB 저장) 처리량 벤치마크입니다.
+
+API 키나 네트워크 없이 FakeModel(fake_model.py)로 N개 기능의 글을 임시 DB에 생성하고,
+초당 글 수, DB 작업 시간, JSON 복구 시간, 최대 메모리 사용량을 측정합니다.
+--output으로 결과를 JSON 파일에 저장해 두면 이전 결과와 비교해 성능 저하를 확인할 수 있습니다.
+
+사용법:
+    python benchmarks/pipeline_bench.py [--features 50] [--concurrency 8] [--latency 0.05]
+    python benchmarks/pipeline_bench.py --sequential --features 10   # run_pipeline을 한 건씩 반복
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import agents  # noqa: E402
+import main  # noqa: E402
+import setup  # noqa: E402
+from db_handler import db_connect  # noqa: E402
+from fake_model import FakeModel  # noqa: E402
+
+def make_features(count):
+    """벤치마크용 기능 명세 목록을 만듭니다."""
+    return [{
+        'name': f'Bench Tool {index}',
+        'endpoint': f'/bench/{index}',
+        'description': f'벤치마크용 기능 {index}의 설명입니다.',
+        'targetAudience': 'developers',
+    } for index in range(count)]
+
+def timed_repair(repair, timings):
+    """repair_json 호출 시간을 누적하는 래퍼를 만듭니다."""
+    def wrapper(text):
+        started = time.perf_counter()
+        try:
+            return repair(text)
+        finally:
+            timings.append(time.perf_counter() - started)
+    return wrapper
+
+def run_benchmark(args, workdir):
+    db_path = os.path.join(workdir, 'bench_content.db')
+    features_path = os.path.join(workdir, 'features.json')
+    with open(features_path, 'w', encoding='utf-8') as f:
+        json.dump({'features': make_features(args.features)}, f, ensure_ascii=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup.init_database(db_path)
+
+    fake = FakeModel(latency=args.latency, latency_jitter=args.latency / 2, error_rate=args.error_rate,
+                     malformed_rate=args.malformed_rate, seed=args.seed)
+    model = agents.RateLimitedModel(fake, requests_per_minute=1_000_000, tokens_per_minute=10**9,
+                                    max_in_flight=args.concurrency * 3, backoff_base=0.01, backoff_max=0.1)
+    options = {'stream': args.stream, 'features_file': features_path}
+
+    repair_timings = []
+    original_repair = agents.repair_json
+    agents.repair_json = timed_repair(original_repair, repair_timings)
+    conn = db_connect(db_path)
+    output = sys.stdout if args.verbose else io.StringIO()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            if args.sequential:
+                for _ in range(args.features):
+                    main.run_pipeline(conn, model, args.locale, options)
+            else:
+                asyncio.run(main.run_batch(conn, model, [args.locale], None, args.concurrency, options))
+        elapsed = time.perf_counter() - started
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        agents.repair_json = original_repair
+
+    try:
+        approved = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        db_ms, db_calls = conn.execute(
+            "SELECT COALESCE(SUM(latency_ms), 0), COUNT(*) FROM agent_metrics WHERE kind = 'db'"
+        ).fetchone()
+        failed = conn.execute(
+            "SELECT COUNT(*) FROM pipeline_logs WHERE status NOT IN ('AUTO_APPROVED', 'AI_REJECTED', 'DUPLICATE_REJECTED', 'LOCAL_REJECTED')"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+    return {
+        'features': args.features,
+        'mode': 'sequential' if args.sequential else f'batch(concurrency={args.concurrency})',
+        'stream': args.stream,
+        'elapsed_seconds': round(elapsed, 3),
+        'articles': approved,
+        'unfinished_pipelines': failed,
+        'articles_per_second': round(approved / elapsed, 2) if elapsed > 0 else 0.0,
+        'db_ms_total': round(db_ms, 1),
+        'db_calls': db_calls,
+        'json_repair_calls': len(repair_timings),
+        'json_repair_ms_total': round(sum(repair_timings) * 1000, 1),
+        'model_calls': dict(fake.calls),
+        'model_errors': fake.errors,
+        'peak_traced_memory_mb': round(peak_bytes / 1024 / 1024, 2),
+        # Linux는 KB, macOS는 바이트 단위
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                            / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1),
+    }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='파이프라인 처리량 벤치마크 (FakeModel 사용)')
+    parser.add_argument('--features', type=int, default=50, help='생성할 기능 수 (기본값: 50)')
+    parser.add_argument('--concurrency', type=int, default=8, help='동시에 처리할 주제 수 (기본값: 8)')
+    parser.add_argument('--sequential', action='store_true', help='run_batch 대신 run_pipeline을 한 건씩 반복')
+    parser.add_argument('--stream', action='store_true', help='작성자 응답을 스트리밍 모드로 처리')
+    parser.add_argument('--locale', default='ko', choices=main.SUPPORTED_LOCALES, help='콘텐츠 언어 (기본값: ko)')
+    parser.add_argument('--latency', type=float, default=0.05, help='모델 호출당 평균 지연 시간(초) (기본값: 0.05)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='일시적 오류 확률 (기본값: 0)')
+    parser.add_argument('--malformed-rate', type=float, default=0.3, help='깨진 JSON 응답 확률 (기본값: 0.3)')
+    parser.add_argument('--seed', type=int, default=7, help='난수 시드 (기본값: 7)')
+    parser.add_argument('--output', metavar='PATH', help='결과를 JSON 파일로 저장')
+    parser.add_argument('--verbose', action='store_true', help='파이프라인 출력을 그대로 표시')
+    args = parser.parse_args()
+
+    # 프롬프트 파일은 저장소 기준 상대 경로로 읽습니다.
+    os.chdir(ROOT_DIR)
+    with tempfile.TemporaryDirectory() as workdir:
+        result = run_benchmark(args, workdir)
+
+    print(f"🏁 {result['features']}개 기능, {result['mode']}{' + stream' if result['stream'] else ''}")
+    print(f"   - 소요 시간: {result['elapsed_seconds']:.2f}초, 생성된 글: {result['articles']}건 "
+          f"(미완료 {result['unfinished_pipelines']}건)")
+    print(f"   - 처리량: 초당 {result['articles_per_second']:.2f}건")
+    print(f"   - DB 작업: {result['db_calls']}회, 합계 {result['db_ms_total']:.1f}ms")
+    print(f"   - JSON 복구: {result['json_repair_calls']}회, 합계 {result['json_repair_ms_total']:.1f}ms")
+    print(f"   - 모델 호출: {result['model_calls']} (일시적 오류 {result['model_errors']}회)")
+    print(f"   - 메모리: 최대 할당 {result['peak_traced_memory_mb']:.2f}MB, 최대 RSS {result['max_rss_mb']:.1f}MB")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"   - 결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main_cli()
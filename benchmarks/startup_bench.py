@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+CLI 시작 시간 벤치마크입니다.
+
+`python -X importtime`으로 `import main`에 걸리는 시간과 오래 걸리는 모듈을 보여주고,
+DB만 사용하는 명령(report, enqueue, --dry-run)과 --help를 여러 번 실행해 중간값(wall-clock)을 측정합니다.
+google.generativeai, requests, dotenv 같은 무거운 패키지가 모델/네트워크를 쓰지 않는 경로에서
+불러와지지 않는지도 확인합니다.
+
+사용법:
+    python benchmarks/startup_bench.py [--repeat 5] [--top 10] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 모델이나 네트워크를 쓰지 않는 경로에서는 불러오면 안 되는 패키지
+HEAVY_MODULES = ('google.generativeai', 'google.api_core', 'requests', 'dotenv')
+
+def parse_importtime(stderr):
+    """-X importtime 출력을 [(모듈, 자체 시간 us, 누적 시간 us, 깊이), ...]로 변환합니다."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def measure_import(top):
+    """`import main`의 누적 시간과 가장 오래 걸린 모듈, 무거운 패키지 로딩 여부를 반환합니다."""
+    code = ("import sys, main; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    rows = parse_importtime(result.stderr)
+    total_us = next(cumulative for name, _, cumulative, depth in rows if name == 'main' and depth == 0)
+    # main 아래에서 직접 불러온 모듈 중 오래 걸린 순서
+    children = sorted(((name, cumulative) for name, _, cumulative, depth in rows if depth == 1),
+                      key=lambda item: item[1], reverse=True)
+    loaded_heavy = [name for name in result.stdout.strip().split(',') if name]
+    return {
+        'import_main_ms': round(total_us / 1000, 1),
+        'slowest_imports_ms': {name: round(cumulative / 1000, 1) for name, cumulative in children[:top]},
+        'heavy_modules_loaded': loaded_heavy,
+    }
+
+def time_command(args, workdir, repeat):
+    """명령을 repeat번 실행해 wall-clock 시간의 중간값과 최솟값(ms)을 반환합니다."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT_DIR, 'main.py'), *args],
+                       cwd=workdir, capture_output=True, check=True)
+        durations.append((time.perf_counter() - started) * 1000)
+    return {'median_ms': round(statistics.median(durations), 1), 'min_ms': round(min(durations), 1)}
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='CLI 시작 시간 벤치마크')
+    parser.add_argument('--repeat', type=int, default=5, help='명령별 반복 실행 횟수 (기본값: 5)')
+    parser.add_argument('--top', type=int, default=10, help='표시할 느린 모듈 수 (기본값: 10)')
+    parser.add_argument('--output', metavar='PATH', help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    result = measure_import(args.top)
+    with tempfile.TemporaryDirectory() as workdir:
+        # 인터넷 없이 실행되도록 기능 명세는 임시 파일에서 읽고, DB는 임시 폴더에 만듭니다.
+        features_path = os.path.join(workdir, 'features.json')
+        with open(features_path, 'w', encoding='utf-8') as f:
+            json.dump({'features': [{'name': 'Startup Tool', 'endpoint': '/startup', 'description': '시작 시간 측정용'}]}, f)
+        os.symlink(os.path.join(ROOT_DIR, 'prompts'), os.path.join(workdir, 'prompts'))
+        commands = {
+            'help': ['--help'],
+            'report': ['report'],
+            'dry_run': ['--dry-run', '--features-file', features_path],
+            'enqueue': ['enqueue', '--features-file', features_path],
+        }
+        result['commands'] = {name: time_command(command, workdir, args.repeat) for name, command in commands.items()}
+
+    print(f"🚀 import main: {result['import_main_ms']:.1f}ms")
+    for name, ms in result['slowest_imports_ms'].items():
+        print(f"   - {name}: {ms:.1f}ms")
+    if result['heavy_modules_loaded']:
+        print(f"   ⚠️ 모델/네트워크를 쓰지 않는데 불러온 패키지: {', '.join(result['heavy_modules_loaded'])}")
+    else:
+        print(f"   ✅ 무거운 패키지({', '.join(HEAVY_MODULES)})를 불러오지 않았습니다.")
+    print(f"⏱️ 명령별 실행 시간 (중간값, {args.repeat}회)")
+    for name, timing in result['commands'].items():
+        print(f"   - {name}: {timing['median_ms']:.0f}ms (최소 {timing['min_ms']:.0f}ms)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"   - 결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,234 @@
+# cache.py
+"""
+AI 응답 캐시 모듈입니다.
+(모델명, 완성된 프롬프트, 생성 설정)의 해시를 키로 응답 원문을 SQLite에 저장하여,
+같은 요청을 다시 보낼 때 API를 호출하지 않고 이전 결과를 재사용합니다.
+"""
+import asyncio
+import contextlib
+import contextvars
+import sqlite3
+import hashlib
+import json
+import time
+import threading
+import logging
+import metrics
+from agents import generate_content_async, stream_content_async
+
+logger = logging.getLogger('easytool')
+
+# 콘텐츠 DB(easytool_content.db)와 같은 위치에 별도 파일로 저장합니다.
+CACHE_DB_NAME = "easytool_cache.db"
+
+# 캐시 보관 한도
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_AGE_DAYS = 30
+
+# 저장 몇 번마다 한 번씩 오래된 항목을 정리할지
+EVICT_EVERY_PUTS = 50
+
+# 현재 파이프라인(asyncio Task)에서 읽거나 저장한 캐시 키 목록
+_pipeline_keys = contextvars.ContextVar('easytool_cache_keys', default=None)
+
+def track_cache_keys():
+    """
+    현재 Task에서 사용하는 캐시 키를 모을 리스트를 만들고 반환합니다.
+    파이프라인이 반려되면 이 키들을 CachedModel.invalidate_keys()로 지워, 다음 실행에서 같은 글을 다시 받지 않게 합니다.
+    """
+    keys = []
+    _pipeline_keys.set(keys)
+    return keys
+
+def remember_key(key):
+    """현재 Task가 캐시 키를 모으고 있으면 key를 추가합니다."""
+    keys = _pipeline_keys.get()
+    if keys is not None:
+        keys.append(key)
+
+def make_cache_key(model_name, prompt, generation_config=None):
+    """모델명, 프롬프트, 생성 설정으로부터 캐시 키(SHA-256)를 만듭니다."""
+    payload = json.dumps(
+        [model_name, prompt, generation_config or {}],
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class CachedResponse:
+    """캐시에서 꺼낸 응답. 모델 응답처럼 .text 속성을 가집니다."""
+
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+        self.from_cache = True
+
+class ResponseCache:
+    """SQLite 기반의 영구 응답 캐시 (기간 및 개수 기준으로 정리)"""
+
+    def __init__(self, path=CACHE_DB_NAME, max_entries=DEFAULT_MAX_ENTRIES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # 조회마다 접근 시각을 갱신하므로 콘텐츠 DB와 같이 WAL 모드로 쓰기 비용을 줄입니다.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                cache_key TEXT PRIMARY KEY,
+                model_name TEXT NOT NULL,
+                response_text TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_accessed_at ON response_cache (accessed_at)")
+        self.conn.commit()
+        self.evict()
+
+    def get(self, key):
+        """캐시된 응답 원문을 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response_text, created_at FROM response_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE response_cache SET accessed_at = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                (now, key)
+            )
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model_name, response_text):
+        """응답 원문을 캐시에 저장합니다."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO response_cache
+                    (cache_key, model_name, response_text, created_at, accessed_at, hit_count)
+                VALUES (?, ?, ?, ?, ?, 0)
+            """, (key, model_name, response_text, now, now))
+            self.conn.commit()
+            self._puts += 1
+            should_evict = self._puts % EVICT_EVERY_PUTS == 0
+        if should_evict:
+            self.evict()
+
+    def delete(self, key):
+        """캐시 항목 하나를 삭제합니다."""
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        """캐시 항목 여러 개를 한 번에 삭제합니다."""
+        with self._lock:
+            self.conn.executemany("DELETE FROM response_cache WHERE cache_key = ?", [(key,) for key in keys])
+            self.conn.commit()
+
+    def evict(self):
+        """보관 기간이 지난 항목과, 개수 한도를 넘는 가장 오래 사용되지 않은 항목을 삭제합니다."""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM response_cache WHERE created_at < ?",
+                           (time.time() - self.max_age_seconds,))
+            expired = cursor.rowcount
+            cursor.execute("""
+                DELETE FROM response_cache WHERE cache_key IN (
+                    SELECT cache_key FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            overflow = cursor.rowcount
+            self.conn.commit()
+        if expired or overflow:
+            logger.info(f"응답 캐시 정리: 만료 {expired}건, 한도 초과 {overflow}건 삭제")
+
+    def close(self):
+        self.conn.close()
+
+class CachedModel:
+    """
+    모델 앞에 응답 캐시를 두는 래퍼입니다.
+    캐시에 없을 때만 감싼 모델(예: RateLimitedModel)을 호출하고 결과를 저장합니다.
+    매번 새로 판단해야 하는 호출(최종결정자)은 uncached로 캐시를 거치지 않고 호출합니다.
+    감싸지 않은 속성은 원래 모델로 위임합니다.
+    """
+
+    def __init__(self, model, cache):
+        self._model = model
+        self.cache = cache
+        self.model_name = getattr(model, 'model_name', type(model).__name__)
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    @property
+    def uncached(self):
+        """캐시를 거치지 않는 감싼 모델입니다."""
+        return self._model
+
+    def _store(self, key, response):
+        text = response.text
+        if text:
+            self.cache.put(key, self.model_name, text)
+        return response
+
+    async def _lookup_async(self, key):
+        # SQLite 조회/쓰기는 블로킹이므로 이벤트 루프를 막지 않게 스레드에서 실행합니다.
+        return await asyncio.to_thread(self.cache.get, key)
+
+    def invalidate(self, prompt, generation_config=None):
+        """사용할 수 없는 응답(예: 파싱 불가능한 JSON)이 재사용되지 않도록 캐시에서 제거합니다."""
+        self.cache.delete(make_cache_key(self.model_name, prompt, generation_config))
+
+    async def invalidate_keys(self, keys):
+        """track_cache_keys()로 모은 캐시 항목을 지웁니다. (예: 반려된 파이프라인의 작성자/편집자 응답)"""
+        if keys:
+            await asyncio.to_thread(self.cache.delete_many, list(dict.fromkeys(keys)))
+
+    def replace_cached(self, prompt, generation_config, text):
+        """모델이 고쳐 준 응답(text)으로 캐시 값을 바꿔, 다음 실행에서는 수정 요청 없이 바로 쓰게 합니다."""
+        self.cache.put(make_cache_key(self.model_name, prompt, generation_config), self.model_name, text)
+
+    def generate_content(self, prompt, generation_config=None):
+        key = make_cache_key(self.model_name, prompt, generation_config)
+        remember_key(key)
+        cached_text = self.cache.get(key)
+        if cached_text is not None:
+            metrics.record_cache_hit()
+            return CachedResponse(cached_text)
+        return self._store(key, self._model.generate_content(prompt, generation_config=generation_config))
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        key = make_cache_key(self.model_name, prompt, generation_config)
+        remember_key(key)
+        cached_text = await self._lookup_async(key)
+        if cached_text is not None:
+            metrics.record_cache_hit()
+            return CachedResponse(cached_text)
+        response = await generate_content_async(self._model, prompt, generation_config=generation_config)
+        return await asyncio.to_thread(self._store, key, response)
+
+    async def stream_content_async(self, prompt, generation_config=None):
+        key = make_cache_key(self.model_name, prompt, generation_config)
+        remember_key(key)
+        cached_text = await self._lookup_async(key)
+        if cached_text is not None:
+            metrics.record_cache_hit()
+            yield cached_text
+            return
+        parts = []
+        async with contextlib.aclosing(stream_content_async(self._model, prompt, generation_config)) as chunks:
+            async for text in chunks:
+                parts.append(text)
+                yield text
+        # 끝까지 받은 응답만 저장합니다.
+        if parts:
+            await asyncio.to_thread(self.cache.put, key, self.model_name, ''.join(parts))
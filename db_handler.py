@@ -2,9 +2,25 @@
 import sqlite3
 import datetime
 import json
+import asyncio
+import contextlib
+import functools
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import metrics
 
 DB_NAME = "easytool_content.db"
 
+# 아직 최종 결정이 나지 않아 이어서 진행할 수 있는 파이프라인 상태
+RESUMABLE_STATUSES = ('INITIATED', 'DRAFT_STREAMING', 'DRAFT_CREATED', 'EDITED')
+
+# 작업 큐 기본값: lease 유지 시간(초), 최대 시도 횟수, 실패 후 다시 시도하기까지 기다리는 시간(초, 시도마다 배수로 증가)
+JOB_LEASE_SECONDS = 300
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY_SECONDS = 60
+
 # --- Datetime 어댑터/컨버터 ---
 def adapt_datetime_iso(val):
     """datetime 객체를 ISO 8601 문자열로 변환합니다."""
@@ -18,9 +34,102 @@ def convert_datetime_iso(s):
 sqlite3.register_adapter(datetime.datetime, adapt_datetime_iso)
 sqlite3.register_converter("datetime", convert_datetime_iso)
 
-def db_connect():
+# 커넥션마다 적용하는 PRAGMA 설정
+# - WAL: 쓰기 중에도 읽기가 막히지 않고, 커밋마다 전체 fsync를 하지 않습니다.
+# - synchronous=NORMAL: WAL 모드에서 안전하면서도 커밋 비용이 낮은 설정입니다.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA foreign_keys=ON",
+)
+
+# 다른 프로세스가 쓰는 중일 때 기다리는 최대 시간(초)
+BUSY_TIMEOUT_SECONDS = 30
+
+class EasyToolConnection(sqlite3.Connection):
+    """batch_writes 블록 안에서는 커밋을 미뤄 여러 쓰기를 한 트랜잭션으로 묶는 커넥션"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_depth = 0
+
+def db_connect(db_name=None):
     """데이터베이스 커넥션을 생성합니다."""
-    return sqlite3.connect(DB_NAME, detect_types=sqlite3.PARSE_DECLTYPES)
+    conn = sqlite3.connect(
+        db_name or DB_NAME,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        check_same_thread=False,
+        cached_statements=256,
+        factory=EasyToolConnection,
+    )
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def commit(conn):
+    """batch_writes 블록 밖에서만 커밋합니다."""
+    if getattr(conn, 'batch_depth', 0) == 0:
+        conn.commit()
+
+@contextlib.contextmanager
+def batch_writes(conn):
+    """
+    블록 안의 모든 쓰기를 하나의 트랜잭션으로 묶습니다.
+    정상적으로 끝나면 한 번만 커밋하고, 예외가 발생하면 블록 안의 쓰기를 모두 되돌립니다.
+    """
+    conn.batch_depth += 1
+    try:
+        yield conn
+    except BaseException:
+        conn.batch_depth -= 1
+        if conn.batch_depth == 0:
+            conn.rollback()
+        raise
+    conn.batch_depth -= 1
+    if conn.batch_depth == 0:
+        conn.commit()
+
+class AsyncDatabase:
+    """
+    asyncio 코드에서 사용하는 DB 접근 계층입니다.
+    하나의 쓰기 전용 스레드가 커넥션을 소유하고 요청을 순서대로 처리하므로,
+    여러 파이프라인이 동시에 실행돼도 이벤트 루프가 SQLite 잠금을 기다리며 멈추지 않습니다.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='easytool-db')
+
+    def submit(self, func, *args, **kwargs):
+        """func(conn, *args, **kwargs)를 기다리지 않고 예약합니다. (예: 스트리밍 중간 저장)"""
+        # 쓰기 스레드에는 호출한 Task의 컨텍스트가 없으므로 계측 collector를 미리 꺼내 둡니다.
+        collector = metrics.current_collector()
+        return self._executor.submit(self._timed_call, collector, func, *args, **kwargs)
+
+    def _timed_call(self, collector, func, *args, **kwargs):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = func(self.conn, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            metrics.record_db_call(collector, func.__name__, (time.perf_counter() - started) * 1000, failed)
+
+    async def run(self, func, *args, **kwargs):
+        """func(conn, *args, **kwargs)를 쓰기 스레드에서 실행하고 결과를 기다립니다."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    async def drain(self):
+        """지금까지 예약된 작업이 모두 끝날 때까지 기다립니다. (취소된 Task가 넘겨 둔 쓰기 포함)"""
+        await asyncio.wrap_future(self._executor.submit(lambda: None))
+
+    def close(self):
+        """예약된 작업이 모두 끝날 때까지 기다린 뒤 스레드를 정리합니다. (커넥션은 닫지 않음)"""
+        self._executor.shutdown(wait=True)
 
 def get_published_tool_names(conn, locale='ko'):
     """'articles' 테이블에서 이미 발행된 글의 tool_name 목록을 지정된 언어로 가져옵니다."""
@@ -28,26 +137,209 @@ def get_published_tool_names(conn, locale='ko'):
     cursor.execute("SELECT tool_name FROM articles WHERE locale = ?", (locale,))
     return [row[0] for row in cursor.fetchall()]
 
+def get_published_spec_hashes(conn, locale='ko'):
+    """
+    이미 발행된 글의 {tool_name: spec_hash}를 지정된 언어로 가져옵니다.
+    spec_hash 컬럼이 생기기 전에 저장된 글은 값이 None입니다.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT tool_name, spec_hash FROM articles WHERE locale = ?", (locale,))
+    return dict(cursor.fetchall())
+
+def get_duplicate_rejected_spec_hashes(conn, locale='ko'):
+    """
+    중복으로 반려된 시도의 {tool_name: {spec_hash, ...}}를 지정된 언어로 가져옵니다.
+    spec_hash를 기록하기 전에 반려된 시도는 포함하지 않습니다.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT DISTINCT tool_name, spec_hash FROM pipeline_logs
+        WHERE status = 'DUPLICATE_REJECTED' AND locale = ? AND spec_hash IS NOT NULL
+    """, (locale,))
+    rejected = {}
+    for tool_name, spec_hash in cursor.fetchall():
+        rejected.setdefault(tool_name, set()).add(spec_hash)
+    return rejected
+
+def get_article_documents(conn, locale='ko', max_body_chars=None):
+    """
+    중복 검사 색인용으로 발행된 글의 (tool_name, title, meta_description, content_markdown)을 가져옵니다.
+    max_body_chars가 있으면 본문은 앞부분만 잘라서 읽습니다.
+    """
+    body = "substr(content_markdown, 1, ?)" if max_body_chars else "content_markdown"
+    params = (max_body_chars, locale) if max_body_chars else (locale,)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT tool_name, title, meta_description, {body} FROM articles WHERE locale = ? ORDER BY id",
+                   params)
+    return cursor.fetchall()
+
+def get_published_article(conn, tool_name, locale='ko'):
+    """발행된 글 하나를 dict로 가져옵니다. (번역 원본 조회용, 없으면 None)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, tool_name, locale, title, meta_description, content_markdown, structured_data_json, spec_hash
+        FROM articles WHERE tool_name = ? AND locale = ?
+    """, (tool_name, locale))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip([column[0] for column in cursor.description], row))
+
+def iter_published_articles(conn, locales=None, batch_size=200):
+    """
+    발행된 글을 dict로 하나씩 돌려주는 제너레이터입니다. (내보내기용)
+    결과를 한 번에 메모리에 올리지 않고 batch_size개씩 커서에서 읽습니다.
+    """
+    query = """
+        SELECT id, tool_name, locale, title, meta_description, content_markdown,
+               structured_data_json, published_at
+        FROM articles
+    """
+    params = ()
+    if locales:
+        query += f" WHERE locale IN ({', '.join('?' for _ in locales)})"
+        params = tuple(locales)
+    cursor = conn.cursor()
+    cursor.execute(query + " ORDER BY locale, id", params)
+    columns = [column[0] for column in cursor.description]
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(columns, row))
+    finally:
+        cursor.close()
+
+def backfill_spec_hashes(conn, locale, spec_hashes):
+    """
+    spec_hash가 없는 기존 글에 현재 기능 명세의 해시를 기준값으로 기록합니다.
+    spec_hashes는 {tool_name: spec_hash}이며, 기록한 글 수를 반환합니다.
+    """
+    cursor = conn.cursor()
+    cursor.executemany(
+        "UPDATE articles SET spec_hash = ? WHERE locale = ? AND tool_name = ? AND spec_hash IS NULL",
+        [(spec_hash, locale, tool_name) for tool_name, spec_hash in spec_hashes.items()]
+    )
+    commit(conn)
+    return cursor.rowcount
+
+# --- pipeline_logs 본문 압축 ---
+
+# 압축해서 저장할 수 있는 'pipeline_logs'의 큰 본문 컬럼
+PAYLOAD_COLUMNS = ('creator_draft', 'editor_revision', 'decider_judgment_json', 'editor_diff_json')
+PAYLOAD_CODECS = ('zlib', 'zstd')
+
+# 이 크기(바이트)보다 작은 값은 압축해도 이득이 적어 TEXT 그대로 저장합니다.
+COMPRESS_MIN_BYTES = 256
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# 새로 저장하는 본문의 압축 방식 (None이면 압축하지 않음). set_payload_compression()으로 바꿉니다.
+_payload_codec = None
+
+@functools.lru_cache(maxsize=None)
+def load_zstd_package():
+    """zstandard 패키지가 설치되어 있으면 모듈을, 없으면 None을 반환합니다. (선택 의존성)"""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+def set_payload_compression(codec):
+    """
+    새로 저장하는 'pipeline_logs' 본문의 압축 방식을 정합니다. (None, 'zlib', 'zstd')
+    이미 저장된 값은 압축 여부와 관계없이 그대로 읽을 수 있습니다.
+    """
+    global _payload_codec
+    if codec not in (None, *PAYLOAD_CODECS):
+        raise ValueError(f"지원하지 않는 압축 방식입니다: {codec} (지원: {', '.join(PAYLOAD_CODECS)})")
+    if codec == 'zstd' and load_zstd_package() is None:
+        raise ValueError("zstd 압축에는 zstandard 패키지가 필요합니다. (pip install zstandard)")
+    _payload_codec = codec
+
+def encode_payload(value, codec=None):
+    """
+    본문 문자열을 저장할 값으로 바꿉니다. 압축 방식이 정해져 있고 충분히 길면 압축한 BLOB을,
+    아니면 값을 그대로 반환합니다. (codec을 넘기지 않으면 set_payload_compression()의 설정을 사용)
+    """
+    codec = codec or _payload_codec
+    if codec is None or not isinstance(value, str):
+        return value
+    data = value.encode('utf-8')
+    if len(data) < COMPRESS_MIN_BYTES:
+        return value
+    if codec == 'zstd':
+        return load_zstd_package().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+def decode_payload(value):
+    """
+    encode_payload()로 저장한 값을 문자열로 되돌립니다. 압축하지 않은 TEXT와 None은 그대로 반환합니다.
+    BLOB은 앞부분이 zstd 프레임 매직 넘버이면 zstd로, 아니면 zlib으로 풉니다.
+    """
+    if not isinstance(value, bytes):
+        return value
+    if value.startswith(ZSTD_MAGIC):
+        zstandard = load_zstd_package()
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 기록을 읽으려면 zstandard 패키지가 필요합니다. (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(value).decode('utf-8')
+    return zlib.decompress(value).decode('utf-8')
+
+def decode_pipeline_row(row):
+    """'pipeline_logs' 행(dict)의 압축된 본문 컬럼을 문자열로 되돌립니다."""
+    for column in PAYLOAD_COLUMNS:
+        if column in row:
+            row[column] = decode_payload(row[column])
+    return row
+
 def create_pipeline_entry(conn, tool_name, locale='ko'):
     """'pipeline_logs'에 새로운 작업 로그를 생성하고 ID를 반환합니다."""
     cursor = conn.cursor()
     cursor.execute("INSERT INTO pipeline_logs (tool_name, status, locale, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
                    (tool_name, 'INITIATED', locale, datetime.datetime.now(), datetime.datetime.now()))
-    conn.commit()
+    commit(conn)
     return cursor.lastrowid
 
+def get_unfinished_pipelines(conn, locale='ko'):
+    """
+    최종 결정 전에 중단된 'pipeline_logs' 항목을 지정된 언어로 가져옵니다.
+    도구별로 가장 최근 시도가 미완료 상태이고, 그 시도 이후에 발행된 글이 없는 경우만 반환합니다.
+    (명세 변경으로 다시 생성하던 중 중단된 글도 이어서 진행할 수 있습니다.)
+    """
+    placeholders = ', '.join('?' for _ in RESUMABLE_STATUSES)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT * FROM pipeline_logs p
+        WHERE p.locale = ?
+          AND p.status IN ({placeholders})
+          AND p.id = (SELECT MAX(id) FROM pipeline_logs WHERE tool_name = p.tool_name AND locale = p.locale)
+          AND NOT EXISTS (
+              SELECT 1 FROM articles a
+              WHERE a.locale = p.locale AND a.tool_name = p.tool_name AND a.published_at >= p.created_at
+          )
+        ORDER BY p.id
+    """, (locale, *RESUMABLE_STATUSES))
+    columns = [column[0] for column in cursor.description]
+    return [decode_pipeline_row(dict(zip(columns, row))) for row in cursor.fetchall()]
+
 def update_pipeline_step(conn, pipeline_id, **kwargs):
-    """'pipeline_logs'의 현재 작업 로그를 업데이트합니다."""
+    """'pipeline_logs'의 현재 작업 로그를 업데이트합니다. 본문 컬럼은 압축 설정에 따라 압축해 저장합니다."""
+    kwargs = {key: encode_payload(value) if key in PAYLOAD_COLUMNS else value for key, value in kwargs.items()}
     kwargs['updated_at'] = datetime.datetime.now()
     fields = ', '.join([f"{key} = ?" for key in kwargs.keys()])
     values = list(kwargs.values())
     values.append(pipeline_id)
     cursor = conn.cursor()
     cursor.execute(f"UPDATE pipeline_logs SET {fields} WHERE id = ?", values)
-    conn.commit()
+    commit(conn)
 
-def save_approved_article(conn, pipeline_id, tool_name, final_content, article_data, locale='ko'):
-    """승인된 아티클과 관련 메타데이터를 'articles' 테이블에 저장합니다."""
+def save_approved_article(conn, pipeline_id, tool_name, final_content, article_data, locale='ko', spec_hash=None):
+    """승인된 아티클과 관련 메타데이터(작성에 사용한 기능 명세의 해시 포함)를 'articles' 테이블에 저장합니다."""
     print("\n" + "="*50)
     print(f"🤖 AI 최종결정자 승인! {locale} 언어의 콘텐츠를 자동으로 저장합니다.")
     print(f"   - 제목: {article_data['title']}")
@@ -55,12 +347,21 @@ def save_approved_article(conn, pipeline_id, tool_name, final_content, article_d
     
     update_pipeline_step(conn, pipeline_id, status='AUTO_APPROVED')
     
+    # 같은 도구와 언어의 글이 이미 있으면 새 글로 교체합니다. (도구/언어별 유니크 인덱스)
     cursor = conn.cursor()
     cursor.execute("""
         INSERT INTO articles (
             pipeline_log_id, tool_name, title, meta_description, 
-            content_markdown, structured_data_json, published_at, locale
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            content_markdown, structured_data_json, published_at, locale, spec_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (locale, tool_name) DO UPDATE SET
+            pipeline_log_id = excluded.pipeline_log_id,
+            title = excluded.title,
+            meta_description = excluded.meta_description,
+            content_markdown = excluded.content_markdown,
+            structured_data_json = excluded.structured_data_json,
+            published_at = excluded.published_at,
+            spec_hash = excluded.spec_hash
     """, (
         pipeline_id, 
         tool_name, 
@@ -69,7 +370,322 @@ def save_approved_article(conn, pipeline_id, tool_name, final_content, article_d
         final_content,
         json.dumps(article_data['faq_json_ld'], ensure_ascii=False),
         datetime.datetime.now(),
-        locale
+        locale,
+        spec_hash
     ))
-    conn.commit()
+    commit(conn)
     print(f"\n🎉 'articles' 테이블에 {locale} 언어의 콘텐츠가 성공적으로 저장되었습니다.")
+
+def save_decider_result(conn, pipeline_id, decider_judgment, approved, tool_name=None,
+                        final_content=None, article_data=None, locale='ko', rejection_reason=None,
+                        spec_hash=None):
+    """
+    최종결정자의 판단과 그에 따른 후처리(승인 시 아티클 저장, 반려 시 사유 기록)를
+    하나의 트랜잭션으로 저장합니다.
+    """
+    with batch_writes(conn):
+        fields = {'decider_judgment_json': json.dumps(decider_judgment, ensure_ascii=False)}
+        if not approved:
+            fields.update(status='AI_REJECTED', rejection_reason=rejection_reason)
+        update_pipeline_step(conn, pipeline_id, **fields)
+        if approved:
+            save_approved_article(conn, pipeline_id, tool_name, final_content, article_data, locale, spec_hash)
+
+def save_agent_metrics(conn, pipeline_id, locale, records):
+    """파이프라인 하나의 계측 기록을 'agent_metrics' 테이블에 한 번에 저장합니다."""
+    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT INTO agent_metrics (
+            pipeline_log_id, locale, kind, step, latency_ms, prompt_tokens, response_tokens,
+            tokens_estimated, retries, json_path, schema_errors, cached, status, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(
+        pipeline_id, locale, record['kind'], record['step'], record['latency_ms'],
+        record['prompt_tokens'], record['response_tokens'], int(record['tokens_estimated']),
+        record['retries'], record['json_path'], record['schema_errors'], int(record['cached']), record['status'], record['created_at']
+    ) for record in records])
+    commit(conn)
+
+# --- 작업 큐 (worker 모드) ---
+
+def enqueue_jobs(conn, locale, tool_names, max_attempts=JOB_MAX_ATTEMPTS):
+    """
+    도구별 작업을 큐에 넣고 새로 추가된 작업 수를 반환합니다.
+    같은 도구/언어의 작업이 이미 대기 중이거나 진행 중이면 건너뜁니다.
+    """
+    now = datetime.datetime.now()
+    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT OR IGNORE INTO jobs (tool_name, locale, status, max_attempts, available_at, created_at, updated_at)
+        VALUES (?, ?, 'queued', ?, ?, ?, ?)
+    """, [(tool_name, locale, max_attempts, now, now, now) for tool_name in tool_names])
+    commit(conn)
+    return cursor.rowcount
+
+def claim_job(conn, worker_id, locales, lease_seconds=JOB_LEASE_SECONDS):
+    """
+    처리할 작업 하나를 가져와 worker_id 이름으로 lease를 잡고 dict로 반환합니다. (없으면 None)
+    대기 중인 작업과, 다른 worker가 잡았지만 lease가 만료된 작업(중단된 worker)을 가져올 수 있습니다.
+    BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡으므로 여러 프로세스가 같은 작업을 동시에 가져가지 않습니다.
+    """
+    now = datetime.datetime.now()
+    placeholders = ', '.join('?' for _ in locales)
+    with batch_writes(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        # 재시도 횟수를 다 쓴 채로 lease가 만료된 작업은 실패로 정리합니다.
+        conn.execute("""
+            UPDATE jobs SET status = 'failed', lease_owner = NULL, updated_at = ?,
+                            last_error = COALESCE(last_error, 'lease 만료 (worker 중단)')
+            WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= max_attempts
+        """, (now, now))
+        cursor = conn.execute(f"""
+            SELECT * FROM jobs
+            WHERE locale IN ({placeholders})
+              AND ((status = 'queued' AND available_at <= ?) OR (status = 'leased' AND lease_expires_at < ?))
+            ORDER BY available_at, id
+            LIMIT 1
+        """, (*locales, now, now))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        job = dict(zip([column[0] for column in cursor.description], row))
+        job.update(status='leased', attempts=job['attempts'] + 1, lease_owner=worker_id,
+                   lease_expires_at=now + datetime.timedelta(seconds=lease_seconds))
+        conn.execute("""
+            UPDATE jobs SET status = 'leased', attempts = ?, lease_owner = ?, lease_expires_at = ?, updated_at = ?
+            WHERE id = ?
+        """, (job['attempts'], worker_id, job['lease_expires_at'], now, job['id']))
+    return job
+
+def renew_job_lease(conn, job_id, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+    """진행 중인 작업의 lease를 연장합니다. 다른 worker에게 넘어갔으면 False를 반환합니다."""
+    now = datetime.datetime.now()
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE jobs SET lease_expires_at = ?, updated_at = ?
+        WHERE id = ? AND lease_owner = ? AND status = 'leased'
+    """, (now + datetime.timedelta(seconds=lease_seconds), now, job_id, worker_id))
+    commit(conn)
+    return cursor.rowcount == 1
+
+def finish_job(conn, job_id, worker_id, result):
+    """작업을 완료(done) 처리하고 파이프라인 결과(APPROVED, REJECTED)를 기록합니다."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE jobs SET status = 'done', result = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+        WHERE id = ? AND lease_owner = ?
+    """, (result, datetime.datetime.now(), job_id, worker_id))
+    commit(conn)
+    return cursor.rowcount == 1
+
+def fail_job(conn, job_id, worker_id, error, retry_delay_seconds=JOB_RETRY_DELAY_SECONDS, permanent=False):
+    """
+    작업 실패를 기록합니다. 재시도 횟수가 남아 있으면 retry_delay_seconds × 시도 횟수 뒤에 다시 대기열에 넣고,
+    다 썼거나 permanent가 참이면 실패(failed)로 끝냅니다. 최종 상태('queued' 또는 'failed')를 반환합니다.
+    """
+    now = datetime.datetime.now()
+    cursor = conn.cursor()
+    cursor.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ?", (job_id, worker_id))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    attempts, max_attempts = row
+    status = 'failed' if permanent or attempts >= max_attempts else 'queued'
+    cursor.execute("""
+        UPDATE jobs SET status = ?, last_error = ?, lease_owner = NULL, lease_expires_at = NULL,
+                        available_at = ?, updated_at = ?
+        WHERE id = ?
+    """, (status, str(error)[:1000], now + datetime.timedelta(seconds=retry_delay_seconds * attempts), now, job_id))
+    commit(conn)
+    return status
+
+def release_job(conn, job_id, worker_id):
+    """worker가 종료될 때 진행 중이던 작업을 시도 횟수를 되돌려 바로 다시 대기열에 넣습니다."""
+    now = datetime.datetime.now()
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), lease_owner = NULL,
+                        lease_expires_at = NULL, available_at = ?, updated_at = ?
+        WHERE id = ? AND lease_owner = ? AND status = 'leased'
+    """, (now, now, job_id, worker_id))
+    commit(conn)
+    return cursor.rowcount == 1
+
+def get_job_counts(conn, locales=None):
+    """작업 큐의 상태별 작업 수를 {status: count} 형태로 반환합니다."""
+    query = "SELECT status, COUNT(*) FROM jobs"
+    params = ()
+    if locales:
+        query += f" WHERE locale IN ({', '.join('?' for _ in locales)})"
+        params = tuple(locales)
+    return dict(conn.execute(query + " GROUP BY status", params).fetchall())
+
+# --- 보존 기간 정리와 데이터베이스 통계 ---
+
+ARCHIVE_DB_NAME = "easytool_archive.db"
+
+# 기본 보존 기간(일): 이보다 오래 갱신되지 않은 반려/중단 시도가 정리 대상입니다.
+DEFAULT_RETENTION_DAYS = 30
+
+# 반려되어 다시 이어서 진행하지 않는 파이프라인 상태
+REJECTED_STATUSES = ('AI_REJECTED', 'DUPLICATE_REJECTED', 'LOCAL_REJECTED')
+
+# 한 번에 옮기거나 지우는 행 수 (SQLite 변수 개수 제한 안쪽)
+PRUNE_BATCH_SIZE = 500
+
+def find_prunable_pipelines(conn, older_than_days=DEFAULT_RETENTION_DAYS):
+    """
+    older_than_days일 넘게 갱신되지 않은 시도 중 정리할 수 있는 'pipeline_logs' ID 목록을 반환합니다.
+    - 반려된 시도 (AI_REJECTED, DUPLICATE_REJECTED, LOCAL_REJECTED)
+    - 같은 도구/언어의 더 새로운 시도가 있어 다시 이어서 진행할 수 없는 중단된 시도
+    승인된 시도는 발행된 글과 연결되어 있으므로 정리하지 않습니다.
+    """
+    cutoff = datetime.datetime.now() - datetime.timedelta(days=older_than_days)
+    rejected = ', '.join('?' for _ in REJECTED_STATUSES)
+    resumable = ', '.join('?' for _ in RESUMABLE_STATUSES)
+    cursor = conn.execute(f"""
+        SELECT id FROM pipeline_logs p
+        WHERE p.updated_at < ?
+          AND (p.status IN ({rejected})
+               OR (p.status IN ({resumable})
+                   AND p.id < (SELECT MAX(id) FROM pipeline_logs WHERE tool_name = p.tool_name AND locale = p.locale)))
+        ORDER BY p.id
+    """, (cutoff, *REJECTED_STATUSES, *RESUMABLE_STATUSES))
+    return [row[0] for row in cursor.fetchall()]
+
+def prepare_archive_table(conn):
+    """
+    ATTACH한 보관 파일(archive)에 'pipeline_logs' 테이블을 만들고, 본 테이블에 나중에 생긴 컬럼이 있으면 추가합니다.
+    본 테이블의 컬럼 이름 목록을 반환합니다.
+    """
+    columns = [(row[1], row[2]) for row in conn.execute("PRAGMA main.table_info(pipeline_logs)")]
+    definitions = ', '.join(f"{name} {kind} PRIMARY KEY" if name == 'id' else f"{name} {kind}"
+                            for name, kind in columns)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS archive.pipeline_logs ({definitions})")
+    archived = {row[1] for row in conn.execute("PRAGMA archive.table_info(pipeline_logs)")}
+    for name, kind in columns:
+        if name not in archived:
+            conn.execute(f"ALTER TABLE archive.pipeline_logs ADD COLUMN {name} {kind}")
+    return [name for name, _ in columns]
+
+def prune_pipeline_logs(conn, older_than_days=DEFAULT_RETENTION_DAYS, archive_path=ARCHIVE_DB_NAME):
+    """
+    보존 기간이 지난 반려/중단 시도를 'pipeline_logs'에서 지우고 지운 행 수를 반환합니다.
+    archive_path가 있으면 지우기 전에 그 파일의 'pipeline_logs' 테이블로 옮겨 둡니다. (None이면 삭제만)
+    계측 기록(agent_metrics)은 보고서에 계속 쓰이도록 남기고 파이프라인 연결만 끊습니다.
+    """
+    pipeline_ids = find_prunable_pipelines(conn, older_than_days)
+    if not pipeline_ids:
+        return 0
+    # ATTACH는 트랜잭션 밖에서만 할 수 있습니다.
+    conn.commit()
+    if archive_path:
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+    try:
+        with batch_writes(conn):
+            columns = ', '.join(prepare_archive_table(conn)) if archive_path else None
+            for start in range(0, len(pipeline_ids), PRUNE_BATCH_SIZE):
+                batch = pipeline_ids[start:start + PRUNE_BATCH_SIZE]
+                placeholders = ', '.join('?' for _ in batch)
+                if archive_path:
+                    # 중간에 멈췄다가 다시 실행해도 같은 행이 두 번 보관되지 않도록 교체합니다.
+                    conn.execute(f"""
+                        INSERT OR REPLACE INTO archive.pipeline_logs ({columns})
+                        SELECT {columns} FROM main.pipeline_logs WHERE id IN ({placeholders})
+                    """, batch)
+                conn.execute(f"UPDATE agent_metrics SET pipeline_log_id = NULL WHERE pipeline_log_id IN ({placeholders})",
+                             batch)
+                conn.execute(f"DELETE FROM main.pipeline_logs WHERE id IN ({placeholders})", batch)
+    finally:
+        if archive_path:
+            conn.execute("DETACH DATABASE archive")
+    return len(pipeline_ids)
+
+def compress_pipeline_payloads(conn, codec, batch_size=PRUNE_BATCH_SIZE):
+    """
+    이미 저장된 'pipeline_logs' 본문 중 압축되지 않은 값을 codec으로 압축하고, 압축한 값의 수를 반환합니다.
+    batch_size개 행마다 커밋해 큰 데이터베이스에서도 트랜잭션이 너무 커지지 않게 합니다.
+    """
+    columns = ', '.join(PAYLOAD_COLUMNS)
+    compressed = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(f"SELECT id, {columns} FROM pipeline_logs WHERE id > ? ORDER BY id LIMIT ?",
+                            (last_id, batch_size)).fetchall()
+        if not rows:
+            return compressed
+        with batch_writes(conn):
+            for pipeline_id, *values in rows:
+                updates = {}
+                for column, value in zip(PAYLOAD_COLUMNS, values):
+                    encoded = encode_payload(value, codec)
+                    if encoded is not value:
+                        updates[column] = encoded
+                if updates:
+                    fields = ', '.join(f"{column} = ?" for column in updates)
+                    conn.execute(f"UPDATE pipeline_logs SET {fields} WHERE id = ?", (*updates.values(), pipeline_id))
+                    compressed += len(updates)
+        last_id = rows[-1][0]
+
+def vacuum_database(conn):
+    """정리로 생긴 빈 페이지를 파일에서 없애 데이터베이스 파일 크기를 줄입니다."""
+    conn.commit()
+    conn.execute("VACUUM")
+
+def table_value_bytes(conn, table):
+    """테이블에 저장된 값들의 바이트 수 합계를 구합니다. (dbstat을 쓸 수 없을 때의 대략적인 크기)"""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    total = ' + '.join(f"COALESCE(LENGTH(CAST({column} AS BLOB)), 0)" for column in columns)
+    return conn.execute(f"SELECT COALESCE(SUM({total}), 0) FROM {table}").fetchone()[0]
+
+def get_db_stats(conn):
+    """
+    데이터베이스 파일 크기, 테이블별 행 수와 크기, 'pipeline_logs'의 상태별 행 수와 본문 압축 현황을 dict로 반환합니다.
+    테이블 크기는 SQLite의 dbstat을 쓸 수 있으면 인덱스를 포함한 실제 페이지 크기, 아니면 저장된 값의 바이트 수 합입니다.
+    """
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    path = next((row[2] for row in conn.execute("PRAGMA database_list") if row[1] == 'main'), '')
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+    owners = dict(conn.execute("SELECT name, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')").fetchall())
+    try:
+        sizes = {}
+        for name, size in conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"):
+            owner = owners.get(name, name)
+            sizes[owner] = sizes.get(owner, 0) + size
+        size_source = 'dbstat'
+    except sqlite3.OperationalError:
+        sizes = {table: table_value_bytes(conn, table) for table in tables}
+        size_source = 'values'
+    payload_bytes = ' + '.join(f"COALESCE(LENGTH(CAST({column} AS BLOB)), 0)" for column in PAYLOAD_COLUMNS)
+    compressed_values = ' + '.join(f"(typeof({column}) = 'blob')" for column in PAYLOAD_COLUMNS)
+    payload = conn.execute(
+        f"SELECT COALESCE(SUM({payload_bytes}), 0), COALESCE(SUM({compressed_values}), 0) FROM pipeline_logs").fetchone()
+    wal_path = f"{path}-wal"
+    return {
+        'path': path,
+        'file_bytes': page_size * page_count,
+        'free_bytes': page_size * free_pages,
+        'wal_bytes': os.path.getsize(wal_path) if path and os.path.exists(wal_path) else 0,
+        'size_source': size_source,
+        'tables': {
+            table: {'rows': conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], 'bytes': sizes.get(table, 0)}
+            for table in tables
+        },
+        'pipeline_statuses': dict(conn.execute(
+            "SELECT status, COUNT(*) FROM pipeline_logs GROUP BY status ORDER BY COUNT(*) DESC").fetchall()),
+        'payload_bytes': payload[0],
+        'compressed_values': payload[1],
+        'prunable': len(find_prunable_pipelines(conn)),
+    }
+
+@contextlib.asynccontextmanager
+async def async_database(conn):
+    """AsyncDatabase를 열고, 블록이 끝나면 남은 쓰기를 마친 뒤 정리합니다."""
+    db = AsyncDatabase(conn)
+    try:
+        yield db
+    finally:
+        await asyncio.to_thread(db.close)
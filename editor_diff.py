@@ -0,0 +1,65 @@
+# editor_diff.py
+"""
+편집자가 글 전체를 다시 쓰는 대신 고칠 블록만 돌려주는 diff 편집 모드입니다. (--editor-diff)
+초안을 빈 줄 기준의 블록으로 나눠 [B1], [B2]처럼 번호를 붙여 보여주고,
+{"edits": [{"block", "original", "replacement"}]} 형태의 편집 목록을 받아 컴퓨터에서 적용합니다.
+가벼운 교정이라면 편집자 응답의 크기와 시간이 글 길이가 아니라 고친 양에 비례합니다.
+편집 목록이 깨끗하게 적용되지 않으면(없는 블록 번호, 원문 불일치, 중복 편집) 기존처럼 전체 다시 쓰기로 편집합니다.
+"""
+from agents import run_ai_agent_async, PipelineError, logger
+from schemas import EDITOR_DIFF_SCHEMA
+from translator import split_markdown_blocks
+
+# 편집의 'original'을 블록 시작과 비교할 때 사용하는 최대 글자 수 (공백 정규화 후)
+ORIGINAL_MATCH_CHARS = 40
+
+class EditApplyError(ValueError):
+    """편집 목록을 초안에 깨끗하게 적용할 수 없을 때 발생합니다."""
+
+def number_blocks(blocks):
+    """블록마다 [B1], [B2]처럼 번호를 붙여 편집자 프롬프트에 넣을 초안을 만듭니다."""
+    return '\n\n'.join(f"[B{number}]\n{block.rstrip()}" for number, block in enumerate(blocks, 1))
+
+def normalize_whitespace(text):
+    return ' '.join(text.split())
+
+def apply_edits(blocks, edits):
+    """
+    편집 목록을 블록 리스트에 적용해 새 마크다운을 반환합니다.
+    replacement가 빈 문자열이면 그 블록을 삭제합니다. 적용할 수 없으면 EditApplyError를 발생시킵니다.
+    """
+    revised = [block.rstrip() for block in blocks]
+    edited = set()
+    for edit in edits:
+        number = edit['block']
+        if not 1 <= number <= len(blocks):
+            raise EditApplyError(f"[B{number}] 블록이 없습니다. (블록 {len(blocks)}개)")
+        if number in edited:
+            raise EditApplyError(f"[B{number}] 블록을 두 번 고쳤습니다.")
+        edited.add(number)
+        original = normalize_whitespace(edit.get('original') or '')[:ORIGINAL_MATCH_CHARS]
+        if original and not normalize_whitespace(blocks[number - 1]).startswith(original):
+            raise EditApplyError(f"[B{number}] 블록의 원문이 일치하지 않습니다: {original!r}")
+        revised[number - 1] = edit['replacement'].strip()
+    return '\n\n'.join(block for block in revised if block)
+
+async def edit_with_diff(model, prompts, draft, notes=''):
+    """
+    diff 편집을 요청해 (편집본, 적용한 편집 목록 또는 None)을 반환합니다.
+    편집 목록을 받지 못했거나 깨끗하게 적용되지 않으면 전체 다시 쓰기(editor.md)로 편집하고 None을 돌려줍니다.
+    notes(로컬 검사에서 찾은 문제 목록)는 두 프롬프트 모두의 끝에 붙입니다.
+    """
+    blocks = split_markdown_blocks(draft)
+    prompt = prompts['editor_diff'].format(draft_content=number_blocks(blocks)) + notes
+    try:
+        result = await run_ai_agent_async(model, "편집자", prompt, is_json_output=True,
+                                          response_schema=EDITOR_DIFF_SCHEMA)
+        edits = result['edits']
+        revision = apply_edits(blocks, edits)
+        print(f"   ✂️ 편집자가 블록 {len(blocks)}개 중 {len(edits)}개를 고쳤습니다.")
+        return revision, edits
+    except (PipelineError, EditApplyError) as e:
+        logger.warning(f"diff 편집을 적용하지 못해 전체 다시 쓰기로 편집합니다: {e}")
+        print(f"   ↩️ diff 편집을 적용하지 못해 전체 다시 쓰기로 편집합니다: {e}")
+    revision = await run_ai_agent_async(model, "편집자", prompts['editor'].format(draft_content=draft) + notes)
+    return revision, None
@@ -0,0 +1,435 @@
+# exporter.py
+"""
+승인된 글('articles' 테이블)을 정적 파일로 내보냅니다.
+언어별 폴더에 Markdown(front matter 포함)과 HTML(JSON-LD 포함) 파일을 만들고 sitemap.xml을 함께 씁니다.
+
+- 글은 커서에서 조금씩 읽으므로 글이 수천 개여도 메모리 사용량이 일정합니다.
+- 글 내용의 해시를 매니페스트 파일에 기록해 두고, 바뀌지 않은 글은 다시 쓰지 않습니다.
+- 파일 생성(Markdown → HTML 변환 포함)은 여러 프로세스에 나눠서 처리합니다.
+"""
+import datetime
+import functools
+import hashlib
+import html
+import json
+import os
+import re
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from db_handler import iter_published_articles
+
+EXPORT_DIR = "export"
+
+# 내보내기 형식과 파일 확장자
+EXPORT_FORMATS = ('markdown', 'html')
+FILE_EXTENSIONS = {'markdown': '.md', 'html': '.html'}
+
+# sitemap과 canonical 링크에 사용하는 기본 주소 ({base_url}/{locale}/{slug}.html)
+DEFAULT_BASE_URL = "https://easytool.run/guides"
+
+# 글별 내용 해시를 기록하는 파일 (출력 폴더 안)
+MANIFEST_FILE = ".export_manifest.json"
+
+# 출력 형식(템플릿)을 바꾸면 이 값을 올려 모든 글을 다시 만들게 합니다.
+RENDER_VERSION = 1
+
+# 한 번에 작업 프로세스로 넘기는 글 수
+RENDER_BATCH_SIZE = 50
+
+# sitemap 파일 하나에 넣을 수 있는 최대 URL 수 (sitemaps.org 규격)
+SITEMAP_MAX_URLS = 50000
+
+SLUG_PATTERN = re.compile(r'[^\w]+')
+
+def slugify(text):
+    """도구 이름을 파일 이름과 URL에 쓸 수 있는 slug로 바꿉니다. (한글은 그대로 유지)"""
+    slug = SLUG_PATTERN.sub('-', text.strip().lower()).strip('-_')
+    return slug or 'article'
+
+def article_url(base_url, locale, slug, extension):
+    return f"{base_url.rstrip('/')}/{locale}/{urllib.parse.quote(slug)}{extension}"
+
+def content_hash(article, export_format, url):
+    """출력 파일 내용을 결정하는 값의 해시입니다. 이 값이 같으면 파일을 다시 쓰지 않습니다."""
+    payload = json.dumps([
+        RENDER_VERSION, export_format, url, article['tool_name'], article['title'],
+        article['meta_description'], article['content_markdown'], article['structured_data_json'],
+        str(article['published_at']),
+    ], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_json_ld(article):
+    """structured_data_json을 dict로 읽습니다. 비어 있거나 잘못된 값이면 None을 반환합니다."""
+    try:
+        data = json.loads(article['structured_data_json'] or 'null')
+    except json.JSONDecodeError:
+        return None
+    return data or None
+
+# --- Markdown → HTML 변환 ---
+
+INLINE_CODE_PATTERN = re.compile(r'(`+)(.+?)\1')
+IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)\)')
+LINK_PATTERN = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+BOLD_PATTERN = re.compile(r'(\*\*|__)(.+?)\1')
+ITALIC_PATTERN = re.compile(r'(?<![\w*])([*_])(?!\s)(.+?)(?<!\s)\1(?![\w*])')
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+ORDERED_ITEM_PATTERN = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+UNORDERED_ITEM_PATTERN = re.compile(r'^\s*[-*+]\s+(.*)$')
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$')
+HR_PATTERN = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+
+def render_inline(text):
+    """강조, 링크, 이미지, 인라인 코드를 HTML로 바꿉니다. (코드 안의 내용은 그대로 둡니다)"""
+    parts = []
+    position = 0
+    for match in INLINE_CODE_PATTERN.finditer(text):
+        parts.append(_render_inline_text(text[position:match.start()]))
+        parts.append(f"<code>{html.escape(match.group(2).strip())}</code>")
+        position = match.end()
+    parts.append(_render_inline_text(text[position:]))
+    return ''.join(parts)
+
+def _quote_attribute(escaped_text):
+    return escaped_text.replace('"', '&quot;')
+
+def _render_inline_text(text):
+    # 먼저 <, >, &를 이스케이프하므로 속성 값에는 따옴표만 추가로 이스케이프합니다.
+    text = html.escape(text, quote=False)
+    text = IMAGE_PATTERN.sub(lambda m: f'<img src="{_quote_attribute(m.group(2))}" alt="{_quote_attribute(m.group(1))}">', text)
+    text = LINK_PATTERN.sub(lambda m: f'<a href="{_quote_attribute(m.group(2))}">{m.group(1)}</a>', text)
+    text = BOLD_PATTERN.sub(r'<strong>\2</strong>', text)
+    return ITALIC_PATTERN.sub(r'<em>\2</em>', text)
+
+def split_table_row(line):
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+def basic_markdown_to_html(text):
+    """
+    글에 자주 쓰이는 Markdown(제목, 문단, 목록, 인용, 코드 블록, 표, 구분선, 강조, 링크)을 HTML로 바꾸는 간단한 변환기입니다.
+    markdown 패키지가 설치되어 있지 않을 때 사용합니다.
+    """
+    lines = text.replace('\r\n', '\n').split('\n')
+    blocks = []
+    paragraph = []
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(f"<p>{render_inline(' '.join(line.strip() for line in paragraph))}</p>")
+            paragraph.clear()
+
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        stripped = line.strip()
+        if stripped.startswith('```') or stripped.startswith('~~~'):
+            flush_paragraph()
+            fence, language = stripped[:3], stripped[3:].strip()
+            code = []
+            index += 1
+            while index < len(lines) and not lines[index].strip().startswith(fence):
+                code.append(lines[index])
+                index += 1
+            attribute = f' class="language-{html.escape(language)}"' if language else ''
+            blocks.append(f"<pre><code{attribute}>{html.escape(chr(10).join(code))}</code></pre>")
+        elif not stripped:
+            flush_paragraph()
+        elif HEADING_PATTERN.match(stripped):
+            flush_paragraph()
+            level, title = HEADING_PATTERN.match(stripped).groups()
+            blocks.append(f"<h{len(level)}>{render_inline(title)}</h{len(level)}>")
+        elif HR_PATTERN.match(stripped):
+            flush_paragraph()
+            blocks.append("<hr>")
+        elif stripped.startswith('|') and index + 1 < len(lines) and TABLE_SEPARATOR_PATTERN.match(lines[index + 1]):
+            flush_paragraph()
+            header = ''.join(f"<th>{render_inline(cell)}</th>" for cell in split_table_row(stripped))
+            rows = []
+            index += 2
+            while index < len(lines) and lines[index].strip().startswith('|'):
+                rows.append('<tr>' + ''.join(f"<td>{render_inline(cell)}</td>"
+                                             for cell in split_table_row(lines[index])) + '</tr>')
+                index += 1
+            blocks.append(f"<table><thead><tr>{header}</tr></thead><tbody>{''.join(rows)}</tbody></table>")
+            continue
+        elif stripped.startswith('>'):
+            flush_paragraph()
+            quote = []
+            while index < len(lines) and lines[index].strip().startswith('>'):
+                quote.append(lines[index].strip()[1:].lstrip())
+                index += 1
+            blocks.append(f"<blockquote>{basic_markdown_to_html(chr(10).join(quote))}</blockquote>")
+            continue
+        elif UNORDERED_ITEM_PATTERN.match(line) or ORDERED_ITEM_PATTERN.match(line):
+            flush_paragraph()
+            pattern = UNORDERED_ITEM_PATTERN if UNORDERED_ITEM_PATTERN.match(line) else ORDERED_ITEM_PATTERN
+            tag = 'ul' if pattern is UNORDERED_ITEM_PATTERN else 'ol'
+            items = []
+            while index < len(lines) and pattern.match(lines[index]):
+                items.append(f"<li>{render_inline(pattern.match(lines[index]).group(1))}</li>")
+                index += 1
+            blocks.append(f"<{tag}>{''.join(items)}</{tag}>")
+            continue
+        else:
+            paragraph.append(line)
+        index += 1
+    flush_paragraph()
+    return '\n'.join(blocks)
+
+@functools.lru_cache(maxsize=None)
+def load_markdown_package():
+    """markdown 패키지가 설치되어 있으면 모듈을, 없으면 None을 반환합니다. (선택 의존성)"""
+    try:
+        import markdown
+    except ImportError:
+        return None
+    return markdown
+
+def markdown_to_html(text):
+    """Markdown을 HTML로 바꿉니다. markdown 패키지가 있으면 사용하고, 없으면 기본 변환기를 사용합니다."""
+    markdown = load_markdown_package()
+    if markdown is None:
+        return basic_markdown_to_html(text)
+    return markdown.markdown(text, extensions=['fenced_code', 'tables'])
+
+# --- 파일 생성 ---
+
+def render_markdown_file(article, slug, url):
+    """YAML front matter(제목, 설명, JSON-LD 등)가 붙은 Markdown 파일 내용을 만듭니다."""
+    json_ld = load_json_ld(article)
+    fields = [
+        ('title', article['title']),
+        ('description', article['meta_description'] or ''),
+        ('locale', article['locale']),
+        ('tool', article['tool_name']),
+        ('slug', slug),
+        ('url', url),
+        ('published_at', str(article['published_at'] or '')),
+    ]
+    # JSON 문자열과 객체는 그대로 유효한 YAML이므로 따옴표 처리를 json.dumps에 맡깁니다.
+    lines = ['---'] + [f"{key}: {json.dumps(value, ensure_ascii=False)}" for key, value in fields]
+    if json_ld:
+        lines.append(f"json_ld: {json.dumps(json_ld, ensure_ascii=False)}")
+    lines.append('---')
+    return '\n'.join(lines) + '\n\n' + article['content_markdown'].strip() + '\n'
+
+def render_html_file(article, slug, url):
+    """메타 태그, canonical 링크, JSON-LD 스크립트가 포함된 HTML 문서를 만듭니다."""
+    title = html.escape(article['title'])
+    json_ld = load_json_ld(article)
+    head = [
+        '<meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        f"<title>{title}</title>",
+        f'<meta name="description" content="{html.escape(article["meta_description"] or "")}">',
+        f'<link rel="canonical" href="{html.escape(url)}">',
+    ]
+    if json_ld:
+        # </script>가 본문에 있어도 스크립트 태그가 끝나지 않도록 '</'를 이스케이프합니다.
+        script = json.dumps(json_ld, ensure_ascii=False).replace('</', '<\\/')
+        head.append(f'<script type="application/ld+json">{script}</script>')
+    return (f'<!DOCTYPE html>\n<html lang="{html.escape(article["locale"])}">\n<head>\n'
+            + '\n'.join(head)
+            + f'\n</head>\n<body>\n<article>\n<h1>{title}</h1>\n'
+            + markdown_to_html(article['content_markdown'])
+            + '\n</article>\n</body>\n</html>\n')
+
+RENDERERS = {'markdown': render_markdown_file, 'html': render_html_file}
+
+def write_atomic(path, text):
+    """임시 파일에 쓴 뒤 이름을 바꿔, 중간에 멈춰도 반쯤 쓰인 파일이 남지 않게 합니다."""
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+def render_batch(tasks):
+    """
+    (글, 형식, slug, URL, 파일 경로) 작업 묶음을 파일로 씁니다. 작업 프로세스에서 실행됩니다.
+    쓴 파일 수를 반환합니다.
+    """
+    for article, export_format, slug, url, path in tasks:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, RENDERERS[export_format](article, slug, url))
+    return len(tasks)
+
+class SitemapWriter:
+    """
+    sitemap을 스트리밍으로 씁니다. URL이 SITEMAP_MAX_URLS개를 넘으면 여러 파일로 나누고
+    sitemap.xml을 색인(sitemap index)으로 만듭니다.
+    """
+
+    def __init__(self, output_dir, base_url):
+        self.output_dir = output_dir
+        self.base_url = base_url.rstrip('/')
+        self.parts = []
+        self.count = 0
+        self._file = None
+        self._part_count = 0
+
+    def add(self, url, lastmod=None):
+        if self._file is None or self._part_count >= SITEMAP_MAX_URLS:
+            self._open_part()
+        entry = f"  <url><loc>{html.escape(url)}</loc>"
+        if lastmod:
+            entry += f"<lastmod>{lastmod}</lastmod>"
+        self._file.write(entry + "</url>\n")
+        self._part_count += 1
+        self.count += 1
+
+    def _open_part(self):
+        self._close_part()
+        name = f"sitemap-{len(self.parts) + 1}.xml"
+        self.parts.append(name)
+        self._file = open(os.path.join(self.output_dir, name + '.tmp'), 'w', encoding='utf-8')
+        self._file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                         '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        self._part_count = 0
+
+    def _close_part(self):
+        if self._file is not None:
+            self._file.write('</urlset>\n')
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """sitemap 파일을 완성하고, 이전 실행에서 남은 불필요한 파일을 정리합니다."""
+        self._close_part()
+        sitemap_path = os.path.join(self.output_dir, 'sitemap.xml')
+        if len(self.parts) <= 1:
+            if self.parts:
+                os.replace(os.path.join(self.output_dir, self.parts[0] + '.tmp'), sitemap_path)
+            else:
+                write_atomic(sitemap_path, '<?xml version="1.0" encoding="UTF-8"?>\n'
+                             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n</urlset>\n')
+            kept = set()
+        else:
+            for name in self.parts:
+                os.replace(os.path.join(self.output_dir, name + '.tmp'), os.path.join(self.output_dir, name))
+            entries = ''.join(f"  <sitemap><loc>{html.escape(self.base_url + '/' + name)}</loc></sitemap>\n"
+                              for name in self.parts)
+            write_atomic(sitemap_path, '<?xml version="1.0" encoding="UTF-8"?>\n'
+                         '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                         + entries + '</sitemapindex>\n')
+            kept = set(self.parts)
+        for name in os.listdir(self.output_dir):
+            if re.fullmatch(r'sitemap-\d+\.xml', name) and name not in kept:
+                os.remove(os.path.join(self.output_dir, name))
+
+def load_manifest(output_dir):
+    """이전 내보내기의 {상대 경로: {'hash', 'url', 'lastmod'}}를 불러옵니다."""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(output_dir, manifest):
+    write_atomic(os.path.join(output_dir, MANIFEST_FILE), json.dumps(manifest, ensure_ascii=False, sort_keys=True))
+
+def write_sitemap(output_dir, base_url, manifest):
+    """
+    매니페스트에 기록된 모든 글로 sitemap을 만듭니다.
+    일부 언어나 형식만 내보내도 다른 글이 sitemap에서 빠지지 않으며, 글마다 HTML이 있으면 HTML, 없으면 Markdown 주소를 씁니다.
+    """
+    entries = {}
+    for relative_path in sorted(manifest):
+        stem, extension = os.path.splitext(relative_path)
+        if stem not in entries or extension == FILE_EXTENSIONS['html']:
+            entries[stem] = manifest[relative_path]
+    sitemap = SitemapWriter(output_dir, base_url)
+    for entry in entries.values():
+        sitemap.add(entry['url'], entry.get('lastmod'))
+    sitemap.close()
+    return sitemap.count
+
+def export_articles(conn, output_dir=EXPORT_DIR, locales=None, formats=EXPORT_FORMATS,
+                    base_url=DEFAULT_BASE_URL, workers=None, force=False):
+    """
+    발행된 글을 output_dir/{locale}/{slug}.md|.html 파일과 sitemap.xml로 내보냅니다.
+    locales가 None이면 모든 언어를 내보내고, force가 참이면 바뀌지 않은 글도 다시 만듭니다.
+    workers는 파일 생성에 사용할 프로세스 수(기본값: CPU 수)이며 1이면 현재 프로세스에서 처리합니다.
+    결과 요약(dict)을 반환합니다.
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    seen = set()
+    slugs = {}
+    summary = {'articles': 0, 'written': 0, 'skipped': 0, 'removed': 0, 'sitemap_urls': 0, 'elapsed_seconds': 0.0}
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending = {}
+    batch = []
+
+    def collect(futures):
+        # 끝난 묶음만 매니페스트에 기록해, 중간에 실패해도 다음 실행에서 다시 만듭니다.
+        for future in futures:
+            entries = pending.pop(future)
+            summary['written'] += future.result()
+            manifest.update(entries)
+
+    def flush():
+        if not batch:
+            return
+        tasks = [task for task, _ in batch]
+        entries = dict(entry for _, entry in batch)
+        batch.clear()
+        if executor is None:
+            summary['written'] += render_batch(tasks)
+            manifest.update(entries)
+            return
+        # 처리 중인 묶음 수를 제한해 메모리 사용량을 일정하게 유지합니다.
+        while len(pending) >= workers * 2:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+        pending[executor.submit(render_batch, tasks)] = entries
+
+    try:
+        for article in iter_published_articles(conn, locales):
+            summary['articles'] += 1
+            locale_slugs = slugs.setdefault(article['locale'], set())
+            slug = slugify(article['tool_name'])
+            if slug in locale_slugs:
+                slug = f"{slug}-{article['id']}"
+            locale_slugs.add(slug)
+            published_at = article['published_at']
+            lastmod = published_at.date().isoformat() if isinstance(published_at, datetime.datetime) else None
+
+            for export_format in formats:
+                extension = FILE_EXTENSIONS[export_format]
+                relative_path = f"{article['locale']}/{slug}{extension}"
+                path = os.path.join(output_dir, article['locale'], slug + extension)
+                url = article_url(base_url, article['locale'], slug, extension)
+                seen.add(relative_path)
+                entry = {'hash': content_hash(article, export_format, url), 'url': url, 'lastmod': lastmod}
+                if not force and manifest.get(relative_path) == entry and os.path.exists(path):
+                    summary['skipped'] += 1
+                    continue
+                batch.append(((article, export_format, slug, url, path), (relative_path, entry)))
+                if len(batch) >= RENDER_BATCH_SIZE:
+                    flush()
+        flush()
+        if pending:
+            collect(wait(pending).done)
+
+        # 내보낸 언어/형식 중 이번에 없는 글(삭제되거나 slug가 바뀐 글)의 파일은 지웁니다.
+        extensions = tuple(FILE_EXTENSIONS[export_format] for export_format in formats)
+        for relative_path in list(manifest):
+            locale = relative_path.split('/', 1)[0]
+            if relative_path in seen or not relative_path.endswith(extensions) or (locales and locale not in locales):
+                continue
+            try:
+                os.remove(os.path.join(output_dir, *relative_path.split('/')))
+            except FileNotFoundError:
+                pass
+            del manifest[relative_path]
+            summary['removed'] += 1
+        summary['sitemap_urls'] = write_sitemap(output_dir, base_url, manifest)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        save_manifest(output_dir, manifest)
+    summary['elapsed_seconds'] = time.perf_counter() - started
+    return summary
@@ -0,0 +1,290 @@
+# fake_model.py
+"""
+API 키와 네트워크 없이 파이프라인을 실행하기 위한 가짜 Gemini 모델입니다.
+프롬프트 내용으로 어떤 Agent(작성자/편집자/최종결정자)의 요청인지 판단해
+합성 응답이나 미리 녹화해 둔 응답을 돌려주며, 지연 시간, 일시적 오류, 깨진 JSON 비율을 조절할 수 있습니다.
+
+녹화된 응답을 재생하려면 responses_dir 아래에 creator/, editor/, decider/ 폴더를 만들고
+Agent별 응답 원문을 파일(*.txt, *.json, *.md)로 넣어 두세요. 파일은 이름 순서대로 돌아가며 사용됩니다.
+"""
+import asyncio
+import glob
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from schemas import SECTION_KINDS
+
+FAKE_MODEL_NAME = "fake-gemini"
+
+# 프롬프트에서 Agent를 구분하는 표시
+FIX_PROMPT_MARKER = "유효한 JSON으로 수정"
+DECIDER_MARKER = '"decision"'
+CREATOR_MARKER = '"article_markdown"'
+TRANSLATOR_MARKER = '[Source: '
+OUTLINE_MARKER = '"key_points"'
+FAQ_MARKER = '"questions"'
+SECTION_MARKER = '[Section: '
+EDITOR_DIFF_MARKER = '"edits"'
+BLOCK_LABEL_PATTERN = re.compile(r'^\[B(\d+)\]\n(.*)$', re.MULTILINE)
+SITE_LINK_PATTERN = re.compile(r'https://easytool\.run[^\s)\]"\'`]*')
+
+# 합성 본문에 사용하는 단어
+ARTICLE_WORDS = ("cron expression schedule server minute hour 크론 표현식 변환 도구 사용자 설정 "
+                 "`* * * * *` **client-side** value").split(' ')
+
+# 합성 본문에서 주제별 단어가 차지하는 비율 (글마다 내용이 달라야 중복 검사에 걸리지 않음)
+TOPIC_WORD_RATE = 0.3
+
+class FakeUsage:
+    """Gemini 응답의 usage_metadata와 같은 형태의 토큰 사용량"""
+
+    def __init__(self, prompt, text):
+        self.prompt_token_count = max(1, len(prompt) // 3)
+        self.candidates_token_count = max(1, len(text) // 3)
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+class FakeResponse:
+    """Gemini 응답처럼 .text와 .usage_metadata를 가진 응답"""
+
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+class FakeStream:
+    """stream=True 호출의 결과처럼 조각(FakeResponse)을 차례로 넘겨주는 비동기 반복자"""
+
+    def __init__(self, text, chunk_chars, chunk_delay):
+        self.text = text
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+
+    async def __aiter__(self):
+        for start in range(0, len(self.text), self.chunk_chars):
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            yield FakeResponse(self.text[start:start + self.chunk_chars])
+
+# --- 깨진 JSON 만들기 (AI 응답에서 자주 보이는 오류) ---
+
+def break_raw_newlines(text):
+    return text.replace('\\n', '\n')
+
+def break_missing_comma(text):
+    return text.replace('",\n  "meta_description"', '"\n  "meta_description"', 1)
+
+def break_trailing_comma(text):
+    end = text.rfind('}')
+    return text if end < 0 else text[:end] + ',\n' + text[end:]
+
+def break_code_fence(text):
+    return "```json\n" + text + "\n```"
+
+MALFORMATIONS = (break_raw_newlines, break_missing_comma, break_trailing_comma, break_code_fence)
+
+class FakeModel:
+    """
+    genai.GenerativeModel 대신 사용할 수 있는 가짜 모델입니다.
+    - latency / latency_jitter: 호출마다 기다리는 시간(초)
+    - error_rate: 재시도 가능한 오류(ServiceUnavailable)를 낼 확률
+    - malformed_rate: 작성자 JSON 응답을 깨뜨릴 확률
+    - approve_rate: 최종결정자가 승인할 확률
+    - article_words: 합성 본문의 단어 수
+    - responses_dir: Agent별로 녹화된 응답을 재생할 폴더 (없는 Agent는 합성 응답 사용)
+    - seed: 난수 시드 (같은 시드면 같은 순서로 응답)
+    """
+
+    def __init__(self, latency=0.0, latency_jitter=0.0, error_rate=0.0, malformed_rate=0.0,
+                 approve_rate=1.0, article_words=1200, responses_dir=None, seed=None,
+                 stream_chunk_chars=256, model_name=FAKE_MODEL_NAME):
+        self.model_name = model_name
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.approve_rate = approve_rate
+        self.article_words = article_words
+        self.stream_chunk_chars = stream_chunk_chars
+        self.recorded = load_recorded_responses(responses_dir) if responses_dir else {}
+        self.calls = {'creator': 0, 'editor': 0, 'decider': 0, 'translator': 0,
+                      'outline': 0, 'section': 0, 'faq': 0, 'editor_diff': 0, 'fix': 0}
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def _delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(-self.latency_jitter, self.latency_jitter) if self.latency_jitter else 0.0
+        return max(0.0, self.latency + jitter)
+
+    def _maybe_fail(self):
+        if self.error_rate and self._random() < self.error_rate:
+            from google.api_core import exceptions as google_exceptions
+            self.errors += 1
+            raise google_exceptions.ServiceUnavailable("FakeModel: 일시적인 오류 (테스트용)")
+
+    def respond(self, prompt):
+        """프롬프트에 맞는 응답 원문을 만듭니다."""
+        role = detect_role(prompt)
+        with self._lock:
+            count = self.calls[role]
+            self.calls[role] += 1
+        if role in self.recorded:
+            responses = self.recorded[role]
+            return responses[count % len(responses)]
+        if role == 'fix':
+            return fix_json_prompt(prompt)
+        if role == 'translator':
+            return translate_prompt(prompt)
+        if role == 'outline':
+            topic = topic_of(prompt)
+            return json.dumps({
+                'title': f'Fake Guide {count}',
+                'meta_description': 'FakeModel로 만든 합성 가이드입니다.',
+                'sections': [{'kind': kind, 'heading': f'{kind.title()} {topic}', 'key_points': [f'{topic} {kind}']}
+                             for kind in SECTION_KINDS],
+            }, ensure_ascii=False)
+        if role == 'faq':
+            return json.dumps({'questions': [
+                {'question': f'FakeModel 질문 {index}?', 'answer': ' '.join(self.make_article(topic_of(prompt), 30).split()[2:])}
+                for index in range(1, 4)
+            ]}, ensure_ascii=False)
+        if role == 'section':
+            heading = prompt.split(SECTION_MARKER, 1)[1].split(']', 1)[0]
+            body = self.make_article(topic_of(prompt), self.article_words // (len(SECTION_KINDS) - 1))
+            link = link_of(prompt)
+            if link and heading.startswith(('Usage', 'Conclusion')):
+                body += f"\n\n[바로 사용해보기]({link})"
+            return f"## {heading}\n\n" + body.split('\n\n', 1)[1]
+        if role == 'editor_diff':
+            # 첫 블록 앞에 제목을 붙이고, 세 블록마다 하나씩 문단을 다시 씁니다.
+            blocks = BLOCK_LABEL_PATTERN.findall(prompt.split('---', 1)[-1])
+            paragraphs = [(number, first_line) for number, first_line in blocks[1:]
+                          if not first_line.startswith('#') and '](' not in first_line]
+            edits = [{'block': int(number), 'original': ' '.join(first_line.split()[:5]),
+                      'replacement': self.make_article(topic_of(prompt + number), 15).split('\n\n', 1)[1]}
+                     for number, first_line in paragraphs[1::3]]
+            if blocks:
+                number, first_line = blocks[0]
+                edits.insert(0, {'block': int(number), 'original': ' '.join(first_line.split()[:5]),
+                                 'replacement': f"## 편집된 가이드\n\n{first_line}"})
+            return json.dumps({'edits': edits}, ensure_ascii=False)
+        if role == 'decider':
+            english = '"approval"' in prompt
+            approved = self._random() < self.approve_rate
+            decision = ('approval' if approved else 'rejection') if english else ('승인' if approved else '반려')
+            return json.dumps({
+                'decision': decision,
+                'reason': 'FakeModel 합성 판단',
+                'final_title': f'Fake Guide {count}',
+            }, ensure_ascii=False)
+        if role == 'creator':
+            text = json.dumps({
+                'title': f'Fake Guide {count}',
+                'meta_description': 'FakeModel로 만든 합성 가이드입니다.',
+                'article_markdown': self.make_guide(topic_of(prompt), link_of(prompt)),
+                'faq_json_ld': {'@context': 'https://schema.org', '@type': 'FAQPage', 'mainEntity': []},
+            }, ensure_ascii=False, indent=2)
+            if self.malformed_rate and self._random() < self.malformed_rate:
+                with self._lock:
+                    text = self._rng.choice(MALFORMATIONS)(text)
+            return text
+        return "## 편집된 가이드\n\n" + self.make_guide(topic_of(prompt), link_of(prompt))
+
+    def make_article(self, topic=None, word_count=None):
+        """합성 본문을 만듭니다. topic이 있으면 그 주제에만 나오는 단어를 섞습니다."""
+        vocabulary = [f'{topic}w{index}' for index in range(8)] if topic else []
+        with self._lock:
+            words = [self._rng.choice(vocabulary) if vocabulary and self._rng.random() < TOPIC_WORD_RATE
+                     else self._rng.choice(ARTICLE_WORDS) for _ in range(word_count or self.article_words)]
+        lines = [' '.join(words[i:i + 15]) for i in range(0, len(words), 15)]
+        return "## Introduction\n\n" + '\n\n'.join(lines)
+
+    def make_guide(self, topic, link=None):
+        """필수 섹션 제목, 기능 링크, FAQ 질문을 갖춘 합성 가이드를 만듭니다. (로컬 검사를 통과하는 형태)"""
+        sections = []
+        for kind in SECTION_KINDS:
+            paragraphs = self.make_article(topic, self.article_words // len(SECTION_KINDS)).split('\n\n')[1:]
+            if kind == 'faq':
+                paragraphs = [f"### FakeModel 질문 {index}?\n\n{paragraph}"
+                              for index, paragraph in enumerate(paragraphs, 1)]
+            if link and kind in ('usage', 'conclusion'):
+                paragraphs.append(f"[바로 사용해보기]({link})")
+            sections.append(f"## {kind.title()}\n\n" + '\n\n'.join(paragraphs))
+        return '\n\n'.join(sections)
+
+    def generate_content(self, prompt, generation_config=None):
+        time.sleep(self._delay())
+        self._maybe_fail()
+        text = self.respond(prompt)
+        return FakeResponse(text, FakeUsage(prompt, text))
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        text = self.respond(prompt)
+        if stream:
+            return FakeStream(text, self.stream_chunk_chars, self.latency / 20 if self.latency else 0)
+        return FakeResponse(text, FakeUsage(prompt, text))
+
+def detect_role(prompt):
+    """프롬프트 내용으로 어떤 Agent의 요청인지 판단합니다. (fix, translator, decider, creator, editor_diff, outline, faq, section, editor)"""
+    if FIX_PROMPT_MARKER in prompt:
+        return 'fix'
+    if TRANSLATOR_MARKER in prompt:
+        return 'translator'
+    if DECIDER_MARKER in prompt:
+        return 'decider'
+    if CREATOR_MARKER in prompt:
+        return 'creator'
+    if EDITOR_DIFF_MARKER in prompt:
+        return 'editor_diff'
+    if OUTLINE_MARKER in prompt:
+        return 'outline'
+    if FAQ_MARKER in prompt:
+        return 'faq'
+    if SECTION_MARKER in prompt:
+        return 'section'
+    return 'editor'
+
+def topic_of(prompt):
+    """프롬프트마다 다른 주제 표시(topic1a2b3c4d 형태)를 만듭니다."""
+    return f'topic{zlib.crc32(prompt.encode("utf-8")):08x}'
+
+def link_of(prompt):
+    """프롬프트에 처음 나오는 easytool.run 링크(기능 명세의 직접 링크나 초안의 링크)를 반환합니다."""
+    match = SITE_LINK_PATTERN.search(prompt)
+    return match.group(0) if match else None
+
+def translate_prompt(prompt):
+    """번역 요청 프롬프트에서 원문을 꺼내 그대로 돌려줍니다. (JSON 원문이면 같은 JSON이 됩니다)"""
+    source = prompt.split(TRANSLATOR_MARKER, 1)[1]
+    return source.split('\n', 1)[1].strip() if '\n' in source else ''
+
+def fix_json_prompt(prompt):
+    """JSON 수정 요청 프롬프트에서 원래 응답을 꺼내 첫 '{'부터 마지막 '}'까지만 돌려줍니다."""
+    start, end = prompt.find('{'), prompt.rfind('}')
+    return prompt[start:end + 1] if 0 <= start < end else prompt
+
+def load_recorded_responses(responses_dir):
+    """responses_dir/{creator,editor,decider}/ 아래의 응답 파일을 Agent별 리스트로 불러옵니다."""
+    recorded = {}
+    for role in ('creator', 'editor', 'decider'):
+        paths = sorted(
+            path for pattern in ('*.txt', '*.json', '*.md')
+            for path in glob.glob(os.path.join(responses_dir, role, pattern))
+        )
+        responses = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                responses.append(f.read())
+        if responses:
+            recorded[role] = responses
+    return recorded
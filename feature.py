@@ -1,34 +1,170 @@
 import json
-import requests # URL 요청을 위해 requests 사용
-from agents import PipelineError  # PipelineError 예외 클래스 import
+import os
+import hashlib
+import threading
+import datetime
+from agents import PipelineError, logger  # PipelineError 예외 클래스 import
 
 # 기본 URL 구조
 BASE_FEATURES_URL = "https://easytool.run/features/{}.json"
 
+# 내려받은 기능 명세를 보관하는 폴더 (features/{locale}.json)
+FEATURES_CACHE_DIR = "features"
+
+# (연결, 응답 읽기) 시간 제한(초)
+REQUEST_TIMEOUT = (5, 30)
+
+# 연결 오류나 일시적인 서버 오류 시 재시도 설정
+MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
 def get_features_url(locale='ko'):
     """언어에 따라 알맞은 기능 명세 URL을 반환합니다."""
     return BASE_FEATURES_URL.format(locale)
 
-def fetch_features_from_url(locale='ko'):
-    """지정된 언어로 기능 명세 JSON을 불러옵니다."""
-    url = get_features_url(locale)
-    print(f"🌐 {url} 에서 {locale} 언어의 최신 기능 명세를 불러옵니다...")
+def get_session():
+    """연결을 재사용하고 재시도 정책이 적용된 공용 requests.Session을 반환합니다."""
+    global _session
+    # requests는 불러오는 데 시간이 걸리므로 네트워크를 실제로 사용할 때 불러옵니다.
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=MAX_RETRIES,
+                backoff_factor=RETRY_BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=frozenset(['GET']),
+            )
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(max_retries=retry))
+            session.mount('http://', HTTPAdapter(max_retries=retry))
+            _session = session
+        return _session
+
+def parse_features(features_data):
+    """기능 명세 JSON에서 기능 목록을 꺼냅니다. 형식이 맞지 않으면 PipelineError를 발생시킵니다."""
+    if not isinstance(features_data, dict) or not isinstance(features_data.get('features'), list):
+        raise PipelineError("JSON 포맷 오류: 'features' 키가 없거나 리스트 형태가 아닙니다.")
+    return features_data['features']
+
+def feature_spec_hash(feature):
+    """기능 명세 하나의 내용 해시(SHA-256)를 반환합니다. 키 순서가 달라도 같은 값이 나옵니다."""
+    payload = json.dumps(feature, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_cache_paths(locale, cache_dir=FEATURES_CACHE_DIR):
+    """언어별 캐시 본문 파일과 메타데이터(ETag, Last-Modified) 파일 경로를 반환합니다."""
+    return (os.path.join(cache_dir, f"{locale}.json"),
+            os.path.join(cache_dir, f"{locale}.meta.json"))
+
+def read_cached_features(locale, cache_dir=FEATURES_CACHE_DIR):
+    """캐시된 (본문, 메타데이터)를 반환합니다. 없거나 읽을 수 없으면 (None, {})를 반환합니다."""
+    body_path, meta_path = get_cache_paths(locale, cache_dir)
+    try:
+        with open(body_path, 'r', encoding='utf-8') as f:
+            body = f.read()
+    except OSError:
+        return None, {}
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        meta = {}
+    return body, meta
+
+def write_cached_features(locale, body, meta, cache_dir=FEATURES_CACHE_DIR):
+    """본문과 메타데이터를 임시 파일에 쓴 뒤 교체하여, 중간에 중단돼도 캐시가 깨지지 않게 저장합니다."""
+    os.makedirs(cache_dir, exist_ok=True)
+    for path, content in zip(get_cache_paths(locale, cache_dir),
+                             (body, json.dumps(meta, ensure_ascii=False, indent=2))):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+def load_features_file(path):
+    """로컬 파일에서 기능 명세 JSON을 불러옵니다."""
+    print(f"📄 {path} 파일에서 기능 명세를 불러옵니다...")
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        features_data = response.json()
+        with open(path, 'r', encoding='utf-8') as f:
+            features = parse_features(json.load(f))
+    except OSError as e:
+        raise PipelineError(f"파일 오류: 기능 명세 파일을 읽을 수 없습니다. {e}")
+    except json.JSONDecodeError:
+        raise PipelineError(f"JSON 파싱 오류: {path} 파일이 유효한 JSON 형식이 아닙니다.")
+    print("✅ 기능 명세 로딩 완료!")
+    return features
 
-        if 'features' not in features_data or not isinstance(features_data['features'], list):
-            raise PipelineError("JSON 포맷 오류: 'features' 키가 없거나 리스트 형태가 아닙니다.")
+def fetch_features_from_url(locale='ko', url=None, cache_dir=FEATURES_CACHE_DIR):
+    """
+    지정된 언어로 기능 명세 JSON을 불러옵니다.
+    캐시된 사본이 있으면 ETag/Last-Modified 조건부 요청을 보내 변경된 경우에만 내려받고,
+    네트워크 오류가 나면 캐시된 사본으로 대신합니다.
+    """
+    url = url or get_features_url(locale)
+    print(f"🌐 {url} 에서 {locale} 언어의 최신 기능 명세를 불러옵니다...")
+    cached_body, meta = read_cached_features(locale, cache_dir)
 
-        print("✅ 기능 명세 로딩 완료!")
-        return features_data['features']
+    headers = {}
+    if cached_body is not None and meta.get('url') == url:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
 
+    import requests
+    try:
+        response = get_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code != 304:
+            response.raise_for_status()
     except requests.exceptions.RequestException as e:
-        raise PipelineError(f"네트워크 오류: 기능 명세를 불러올 수 없습니다. {e}")
-    except json.JSONDecodeError:
-        raise PipelineError("JSON 파싱 오류: 응답이 유효한 JSON 형식이 아닙니다.")
+        if cached_body is None:
+            raise PipelineError(f"네트워크 오류: 기능 명세를 불러올 수 없습니다. {e}")
+        logger.warning(f"기능 명세를 불러오지 못해 저장된 사본을 사용합니다 ({locale}): {e}")
+        print(f"⚠️ 네트워크 오류로 저장된 기능 명세를 사용합니다. (저장 시각: {meta.get('fetched_at', '알 수 없음')})")
+        try:
+            return parse_features(json.loads(cached_body))
+        except json.JSONDecodeError:
+            raise PipelineError(f"네트워크 오류: 기능 명세를 불러올 수 없고 저장된 사본도 손상되었습니다. {e}")
+
+    # 본문은 요청과 따로 파싱합니다. requests 2.32부터 response.json()의 파싱 오류는 RequestException이기도 해서,
+    # 함께 잡으면 잘못된 응답이 네트워크 오류로 처리되고 저장된 사본으로 조용히 넘어갑니다.
+    if response.status_code == 304:
+        print("✅ 기능 명세가 변경되지 않아 저장된 사본을 사용합니다.")
+        try:
+            return parse_features(json.loads(cached_body))
+        except ValueError:
+            raise PipelineError("JSON 파싱 오류: 저장된 기능 명세 사본이 유효한 JSON 형식이 아닙니다.")
+    try:
+        features = parse_features(json.loads(response.content))
+    except ValueError as e:
+        raise PipelineError(f"JSON 파싱 오류: 응답이 유효한 JSON 형식이 아닙니다. {e}")
+
+    try:
+        write_cached_features(locale, response.text, {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        }, cache_dir)
+    except OSError as e:
+        # 캐시 저장 실패는 이번 실행에 영향을 주지 않습니다.
+        logger.warning(f"기능 명세 캐시 저장 실패 ({locale}): {e}")
+
+    print("✅ 기능 명세 로딩 완료!")
+    return features
 
-# 이전 코드는 삭제
-# FEATURES_TEXT = """
-#"""
+def load_features(locale='ko', features_file=None):
+    """
+    기능 명세를 불러옵니다. features_file이 있으면 URL 대신 로컬 파일을 사용합니다.
+    경로에 {locale}이 있으면 언어 코드로 바꿔 언어별 파일을 읽습니다. (예: specs/{locale}.json)
+    """
+    if features_file:
+        return load_features_file(features_file.replace('{locale}', locale))
+    return fetch_features_from_url(locale)
@@ -0,0 +1,331 @@
+# json_repair.py
+"""
+AI가 반환한 깨진 JSON을 한 번의 순회로 복구하는 모듈입니다.
+
+문자열 안/밖 상태와 괄호 스택을 추적하면서 다음 문제를 동시에 고칩니다.
+- 허용되지 않는 이스케이프 시퀀스(\\e, \\x, \\* 등) → 백슬래시 제거
+- 문자열 안의 날 제어 문자(줄바꿈, 탭 등) → 이스케이프, 그 밖의 제어 문자 → 제거
+- 문자열 안의 이스케이프되지 않은 따옴표 → 이스케이프
+- 값 사이에 누락된 콤마 → 추가, 닫는 괄호 앞의 남는 콤마 → 제거
+- 따옴표 없는 키 → 따옴표 추가, 짝이 맞지 않거나 누락된 괄호 → 균형 맞춤
+- JSON 앞뒤의 설명 문장이나 코드 블록 표시(```) → 무시
+
+결과는 리스트 버퍼에 모았다가 마지막에 한 번만 합치므로 긴 본문에서도 선형 시간에 동작합니다.
+"""
+import re
+
+# JSON 문자열에서 백슬래시 뒤에 올 수 있는 문자 (\uXXXX는 따로 검사)
+VALID_ESCAPES = frozenset('"\\/bfnrt')
+HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+# 문자열 안에 그대로 들어오면 이스케이프해 주는 제어 문자
+CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t', '\b': '\\b', '\f': '\\f'}
+
+WHITESPACE = frozenset(' \t\n\r')
+# 문자열 안에서 특별한 처리가 필요 없는 문자들의 연속 구간
+PLAIN_STRING_RUN = re.compile(r'[^"\\\x00-\x1f\x7f]+')
+BARE_TOKEN_PATTERN = re.compile(r'[^\s,:\[\]{}"]+')
+NUMBER_PATTERN = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?\Z')
+KEY_AHEAD_PATTERN = re.compile(r'"(?:[^"\\\n]|\\.){0,200}"\s*:')
+BARE_KEY_AHEAD_PATTERN = re.compile(r'[A-Za-z_][\w-]*\s*:')
+LITERALS = {'true': 'true', 'false': 'false', 'null': 'null',
+            'True': 'true', 'False': 'false', 'None': 'null'}
+CLOSERS = {'{': '}', '[': ']'}
+
+def _skip_whitespace(text, pos):
+    length = len(text)
+    while pos < length and text[pos] in WHITESPACE:
+        pos += 1
+    return pos
+
+def _closes_string(text, quote_pos, is_key, container):
+    """
+    문자열 안에서 만난 따옴표가 문자열의 끝인지, 본문에 포함된 따옴표인지 판단합니다.
+    따옴표 다음에 오는 문자가 JSON 문법상 자연스러운 경우에만 문자열의 끝으로 봅니다.
+    """
+    pos = _skip_whitespace(text, quote_pos + 1)
+    if pos >= len(text):
+        return True
+    next_char = text[pos]
+    if is_key:
+        return next_char in ':,}'
+    if next_char in '}]':
+        return True
+    if next_char == ',':
+        after = _skip_whitespace(text, pos + 1)
+        if after >= len(text):
+            return True
+        if container == '{':
+            return (text[after] == '}'
+                    or bool(KEY_AHEAD_PATTERN.match(text, after))
+                    or bool(BARE_KEY_AHEAD_PATTERN.match(text, after)))
+        return True
+    if next_char == '"':
+        # 콤마가 빠진 채 다음 키/값이 이어지는 경우
+        return container == '[' or bool(KEY_AHEAD_PATTERN.match(text, pos))
+    if container == '{' and '\n' in text[quote_pos + 1:pos]:
+        # 콤마가 빠진 채 다음 줄에 따옴표 없는 키가 이어지는 경우
+        return bool(BARE_KEY_AHEAD_PATTERN.match(text, pos))
+    return False
+
+def repair_json(text):
+    """
+    깨진 JSON 문자열을 json.loads로 파싱할 수 있는 형태로 복구해 반환합니다.
+    JSON 시작 문자('{' 또는 '[')가 없으면 원문을 그대로 반환합니다.
+    """
+    start = -1
+    for pos, char in enumerate(text):
+        if char == '{' or char == '[':
+            start = pos
+            break
+    if start < 0:
+        return text
+
+    out = []
+    stack = []
+    # 직전에 나온 토큰: 'open'(여는 괄호), 'key', 'colon', 'value', 'comma'
+    last = None
+    last_comma_index = -1
+    in_string = False
+    string_is_key = False
+    length = len(text)
+    pos = start
+
+    def close_pending():
+        """닫는 괄호/콤마를 쓰기 전에 빈 값, 남는 콤마를 정리합니다."""
+        if last == 'comma' and last_comma_index >= 0:
+            out[last_comma_index] = ''
+        elif last == 'colon':
+            out.append('null')
+        elif last == 'key':
+            out.append(':null')
+
+    while pos < length:
+        char = text[pos]
+
+        if in_string:
+            run = PLAIN_STRING_RUN.match(text, pos)
+            if run:
+                # 일반 문자 구간은 한 번에 복사
+                out.append(run.group(0))
+                pos = run.end()
+                continue
+            if char == '\\':
+                next_char = text[pos + 1] if pos + 1 < length else ''
+                if next_char in VALID_ESCAPES:
+                    out.append(text[pos:pos + 2])
+                    pos += 2
+                elif next_char == 'u' and pos + 6 <= length and all(c in HEX_DIGITS for c in text[pos + 2:pos + 6]):
+                    out.append(text[pos:pos + 6])
+                    pos += 6
+                else:
+                    # 허용되지 않는 이스케이프는 백슬래시만 제거하고 다음 문자는 일반 문자로 처리
+                    pos += 1
+                continue
+            if char == '"':
+                if _closes_string(text, pos, string_is_key, stack[-1] if stack else None):
+                    out.append('"')
+                    in_string = False
+                    last = 'key' if string_is_key else 'value'
+                else:
+                    out.append('\\"')
+                pos += 1
+                continue
+            # 제어 문자
+            out.append(CONTROL_ESCAPES.get(char, ''))
+            pos += 1
+            continue
+
+        # --- 문자열 바깥 ---
+        if char in WHITESPACE:
+            end = _skip_whitespace(text, pos)
+            out.append(text[pos:end])
+            pos = end
+            continue
+
+        starts_value = char == '"' or char == '{' or char == '[' or not (char in '}],:' or char < ' ' or char == '\x7f')
+        if starts_value and last == 'value':
+            # 값 사이에 빠진 콤마
+            last_comma_index = len(out)
+            out.append(',')
+            last = 'comma'
+        container = stack[-1] if stack else None
+        expects_key = container == '{' and last in ('open', 'comma')
+
+        if char == '"':
+            if last == 'key':
+                out.append(':')
+                last = 'colon'
+            string_is_key = expects_key
+            in_string = True
+            out.append('"')
+        elif char == '{' or char == '[':
+            if last == 'key':
+                out.append(':')
+            stack.append(char)
+            out.append(char)
+            last = 'open'
+        elif char == '}' or char == ']':
+            if char == '}':
+                opener = '{'
+            else:
+                opener = '['
+            if opener in stack:
+                # 짝이 맞지 않는 괄호가 사이에 있으면 먼저 닫아 줍니다.
+                while stack:
+                    close_pending()
+                    top = stack.pop()
+                    out.append(CLOSERS[top])
+                    last = 'value'
+                    if top == opener:
+                        break
+                if not stack:
+                    break
+            # 여는 괄호가 없는 닫는 괄호는 버립니다.
+        elif char == ',':
+            if last == 'colon':
+                out.append('null')
+            elif last == 'key':
+                out.append(':null')
+            if last in ('value', 'colon', 'key'):
+                last_comma_index = len(out)
+                out.append(',')
+                last = 'comma'
+            # 여는 괄호 직후나 연속된 콤마는 버립니다.
+        elif char == ':':
+            if last == 'key':
+                out.append(':')
+                last = 'colon'
+        elif char < ' ' or char == '\x7f':
+            pass
+        else:
+            match = BARE_TOKEN_PATTERN.match(text, pos)
+            token = match.group(0)
+            if last == 'key':
+                out.append(':')
+            if expects_key:
+                out.append('"' + token.replace('\\', '\\\\').replace('"', '\\"') + '"')
+                last = 'key'
+            else:
+                if token in LITERALS:
+                    out.append(LITERALS[token])
+                elif NUMBER_PATTERN.match(token):
+                    out.append(token)
+                else:
+                    out.append('"' + token.replace('\\', '\\\\').replace('"', '\\"') + '"')
+                last = 'value'
+            pos = match.end()
+            continue
+        pos += 1
+
+    # 잘린 응답: 열린 문자열과 괄호를 닫아 줍니다.
+    if in_string:
+        out.append('"')
+        last = 'key' if string_is_key else 'value'
+    while stack:
+        close_pending()
+        out.append(CLOSERS[stack.pop()])
+        last = 'value'
+    return ''.join(out)
+
+SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+
+class IncrementalFieldExtractor:
+    """
+    스트리밍으로 도착하는 JSON 응답에서 특정 문자열 필드(예: article_markdown)의 값을
+    조각이 도착하는 대로 디코딩합니다. 필드 값이 끝났는지는 complete로 확인할 수 있습니다.
+
+    값 안의 따옴표가 문자열의 끝인지는 다음 문자(',' 또는 '}')를 보고 판단하므로,
+    이스케이프되지 않은 따옴표가 섞여 있어도 값이 중간에 잘리지 않습니다.
+    """
+
+    def __init__(self, field_name):
+        self._key_pattern = re.compile(r'"' + re.escape(field_name) + r'"\s*:\s*"')
+        self._buffer = ''
+        self._pos = 0
+        self._parts = []
+        self._pending_quote = False
+        self.started = False
+        self.complete = False
+
+    @property
+    def value(self):
+        """지금까지 디코딩된 필드 값"""
+        return ''.join(self._parts)
+
+    def feed(self, chunk):
+        """응답 조각을 추가하고, 이번 조각으로 새로 디코딩된 텍스트를 반환합니다."""
+        if self.complete:
+            return ''
+        self._buffer += chunk
+        if not self.started:
+            match = self._key_pattern.search(self._buffer)
+            if not match:
+                # 키가 조각 경계에 걸칠 수 있으므로 끝부분만 남깁니다.
+                self._buffer = self._buffer[-200:]
+                return ''
+            self.started = True
+            self._pos = match.end()
+
+        decoded = []
+        buffer = self._buffer
+        length = len(buffer)
+        pos = self._pos
+        while pos < length:
+            if self._pending_quote:
+                next_pos = _skip_whitespace(buffer, pos)
+                if next_pos >= length:
+                    break
+                if buffer[next_pos] in ',}':
+                    self.complete = True
+                    break
+                # 본문에 포함된 따옴표였음
+                decoded.append('"')
+                self._pending_quote = False
+                continue
+            run = PLAIN_STRING_RUN.match(buffer, pos)
+            if run:
+                decoded.append(run.group(0))
+                pos = run.end()
+                continue
+            char = buffer[pos]
+            if char == '"':
+                self._pending_quote = True
+                pos += 1
+                continue
+            if char == '\\':
+                if pos + 1 >= length:
+                    break
+                next_char = buffer[pos + 1]
+                if next_char == 'u':
+                    if pos + 6 > length:
+                        break
+                    digits = buffer[pos + 2:pos + 6]
+                    if all(c in HEX_DIGITS for c in digits):
+                        code = int(digits, 16)
+                        if 0xD800 <= code <= 0xDBFF:
+                            # 서로게이트 쌍(\ud83d\ude00 등)은 뒤쪽 절반까지 도착해야 합칠 수 있습니다.
+                            if pos + 12 > length:
+                                break
+                            low = buffer[pos + 8:pos + 12]
+                            if buffer[pos + 6:pos + 8] == '\\u' and all(c in HEX_DIGITS for c in low) \
+                                    and 0xDC00 <= int(low, 16) <= 0xDFFF:
+                                code = 0x10000 + ((code - 0xD800) << 10) + (int(low, 16) - 0xDC00)
+                                pos += 6
+                        decoded.append(chr(code))
+                        pos += 6
+                        continue
+                decoded.append(SIMPLE_ESCAPES.get(next_char, next_char))
+                pos += 2
+                continue
+            # 문자열 안의 날 제어 문자는 그대로 둡니다.
+            decoded.append(char)
+            pos += 1
+
+        # 처리한 부분은 버퍼에서 제거해 메모리를 일정하게 유지합니다.
+        self._buffer = buffer[pos:]
+        self._pos = 0
+        text = ''.join(decoded)
+        if text:
+            self._parts.append(text)
+        return text
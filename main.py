@@ -2,124 +2,1089 @@
 import json
 import logging
 import argparse
+import asyncio
 import os
+import signal
+import socket
+import time
 from db_handler import (
-    db_connect, get_published_tool_names, create_pipeline_entry,
-    update_pipeline_step, save_approved_article
+    db_connect, get_published_spec_hashes, get_duplicate_rejected_spec_hashes, backfill_spec_hashes,
+    create_pipeline_entry, update_pipeline_step, save_decider_result, get_unfinished_pipelines,
+    save_agent_metrics, get_article_documents, get_published_article, async_database,
+    enqueue_jobs, claim_job, renew_job_lease, finish_job, fail_job, release_job, get_job_counts,
+    JOB_LEASE_SECONDS, set_payload_compression, get_db_stats, prune_pipeline_logs, compress_pipeline_payloads,
+    vacuum_database, PAYLOAD_CODECS, ARCHIVE_DB_NAME, DEFAULT_RETENTION_DAYS
 )
+import metrics
+from migrations import migrate
 from agents import (
-    setup_gemini, run_ai_agent, PipelineError, logger
+    setup_model, configure_logging, MODEL_PROVIDERS, DEFAULT_MODEL_NAME, run_ai_agent_async, RateLimitedModel, PipelineError, logger,
+    DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE, DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_TIMEOUT_SECONDS
 )
-from feature import fetch_features_from_url, get_features_url
+from feature import load_features, feature_spec_hash
+from cache import ResponseCache, CachedModel, track_cache_keys
+from json_repair import IncrementalFieldExtractor
+from prompt_registry import (
+    get_registry, PROMPT_NAMES, TRANSLATION_PROMPT_NAMES, SECTION_PROMPT_NAMES, EDITOR_DIFF_PROMPT_NAMES
+)
+from schemas import CREATOR_SCHEMA, DECISION_VALUES, decider_schema
+from similarity import DuplicateDetector, DECIDER_CONTEXT_K, MAX_BODY_CHARS
+from translator import translate_article
+from section_writer import write_article
+from editor_diff import edit_with_diff
+from validation import check_article, ensure_faq_json_ld, format_problem_notes
+from exporter import export_articles, EXPORT_DIR, EXPORT_FORMATS, DEFAULT_BASE_URL
 
-# 로거 가져오기 - agents.py에서 이미 설정됨
+# 로거 가져오기 - 파일 기록 설정은 main()에서 configure_logging()으로 합니다.
 logger = logging.getLogger('easytool')
 
-def load_prompt(prompt_name, locale='ko'):
-    """지정된 이름과 언어의 프롬프트 파일을 읽어옵니다."""
-    # 언어별 경로 설정
-    file_path = f"prompts/{locale}/{prompt_name}.md"
-    
-    # 언어별 파일이 있으면 사용, 없으면 기본 파일 사용
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        fallback_path = f"prompts/{prompt_name}.md"
-        try:
-            with open(fallback_path, 'r', encoding='utf-8') as f:
-                logger.warning(f"{locale} 언어 프롬프트 파일이 없어 기본 파일을 사용합니다: {fallback_path}")
-                return f.read()
-        except FileNotFoundError:
-            error_msg = f"프롬프트 파일을 찾을 수 없습니다: {file_path} 또는 {fallback_path}"
-            logger.error(error_msg)
-            raise PipelineError(error_msg)
-
-def select_new_topic(all_features, published_tools):
-    """발행되지 않은 새로운 주제(기능)를 선택합니다."""
-    available_tools = [f for f in all_features if isinstance(f, dict) and f.get('name') not in published_tools]
+# 지원하는 콘텐츠 언어
+SUPPORTED_LOCALES = ('ko', 'en')
+
+# 배치 모드에서 동시에 처리할 기본 주제 수
+DEFAULT_CONCURRENCY = 3
+
+# 스트리밍 모드에서 초안을 'pipeline_logs'에 중간 저장하는 간격(새로 받은 글자 수)
+DRAFT_CHECKPOINT_CHARS = 2000
+
+# report 명령의 출력 형식과 기본 저장 파일
+REPORT_FORMATS = ('text', 'json', 'prometheus')
+DEFAULT_REPORT_FILES = {'json': 'easytool_metrics.json', 'prometheus': 'easytool_metrics.prom'}
+
+# worker 모드: 대기열이 비었을 때 다시 확인하는 간격(초), 기능 명세와 중복 검사 색인을 새로 불러오는 간격(초)
+DEFAULT_POLL_SECONDS = 5.0
+CONTEXT_REFRESH_SECONDS = 600
+
+# 파이프라인 실행 옵션 기본값
+DEFAULT_PIPELINE_OPTIONS = {
+    'stream': False,
+    'features_file': None,
+    # 발행된 글과 거의 같은 주제/내용을 모델 호출 전에 반려할지 여부
+    'duplicate_check': True,
+    # 새 주제마다 동시에 만들 후보 글 수 (2 이상이면 먼저 승인된 후보를 쓰고 나머지는 취소)
+    'candidates': 1,
+    # 이 언어로 승인된 글이 있으면 새로 쓰지 않고 번역한 뒤 최종결정자 확인만 받습니다. (None이면 사용 안 함)
+    'translate_from': None,
+    # 작성자 대신 개요를 먼저 받고 섹션을 동시에 작성해 이어 붙입니다. (작성자 스트리밍은 사용하지 않음)
+    'sections': False,
+    # 편집자에게 글 전체 대신 고칠 블록만 받아 적용합니다. (적용되지 않으면 전체 다시 쓰기)
+    'editor_diff': False,
+    # 최종결정자 호출 전에 링크, 분량, 브랜드 언급, 섹션, FAQ 구조화 데이터를 로컬 규칙으로 검사할지 여부
+    'validation': True,
+}
+
+# 로컬 검사에 걸린 편집본을 편집자에게 다시 고치게 하는 최대 횟수 (그래도 남으면 LOCAL_REJECTED로 반려)
+LOCAL_REPAIR_ATTEMPTS = 1
+
+# 후보 글마다 작성자에게 줄 temperature (첫 번째 후보는 기본 설정을 그대로 사용)
+CANDIDATE_TEMPERATURES = (0.7, 1.3, 0.4, 1.6)
+
+def load_prompts(locale='ko'):
+    """
+    파이프라인에 필요한 모든 프롬프트(작성자, 편집자, 최종결정자)를 언어별로 반환합니다.
+    템플릿은 프롬프트 레지스트리에 한 번만 불러와 컴파일되며, 파일이 바뀌면 자동으로 다시 불러옵니다.
+    """
+    return get_registry().for_locale(locale)
+
+def diff_catalog(all_features, published_hashes):
+    """
+    새로 불러온 기능 명세를 발행된 글의 명세 해시({tool_name: spec_hash})와 비교합니다.
+    반환값은 new(새 기능), changed(명세가 바뀐 기능) 기능 명세 리스트와
+    unchanged(변경 없음), removed(명세에서 사라진 기능) 이름 리스트를 담은 dict입니다.
+    해시가 기록되지 않은 기존 글은 변경 없음으로 간주합니다.
+    """
+    diff = {'new': [], 'changed': [], 'unchanged': [], 'removed': []}
+    catalog_names = set()
+    for feature in all_features:
+        if not isinstance(feature, dict):
+            continue
+        name = feature.get('name')
+        catalog_names.add(name)
+        if name not in published_hashes:
+            diff['new'].append(feature)
+        elif published_hashes[name] is not None and published_hashes[name] != feature_spec_hash(feature):
+            diff['changed'].append(feature)
+        else:
+            diff['unchanged'].append(name)
+    diff['removed'] = [name for name in published_hashes if name not in catalog_names]
+    return diff
+
+def select_new_topics(all_features, published_hashes, limit=None, rejected_hashes=None):
+    """
+    발행되지 않았거나 발행 후 명세가 바뀐 주제(기능)를 최대 limit개까지 선택합니다.
+    limit이 None이면 전부 반환합니다.
+    rejected_hashes({tool_name: {spec_hash, ...}})에 있는 주제는 같은 명세로 중복 반려된 적이 있으므로 건너뜁니다.
+    """
+    rejected_hashes = rejected_hashes or {}
+    available_tools = [
+        f for f in all_features
+        if isinstance(f, dict) and (f.get('name') not in published_hashes
+                                    or published_hashes[f['name']] not in (None, feature_spec_hash(f)))
+        and feature_spec_hash(f) not in rejected_hashes.get(f.get('name'), ())
+    ]
+    return available_tools if limit is None else available_tools[:limit]
+
+def select_new_topic(all_features, published_hashes, rejected_hashes=None):
+    """발행되지 않았거나 명세가 바뀐 주제(기능)를 하나 선택합니다."""
+    available_tools = select_new_topics(all_features, published_hashes, limit=1, rejected_hashes=rejected_hashes)
     return available_tools[0] if available_tools else None
 
-def run_pipeline(conn, model, locale='ko'):
+async def run_editor(model, prompts, draft, options, notes=''):
     """
-    콘텐츠 생성의 전체 파이프라인을 순차적으로 실행하고 관리합니다.
+    편집자를 실행해 (편집본, diff 편집 목록 또는 None)을 반환합니다.
+    notes(로컬 검사에서 찾은 문제 목록)가 있으면 편집자 프롬프트 끝에 붙여 함께 고치게 합니다.
     """
+    if options['editor_diff']:
+        return await edit_with_diff(model, prompts, draft, notes)
+    return await run_ai_agent_async(model, "편집자", prompts['editor'].format(draft_content=draft) + notes), None
+
+def draft_problem_notes(creator_draft, selected_tool, locale, options, label):
+    """작성자 초안의 로컬 검사 문제를 편집자 프롬프트에 붙일 형태로 반환합니다. (검사를 끄거나 문제가 없으면 빈 문자열)"""
+    if not options['validation']:
+        return ''
+    problems = check_article(creator_draft, selected_tool, locale)
+    if problems:
+        print(f"   🧹 '{label}' 초안의 로컬 검사 문제 {len(problems)}개"
+              f"({', '.join(rule for rule, _ in problems)})를 편집자에게 함께 전달합니다.")
+    return format_problem_notes(problems, locale)
+
+def local_problems(editor_revision, article_meta_data, selected_tool, locale):
+    """
+    편집본의 로컬 검사 문제를 [(규칙 이름, 설명), ...]으로 반환합니다.
+    FAQ 구조화 데이터가 잘못되었으면 본문 FAQ로 다시 만들어 article_meta_data를 고치고, 그럴 수 없을 때만 문제로 셉니다.
+    """
+    problems = check_article(editor_revision, selected_tool, locale)
+    faq_problem = ensure_faq_json_ld(editor_revision, article_meta_data, locale)
+    return problems + [faq_problem] if faq_problem else problems
+
+async def enforce_local_rules(model, prompts, selected_tool, locale, editor_revision, article_meta_data, options):
+    """
+    최종결정자 호출 전에 편집본을 로컬 규칙으로 검사합니다. 문제가 있으면 편집자에게 문제 목록과 함께
+    LOCAL_REPAIR_ATTEMPTS번까지 다시 고치게 하고, (편집본, 남은 문제 리스트, 다시 고쳤는지 여부)를 반환합니다.
+    """
+    problems = local_problems(editor_revision, article_meta_data, selected_tool, locale)
+    repaired = False
+    for _ in range(LOCAL_REPAIR_ATTEMPTS):
+        if not problems:
+            break
+        print(f"\n🧹 '{selected_tool['name']}' 편집본의 로컬 검사 문제 {len(problems)}개"
+              f"({', '.join(rule for rule, _ in problems)})를 편집자에게 고치도록 요청합니다.")
+        editor_revision, _ = await run_editor(model, prompts, editor_revision, options,
+                                              format_problem_notes(problems, locale))
+        repaired = True
+        problems = local_problems(editor_revision, article_meta_data, selected_tool, locale)
+    return editor_revision, problems, repaired
+
+def edits_json(edits):
+    """'pipeline_logs.editor_diff_json'에 저장할 편집 목록 JSON입니다. (전체 다시 쓰기면 None)"""
+    return json.dumps(edits, ensure_ascii=False) if edits is not None else None
+
+async def stream_creator_draft(db, model, pipeline_id, creator_prompt, prompts, options, selected_tool, locale):
+    """
+    작성자 응답을 스트리밍으로 받으면서 article_markdown을 'pipeline_logs'에 중간 저장합니다.
+    본문 필드가 완성되는 즉시 초안의 로컬 검사 문제와 함께 편집자 호출을 먼저 시작하며,
+    (작성자 결과, 편집자 Task 또는 None)을 반환합니다.
+    편집자 Task의 결과는 run_editor()와 같은 (편집본, diff 편집 목록 또는 None)입니다.
+    """
+    extractor = IncrementalFieldExtractor('article_markdown')
+    state = {'decoded': 0, 'checkpointed': 0, 'draft': None, 'editor_task': None}
+
+    def on_chunk(text):
+        state['decoded'] += len(extractor.feed(text))
+        if extractor.complete and state['editor_task'] is None:
+            draft = extractor.value
+            state['draft'] = draft
+            db.submit(update_pipeline_step, pipeline_id, creator_draft=draft, status='DRAFT_STREAMING')
+            print(f"\n[AGENT: 편집자] 초안 본문이 완성되어 편집을 먼저 시작합니다. (파이프라인 ID: {pipeline_id})")
+            notes = draft_problem_notes(draft, selected_tool, locale, options, selected_tool['name'])
+            state['editor_task'] = asyncio.create_task(run_editor(model, prompts, draft, options, notes))
+        elif state['decoded'] - state['checkpointed'] >= DRAFT_CHECKPOINT_CHARS:
+            state['checkpointed'] = state['decoded']
+            # 중간 저장은 기다리지 않고 쓰기 스레드에 예약만 합니다.
+            db.submit(update_pipeline_step, pipeline_id, creator_draft=extractor.value, status='DRAFT_STREAMING')
+
     try:
-        # 1. 프롬프트 로딩 및 주제 선정 (언어별로 로드)
-        CREATOR_PROMPT = load_prompt('creator', locale)
-        EDITOR_PROMPT = load_prompt('editor', locale)
-        DECIDER_PROMPT = load_prompt('decider', locale)
-        
-        # 지정된 언어로 기능 명세 및 발행된 도구 목록 가져오기
-        features_json = fetch_features_from_url(locale)  # 여기에서 이미 메시지를 출력함
-        published_tools = get_published_tool_names(conn, locale)
-        
-        selected_tool = select_new_topic(features_json, published_tools)
-        
-        if not selected_tool:
-            print(f"🎉 {locale} 언어에 대한 모든 주제의 글 작성이 완료되었습니다!")
-            return 'COMPLETE'
+        creator_result = await run_ai_agent_async(model, "작성자", creator_prompt, is_json_output=True, on_chunk=on_chunk,
+                                                  response_schema=CREATOR_SCHEMA)
+    except BaseException:
+        if state['editor_task']:
+            state['editor_task'].cancel()
+        raise
 
-        print(f"🚀 이번에 작성할 {locale} 콘텐츠 주제는 '{selected_tool['name']}' 입니다.")
-        
-        # 2. 파이프라인 시작 및 ID 생성
-        pipeline_id = create_pipeline_entry(conn, selected_tool['name'], locale)
-        print(f"파이프라인 시작 (ID: {pipeline_id}, 언어: {locale})")
-        logger.info(f"파이프라인 시작 (ID: {pipeline_id}, 주제: {selected_tool['name']}, 언어: {locale})")
+    editor_task = state['editor_task']
+    if editor_task and creator_result.get('article_markdown') != state['draft']:
+        # 스트리밍 중 추출한 본문이 최종 파싱 결과와 다르면 미리 시작한 편집은 버리고 다시 요청합니다.
+        logger.warning(f"파이프라인 ID {pipeline_id}: 스트리밍 초안이 최종 결과와 달라 편집을 다시 시작합니다.")
+        editor_task.cancel()
+        editor_task = None
+    return creator_result, editor_task
 
-        # 3. Agent 파이프라인 순차 실행
-        # Step 1: 작성자
-        agent_name = "작성자"
-        print(f"\n[AGENT: {agent_name}] 작업을 시작합니다...")
-        creator_result = run_ai_agent(model, agent_name, CREATOR_PROMPT.format(**selected_tool), is_json_output=True)
-        creator_draft = creator_result['article_markdown']
-        article_meta_data = {
-            "title": creator_result.get('title', selected_tool['name']),
+def candidate_generation_config(index):
+    """
+    후보 글별 작성자 생성 설정입니다. 후보마다 temperature를 달리해 서로 다른 초안을 받고,
+    응답 캐시 키도 달라지게 합니다. (첫 번째 후보는 후보 기능을 쓰지 않을 때와 같은 설정)
+    """
+    if index == 0:
+        return None
+    return {"temperature": CANDIDATE_TEMPERATURES[(index - 1) % len(CANDIDATE_TEMPERATURES)]}
+
+def is_approved(decider_judgment, locale):
+    return decider_judgment.get('decision') == DECISION_VALUES[locale][0]
+
+def build_decider_prompt(prompts, selected_tool, editor_revision, similar_titles):
+    return prompts['decider'].format(
+        edited_content=editor_revision,
+        existing_articles_list=str(similar_titles),
+        **selected_tool
+    )
+
+async def run_candidate(model, selected_tool, prompts, duplicates, locale, index, options):
+    """
+    후보 글 하나의 작성자 → 편집자 → (중복 검사, 로컬 검사) → 최종결정자 단계를 실행합니다.
+    DB에는 쓰지 않으며, 초안/메타데이터/편집본/결정(중복이거나 로컬 검사에 걸리면 None)/중복 여부/로컬 검사 문제를
+    dict로 반환합니다.
+    """
+    tool_name = selected_tool['name']
+    label = f"{tool_name} 후보 #{index + 1}"
+    print(f"\n[AGENT: 작성자] '{label}' 작업을 시작합니다...")
+    if options['sections']:
+        creator_result = await write_article(model, prompts, selected_tool, candidate_generation_config(index))
+    else:
+        creator_result = await run_ai_agent_async(model, "작성자", prompts['creator'].format(**selected_tool),
+                                                  is_json_output=True, generation_config=candidate_generation_config(index),
+                                                  response_schema=CREATOR_SCHEMA)
+    candidate = {
+        'index': index,
+        'creator_draft': creator_result['article_markdown'],
+        'article_meta_data': {
+            "title": creator_result.get('title', tool_name),
             "meta_description": creator_result.get('meta_description', ''),
             "faq_json_ld": creator_result.get('faq_json_ld', {})
+        },
+        'decider_judgment': None,
+        'duplicate': None,
+        'problems': None,
+    }
+    print(f"\n[AGENT: 편집자] '{label}' 작업을 시작합니다...")
+    notes = draft_problem_notes(candidate['creator_draft'], selected_tool, locale, options, label)
+    candidate['editor_revision'], candidate['editor_edits'] = await run_editor(
+        model, prompts, candidate['creator_draft'], options, notes)
+    similar_titles, duplicate = duplicates.review_article(tool_name, candidate['article_meta_data']['title'],
+                                                          candidate['editor_revision'], k=DECIDER_CONTEXT_K)
+    if options['duplicate_check'] and duplicate:
+        candidate['duplicate'] = duplicate
+        return candidate
+    if options['validation']:
+        problems = local_problems(candidate['editor_revision'], candidate['article_meta_data'], selected_tool, locale)
+        if problems:
+            print(f"\n🧹 '{label}' 편집본이 로컬 검사({', '.join(rule for rule, _ in problems)})에 걸려 "
+                  f"최종결정자를 호출하지 않습니다.")
+            candidate['problems'] = problems
+            return candidate
+    print(f"\n[AGENT: 최종결정자] '{label}' 작업을 시작합니다...")
+    candidate['decider_judgment'] = await run_ai_agent_async(
+        model, "최종결정자", build_decider_prompt(prompts, selected_tool, candidate['editor_revision'], similar_titles),
+        is_json_output=True, response_schema=decider_schema(locale), use_cache=False)
+    return candidate
+
+def fallback_rank(candidate):
+    """승인된 후보가 없을 때 고르는 순서입니다. (작을수록 우선)"""
+    if candidate['problems']:
+        return 0
+    return 2 if candidate['duplicate'] else 1
+
+async def race_candidates(model, selected_tool, prompts, duplicates, locale, options):
+    """
+    후보 글 options['candidates']개를 동시에 만들고, 끝나는 순서대로 결과를 확인합니다.
+    승인된 후보가 나오면 나머지 후보의 진행 중인 호출을 취소하고 그 후보를 반환합니다.
+    승인된 후보가 없으면 로컬 검사에 걸린 후보(다시 고쳐 확인받을 수 있음), 최종결정자가 반려한 후보,
+    중복 후보 순서로 골라 반환하고,
+    모든 후보가 실패하면 첫 번째 오류를 다시 발생시킵니다.
+    """
+    tasks = [asyncio.create_task(run_candidate(model, selected_tool, prompts, duplicates, locale, index, options))
+             for index in range(options['candidates'])]
+    fallback = None
+    errors = []
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            try:
+                candidate = await next_result
+            except PipelineError as e:
+                errors.append(e)
+                continue
+            if candidate['decider_judgment'] is not None and is_approved(candidate['decider_judgment'], locale):
+                remaining = sum(1 for task in tasks if not task.done())
+                if remaining:
+                    print(f"\n⏹️ '{selected_tool['name']}' 후보 #{candidate['index'] + 1}이(가) 승인되어 "
+                          f"남은 후보 {remaining}개를 취소합니다.")
+                return candidate
+            if fallback is None or fallback_rank(candidate) < fallback_rank(fallback):
+                fallback = candidate
+        if fallback is None:
+            raise errors[0]
+        return fallback
+    finally:
+        for task in tasks:
+            task.cancel()
+        # 취소된 호출의 계측 기록이 마무리되도록 모두 끝날 때까지 기다립니다.
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def find_translation_source(db, selected_tool, options):
+    """
+    options['translate_from'] 언어로 발행된 같은 기능의 글을 찾습니다.
+    원본 언어의 현재 명세로 쓴 글일 때만 반환하고(명세가 바뀐 뒤의 옛 글은 번역하지 않음), 없으면 None을 반환합니다.
+    """
+    source_feature = (options.get('translation_sources') or {}).get(feature_key(selected_tool))
+    if source_feature is None:
+        return None
+    article = await db.run(get_published_article, source_feature['name'], options['translate_from'])
+    if article is None or article['spec_hash'] not in (None, feature_spec_hash(source_feature)):
+        return None
+    return article
+
+async def reject_locally(db, pipeline_id, tool_name, problems):
+    """모델 호출 없이 로컬 규칙 검사로 반려한 결과를 기록합니다."""
+    reason = ' / '.join(message for _, message in problems)
+    await db.run(update_pipeline_step, pipeline_id, status='LOCAL_REJECTED', rejection_reason=reason)
+    logger.info(f"파이프라인 ID {pipeline_id}: 로컬 검사로 반려됨. 사유: {reason}")
+    print(f"\n🧹 '{tool_name}' 콘텐츠를 로컬 검사로 반려했습니다. 사유: {reason}")
+    return 'REJECTED'
+
+async def reject_duplicate(db, pipeline_id, selected_tool, reason):
+    """
+    모델 호출 없이 로컬 중복 검사로 반려한 결과를 기록합니다.
+    명세 해시도 남겨 두어, 명세가 바뀌기 전까지는 이 주제를 다시 고르지 않습니다.
+    """
+    tool_name = selected_tool['name']
+    await db.run(update_pipeline_step, pipeline_id, status='DUPLICATE_REJECTED', rejection_reason=reason,
+                 spec_hash=feature_spec_hash(selected_tool))
+    logger.info(f"파이프라인 ID {pipeline_id}: 중복으로 반려됨. 사유: {reason}")
+    print(f"\n🔁 '{tool_name}' 콘텐츠를 중복으로 반려했습니다. 사유: {reason}")
+    return 'REJECTED'
+
+async def process_topic(db, model, selected_tool, prompts, duplicates, locale='ko',
+                        resume_entry=None, options=None):
+    """
+    선택된 하나의 주제에 대해 작성자 → 편집자 → 최종결정자 단계를 실행합니다.
+    DB 접근은 db(AsyncDatabase)를 통해 쓰기 스레드에서 처리됩니다.
+    duplicates(DuplicateDetector)로 최종결정자에게 보여줄 비슷한 글을 고르고,
+    options['duplicate_check']가 참이면 발행된 글과 거의 같은 주제/편집본은 모델 호출 전에 반려합니다.
+    resume_entry('pipeline_logs' 행)를 넘기면 이미 저장된 단계는 건너뛰고 이어서 진행합니다.
+    options['stream']이 참이면 작성자 응답을 스트리밍으로 받으며 초안을 중간 저장합니다.
+    options['candidates']가 2 이상이면 새 파이프라인에서 후보 글을 동시에 만들어 먼저 승인된 후보를 사용합니다.
+    (이 경우 작성자 스트리밍은 사용하지 않습니다.)
+    options['sections']가 참이면 작성자 호출 하나 대신 개요와 섹션들을 동시에 요청해 초안을 만듭니다.
+    options['editor_diff']가 참이면 편집자에게 고칠 블록만 받아 적용하고, 편집 목록도 함께 저장합니다.
+    options['validation']이 참이면 초안의 로컬 검사 문제를 편집자에게 함께 전달하고, 편집 후에도 남은 문제는
+    한 번 더 고치게 한 뒤 그래도 남으면 최종결정자 호출 없이 반려합니다. (LOCAL_REJECTED)
+    options['translate_from'] 언어로 승인된 같은 기능의 글이 있으면 작성자/편집자 대신 그 글을 번역합니다.
+    승인 시 'APPROVED', 반려 시 'REJECTED'를 반환합니다.
+    """
+    options = {**DEFAULT_PIPELINE_OPTIONS, **(options or {})}
+    tool_name = selected_tool['name']
+    editor_task = None
+    entry = resume_entry or {}
+    status = entry.get('status', 'INITIATED')
+    source = "저장된"
+
+    # 1. 파이프라인 시작 및 ID 생성 (재개하는 경우 기존 ID 사용)
+    if resume_entry:
+        pipeline_id = resume_entry['id']
+        print(f"파이프라인 재개 (ID: {pipeline_id}, 주제: {tool_name}, 언어: {locale}, 마지막 상태: {status})")
+        logger.info(f"파이프라인 재개 (ID: {pipeline_id}, 주제: {tool_name}, 언어: {locale}, 마지막 상태: {status})")
+    else:
+        pipeline_id = await db.run(create_pipeline_entry, tool_name, locale)
+        print(f"파이프라인 시작 (ID: {pipeline_id}, 주제: {tool_name}, 언어: {locale})")
+        logger.info(f"파이프라인 시작 (ID: {pipeline_id}, 주제: {tool_name}, 언어: {locale})")
+    metrics.bind_pipeline(pipeline_id, locale)
+
+    # 명세(설명과 경로)가 이미 발행된 다른 기능과 똑같으면 글을 쓰기 전에 반려합니다.
+    # 비슷하기만 한 명세는 경고만 남기고, 실제로 겹치는지는 아래 편집본 검사에서 확인합니다.
+    if options['duplicate_check'] and status == 'INITIATED':
+        duplicate = duplicates.find_duplicate_feature(selected_tool)
+        if duplicate and duplicate[2]:
+            return await reject_duplicate(db, pipeline_id, selected_tool,
+                                          f"발행된 기능 '{duplicate[0]}'과(와) 명세가 같습니다")
+        if duplicate:
+            logger.warning(f"파이프라인 ID {pipeline_id}: 발행된 기능 '{duplicate[0]}'과(와) 명세가 비슷합니다 "
+                           f"(유사도 {duplicate[1]:.2f})")
+            print(f"⚠️ '{tool_name}' 명세가 발행된 기능 '{duplicate[0]}'과(와) 비슷합니다 "
+                  f"(유사도 {duplicate[1]:.2f}). 편집본에서 다시 확인합니다.")
+
+    # 다른 언어로 승인된 글이 있으면 번역본을 편집까지 끝난 글로 저장하고, 최종결정자 단계만 진행합니다.
+    if options['translate_from'] and options['translate_from'] != locale and status == 'INITIATED':
+        source_article = await find_translation_source(db, selected_tool, options)
+        if source_article is None:
+            print(f"\n[AGENT: 번역가] '{tool_name}': {options['translate_from']} 언어로 승인된 최신 글이 없어 새로 작성합니다.")
+        else:
+            print(f"\n[AGENT: 번역가] '{tool_name}' {options['translate_from']} → {locale} 번역을 시작합니다...")
+            translated, article_meta_data = await translate_article(model, prompts, selected_tool, source_article,
+                                                                    options['translate_from'])
+            creator_meta_json = json.dumps(article_meta_data, ensure_ascii=False)
+            await db.run(update_pipeline_step, pipeline_id, creator_draft=translated,
+                         creator_meta_json=creator_meta_json, editor_revision=translated, status='EDITED')
+            logger.info(f"파이프라인 ID {pipeline_id}: {options['translate_from']} 글(ID {source_article['id']}) 번역 완료")
+            entry = {'creator_draft': translated, 'creator_meta_json': creator_meta_json, 'editor_revision': translated}
+            status = 'EDITED'
+            source = "번역된"
+
+    # 후보 글을 동시에 만들고, 고른 후보를 편집까지 저장된 상태로 만들어 아래 단계를 이어갑니다.
+    if options['candidates'] > 1 and status == 'INITIATED':
+        candidate = await race_candidates(model, selected_tool, prompts, duplicates, locale, options)
+        creator_meta_json = json.dumps(candidate['article_meta_data'], ensure_ascii=False)
+        await db.run(update_pipeline_step, pipeline_id, creator_draft=candidate['creator_draft'],
+                     creator_meta_json=creator_meta_json, editor_revision=candidate['editor_revision'],
+                     editor_diff_json=edits_json(candidate['editor_edits']), status='EDITED')
+        entry = {
+            'creator_draft': candidate['creator_draft'],
+            'creator_meta_json': creator_meta_json,
+            'editor_revision': candidate['editor_revision'],
+            'decider_judgment_json': json.dumps(candidate['decider_judgment'], ensure_ascii=False)
+                                     if candidate['decider_judgment'] is not None else None,
         }
-        update_pipeline_step(conn, pipeline_id, creator_draft=creator_draft, status='DRAFT_CREATED')
-        logger.info(f"파이프라인 ID {pipeline_id}: {agent_name} 단계 완료")
+        status = 'EDITED'
+        source = f"후보 #{candidate['index'] + 1}의"
+
+    # 2. Agent 파이프라인 순차 실행
+    # 스트리밍으로 미리 시작한 편집은 결과를 기다리기 전에 실패하거나 취소되면 함께 취소합니다.
+    try:
+        # Step 1: 작성자
+        agent_name = "작성자"
+        if status in ('DRAFT_CREATED', 'EDITED'):
+            creator_draft = entry['creator_draft']
+            article_meta_data = json.loads(entry.get('creator_meta_json') or '{}')
+            article_meta_data.setdefault('title', tool_name)
+            article_meta_data.setdefault('meta_description', '')
+            article_meta_data.setdefault('faq_json_ld', {})
+            print(f"\n[AGENT: {agent_name}] '{tool_name}' {source} 초안을 사용합니다.")
+        else:
+            print(f"\n[AGENT: {agent_name}] '{tool_name}' 작업을 시작합니다...")
+            creator_prompt = prompts['creator'].format(**selected_tool)
+            if options['sections']:
+                creator_result = await write_article(model, prompts, selected_tool)
+            elif options['stream']:
+                creator_result, editor_task = await stream_creator_draft(
+                    db, model, pipeline_id, creator_prompt, prompts, options, selected_tool, locale)
+            else:
+                creator_result = await run_ai_agent_async(model, agent_name, creator_prompt, is_json_output=True,
+                                                          response_schema=CREATOR_SCHEMA)
+            creator_draft = creator_result['article_markdown']
+            article_meta_data = {
+                "title": creator_result.get('title', tool_name),
+                "meta_description": creator_result.get('meta_description', ''),
+                "faq_json_ld": creator_result.get('faq_json_ld', {})
+            }
+            await db.run(update_pipeline_step, pipeline_id, creator_draft=creator_draft,
+                         creator_meta_json=json.dumps(article_meta_data, ensure_ascii=False),
+                         status='DRAFT_CREATED')
+            logger.info(f"파이프라인 ID {pipeline_id}: {agent_name} 단계 완료")
 
         # Step 2: 편집자
         agent_name = "편집자"
-        print(f"\n[AGENT: {agent_name}] 작업을 시작합니다...")
-        editor_revision = run_ai_agent(model, agent_name, EDITOR_PROMPT.format(draft_content=creator_draft))
-        update_pipeline_step(conn, pipeline_id, editor_revision=editor_revision, status='EDITED')
-        logger.info(f"파이프라인 ID {pipeline_id}: {agent_name} 단계 완료")
+        if status == 'EDITED':
+            editor_revision = entry['editor_revision']
+            print(f"\n[AGENT: {agent_name}] '{tool_name}' {source} 편집본을 사용합니다.")
+        else:
+            if editor_task:
+                # 스트리밍 중 미리 시작한 편집 결과를 기다립니다.
+                editor_revision, editor_edits = await editor_task
+            else:
+                print(f"\n[AGENT: {agent_name}] '{tool_name}' 작업을 시작합니다...")
+                notes = draft_problem_notes(creator_draft, selected_tool, locale, options, tool_name)
+                editor_revision, editor_edits = await run_editor(model, prompts, creator_draft, options, notes)
+            await db.run(update_pipeline_step, pipeline_id, editor_revision=editor_revision,
+                         editor_diff_json=edits_json(editor_edits), status='EDITED')
+            logger.info(f"파이프라인 ID {pipeline_id}: {agent_name} 단계 완료")
+    finally:
+        if editor_task and not editor_task.done():
+            editor_task.cancel()
 
-        # Step 3: 최종결정자
-        agent_name = "최종결정자"
-        print(f"\n[AGENT: {agent_name}] 작업을 시작합니다...")
-        decider_prompt = DECIDER_PROMPT.format(
-            edited_content=editor_revision,
-            existing_articles_list=str(published_tools),
-            **selected_tool
-        )
-        decider_judgment = run_ai_agent(model, agent_name, decider_prompt, is_json_output=True)
-        update_pipeline_step(conn, pipeline_id, decider_judgment_json=json.dumps(decider_judgment, ensure_ascii=False))
+    # Step 3: 최종결정자 (결정까지 저장된 뒤 중단된 경우 저장된 결정을 사용)
+    agent_name = "최종결정자"
+    if status == 'EDITED' and entry.get('decider_judgment_json'):
+        decider_judgment = json.loads(entry['decider_judgment_json'])
+        print(f"\n[AGENT: {agent_name}] '{tool_name}' {source} 결정을 사용합니다.")
+    else:
+        # 발행된 글 전체 대신 내용이 가장 비슷한 글 k개의 제목만 넣어 프롬프트 크기를 일정하게 유지하고,
+        # 편집본이 다른 글과 거의 같으면 최종결정자를 호출하지 않고 반려합니다.
+        # (명세 변경으로 다시 작성하는 경우 자기 자신의 기존 글은 비교 대상에서 제외)
+        similar_titles, duplicate = duplicates.review_article(tool_name, article_meta_data['title'],
+                                                              editor_revision, k=DECIDER_CONTEXT_K)
+        if options['duplicate_check'] and duplicate:
+            return await reject_duplicate(db, pipeline_id, selected_tool,
+                                          f"발행된 글 '{duplicate[0]}'과(와) 내용이 거의 같습니다 (유사도 {duplicate[1]:.2f})")
+        # 링크, 분량, 섹션처럼 기계적으로 확인할 수 있는 문제는 최종결정자 대신 로컬에서 확인합니다.
+        if options['validation']:
+            editor_revision, problems, repaired = await enforce_local_rules(
+                model, prompts, selected_tool, locale, editor_revision, article_meta_data, options)
+            if repaired:
+                # 다시 고친 편집본은 작성자 초안 기준의 편집 목록과 맞지 않으므로 편집 목록은 지웁니다.
+                await db.run(update_pipeline_step, pipeline_id, editor_revision=editor_revision, editor_diff_json=None)
+            if problems:
+                return await reject_locally(db, pipeline_id, tool_name, problems)
+        print(f"\n[AGENT: {agent_name}] '{tool_name}' 작업을 시작합니다...")
+        decider_prompt = build_decider_prompt(prompts, selected_tool, editor_revision, similar_titles)
+        # 반려된 판단이 캐시에서 그대로 반복되지 않도록 최종결정자는 항상 새로 호출합니다.
+        decider_judgment = await run_ai_agent_async(model, agent_name, decider_prompt, is_json_output=True,
+                                                    response_schema=decider_schema(locale), use_cache=False)
         logger.info(f"파이프라인 ID {pipeline_id}: {agent_name} 단계 완료")
 
-        # 4. 최종 결정에 따른 후처리
-        decision_key = "approval" if locale == 'en' else "승인"
-        if decider_judgment.get('decision') == decision_key:
-            article_meta_data['title'] = decider_judgment.get('final_title', article_meta_data['title'])
-            save_approved_article(conn, pipeline_id, selected_tool['name'], editor_revision, article_meta_data, locale)
-            logger.info(f"파이프라인 ID {pipeline_id}: {locale} 콘텐츠 승인 및 저장 완료")
-            print(f"\n🤖 AI 최종결정자 승인! {locale} 언어의 콘텐츠를 자동으로 저장합니다.")
-            print(f"   - 제목: {article_meta_data['title']}")
-            print(f"🎉 'articles' 테이블에 {locale} 언어의 콘텐츠가 성공적으로 저장되었습니다.")
-        else:
-            reason = decider_judgment.get('reason', '사유 없음')
-            update_pipeline_step(conn, pipeline_id, status='AI_REJECTED', rejection_reason=reason)
-            logger.info(f"파이프라인 ID {pipeline_id}: 콘텐츠 반려됨. 사유: {reason}")
-            print(f"\n🤖 AI 최종결정자가 콘텐츠를 '반려'했습니다. 사유: {reason}")
-        
+    # 3. 최종 결정에 따른 후처리 (결정 내용과 결과를 한 트랜잭션으로 저장)
+    if is_approved(decider_judgment, locale):
+        article_meta_data['title'] = decider_judgment.get('final_title', article_meta_data['title'])
+        await db.run(save_decider_result, pipeline_id, decider_judgment, True, tool_name,
+                     editor_revision, article_meta_data, locale, spec_hash=feature_spec_hash(selected_tool))
+        # 같은 실행 안에서 이어지는 결정이 방금 발행된 글도 고려하도록 색인에 추가
+        duplicates.add_article(tool_name, article_meta_data['title'], article_meta_data['meta_description'],
+                               editor_revision, selected_tool)
+        logger.info(f"파이프라인 ID {pipeline_id}: {locale} 콘텐츠 승인 및 저장 완료")
+        return 'APPROVED'
+
+    reason = decider_judgment.get('reason', '사유 없음')
+    await db.run(save_decider_result, pipeline_id, decider_judgment, False, rejection_reason=reason)
+    logger.info(f"파이프라인 ID {pipeline_id}: 콘텐츠 반려됨. 사유: {reason}")
+    print(f"\n🤖 AI 최종결정자가 '{tool_name}' 콘텐츠를 '반려'했습니다. 사유: {reason}")
+    return 'REJECTED'
+
+async def forget_cached_responses(model, cache_keys):
+    """
+    반려된 파이프라인이 사용한 응답(작성자, 편집자 등)을 캐시에서 지웁니다.
+    그대로 두면 다음 실행에서 같은 초안과 편집본을 캐시에서 다시 받아 같은 이유로 반려됩니다.
+    """
+    invalidate_keys = getattr(model, 'invalidate_keys', None)
+    if invalidate_keys is None or not cache_keys:
+        return
+    try:
+        await invalidate_keys(cache_keys)
+    except Exception as e:
+        logger.error(f"반려된 응답의 캐시 삭제 실패: {e}", exc_info=True)
+
+async def process_topic_with_metrics(db, model, selected_tool, prompts, duplicates, locale='ko',
+                                     resume_entry=None, options=None):
+    """
+    process_topic을 실행하면서 Agent 호출과 DB 작업의 계측 기록을 모으고,
+    성공 여부와 관계없이 끝나면 'agent_metrics' 테이블에 저장합니다.
+    반려되면 이 파이프라인이 사용한 응답 캐시 항목을 지워 다음 실행에서 모델을 다시 호출하게 합니다.
+    """
+    collector = metrics.start_collecting(locale)
+    cache_keys = track_cache_keys()
+    try:
+        result = await process_topic(db, model, selected_tool, prompts, duplicates, locale,
+                                     resume_entry, options)
+        if result == 'REJECTED':
+            await forget_cached_responses(model, cache_keys)
+        return result
+    finally:
+        if collector['calls']:
+            try:
+                await db.run(save_agent_metrics, collector['pipeline_id'], collector['locale'], collector['calls'])
+            except Exception as e:
+                # 계측 저장 실패가 파이프라인 결과를 바꾸지 않도록 기록만 합니다.
+                logger.error(f"계측 기록 저장 실패: {e}", exc_info=True)
+
+def run_pipeline(conn, model, locale='ko', options=None):
+    """
+    콘텐츠 생성의 전체 파이프라인을 순차적으로 실행하고 관리합니다.
+    """
+    try:
+        # 1. 프롬프트 로딩 및 주제 선정 (언어별로 로드)
+        # 지정된 언어로 기능 명세 및 발행된 도구 목록 가져오기
+        features_file = (options or {}).get('features_file')
+        features_json = load_features(locale, features_file)  # 여기에서 이미 메시지를 출력함
+        context = load_locale_context(conn, features_json, locale)
+        prompts = context['prompts']
+        duplicates = context['duplicates']
+
+        selected_tool = select_new_topic(features_json, context['published_hashes'], context['rejected_hashes'])
+
+        if not selected_tool:
+            print(f"🎉 {locale} 언어에 대한 모든 주제의 글 작성이 완료되었습니다!")
+            return 'COMPLETE'
+
+        print(f"🚀 이번에 작성할 {locale} 콘텐츠 주제는 '{selected_tool['name']}' 입니다.")
+
+        # 2. 선택된 주제에 대해 Agent 파이프라인 실행
+        async def run_selected_topic():
+            async with async_database(conn) as db:
+                return await process_topic_with_metrics(db, model, selected_tool, prompts, duplicates, locale,
+                                                        options=options)
+
+        asyncio.run(run_selected_topic())
         return 'SUCCESS'
     except Exception as e:
         logger.error(f"파이프라인 실행 중 오류 발생: {str(e)}", exc_info=True)
         raise
 
+def load_locale_context(conn, features_json, locale='ko', record_baseline=True):
+    """
+    언어별로 한 번만 준비하면 되는 프롬프트, 기능 명세, 발행된 글의 명세 해시와 중복 검사 색인을 묶어 반환합니다.
+    rejected_hashes에는 중복으로 반려된 주제의 명세 해시를 담아, 명세가 바뀌기 전까지 다시 고르지 않게 합니다.
+    record_baseline이 참이면 명세 해시가 없는 기존 글에 현재 명세의 해시를 기준값으로 기록합니다.
+    """
+    published_hashes = get_published_spec_hashes(conn, locale)
+    if record_baseline:
+        baseline = {
+            f['name']: feature_spec_hash(f) for f in features_json
+            if isinstance(f, dict) and f.get('name') in published_hashes and published_hashes[f['name']] is None
+        }
+        if baseline:
+            backfill_spec_hashes(conn, locale, baseline)
+            published_hashes.update(baseline)
+    return {
+        'locale': locale,
+        'prompts': load_prompts(locale),
+        'features': features_json,
+        'published_hashes': published_hashes,
+        'rejected_hashes': get_duplicate_rejected_spec_hashes(conn, locale),
+        'duplicates': DuplicateDetector.from_archive(
+            get_article_documents(conn, locale, MAX_BODY_CHARS), features_json),
+    }
+
+def feature_key(feature):
+    """언어가 달라도 같은 기능을 가리키는 식별자(endpoint)를 반환합니다."""
+    return feature.get('endpoint') or feature.get('name')
+
+def plan_topics(contexts, limit=None):
+    """
+    언어별로 발행되지 않은 주제를 같은 기능끼리 묶습니다.
+    반환값은 [(언어 컨텍스트, 기능 명세), ...] 묶음의 리스트이며, limit은 기능 개수 기준입니다.
+    """
+    groups = {}
+    for context in contexts:
+        for tool in select_new_topics(context['features'], context['published_hashes'],
+                                      rejected_hashes=context['rejected_hashes']):
+            groups.setdefault(feature_key(tool), []).append((context, tool))
+    topics = list(groups.values())
+    return topics if limit is None else topics[:limit]
+
+async def load_locale_contexts(db, locales, features_file=None, record_baseline=True, translate_from=None):
+    """
+    여러 언어의 컨텍스트를 준비합니다. 언어별 기능 명세는 네트워크 요청이므로 동시에 불러옵니다.
+    translate_from이 있으면 그 언어의 기능 명세를 {기능 식별자: 명세}로 다른 언어 컨텍스트의
+    'translation_sources'에 넣어, 같은 기능의 원본 글을 찾을 수 있게 합니다.
+    """
+    fetch_locales = list(locales)
+    if translate_from and translate_from not in fetch_locales:
+        fetch_locales.append(translate_from)
+    features_by_locale = await asyncio.gather(
+        *(asyncio.to_thread(load_features, locale, features_file) for locale in fetch_locales)
+    )
+    contexts = [
+        await db.run(load_locale_context, features_json, locale, record_baseline)
+        for locale, features_json in zip(locales, features_by_locale)
+    ]
+    if translate_from:
+        source_features = features_by_locale[fetch_locales.index(translate_from)]
+        sources = {feature_key(f): f for f in source_features if isinstance(f, dict)}
+        for context in contexts:
+            if context['locale'] != translate_from:
+                context['translation_sources'] = sources
+    return contexts
+
+def context_options(context, options):
+    """언어 컨텍스트에 묶인 실행 정보(번역 원본 명세)를 파이프라인 옵션에 더합니다."""
+    if not context.get('translation_sources'):
+        return options
+    return {**(options or {}), 'translation_sources': context['translation_sources']}
+
+async def run_jobs(db, model, jobs, locales, concurrency=DEFAULT_CONCURRENCY, options=None):
+    """
+    (언어 컨텍스트, 기능 명세, 재개할 pipeline_logs 행 또는 None) 작업 목록을 동시에 처리합니다.
+    주제별 실패는 다른 주제에 영향을 주지 않습니다. 처리 결과 요약(dict)을 반환합니다.
+    """
+    summary = {
+        'total': len(jobs), 'approved': 0, 'rejected': 0, 'failed': 0, 'elapsed_seconds': 0.0,
+        'by_locale': {locale: {'approved': 0, 'rejected': 0, 'failed': 0} for locale in locales},
+    }
+    semaphore = asyncio.Semaphore(concurrency)
+    # 번역 모드에서는 같은 실행 안의 원본 언어 작업이 끝난 뒤에 번역을 시작합니다.
+    translate_from = (options or {}).get('translate_from')
+    source_done = {feature_key(tool): asyncio.Event() for context, tool, _ in jobs if context['locale'] == translate_from}
+
+    async def worker(context, tool, resume_entry):
+        key = feature_key(tool)
+        if context['locale'] != translate_from and key in source_done:
+            await source_done[key].wait()
+        try:
+            async with semaphore:
+                return await process_topic_with_metrics(db, model, tool, context['prompts'],
+                                                        context['duplicates'], context['locale'],
+                                                        resume_entry, context_options(context, options))
+        except Exception as e:
+            # 주제별 실패 격리: 기록만 하고 나머지 주제는 계속 진행
+            logger.error(f"'{tool['name']}' ({context['locale']}) 주제 처리 중 오류 발생: {str(e)}", exc_info=True)
+            print(f"\n[주제 실패] '{tool['name']}' ({context['locale']}): {e}")
+            return 'FAILED'
+        finally:
+            if context['locale'] == translate_from:
+                source_done[key].set()
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(worker(*job) for job in jobs))
+    summary['elapsed_seconds'] = time.perf_counter() - started
+
+    result_keys = {'APPROVED': 'approved', 'REJECTED': 'rejected', 'FAILED': 'failed'}
+    for (context, _, _), result in zip(jobs, results):
+        key = result_keys[result]
+        summary[key] += 1
+        summary['by_locale'][context['locale']][key] += 1
+    print_batch_summary(summary)
+    return summary
+
+async def run_batch(conn, model, locales=('ko',), limit=None, concurrency=DEFAULT_CONCURRENCY, options=None):
+    """
+    발행되지 않은 여러 주제를 여러 언어에 대해 동시에 처리합니다.
+    기능 명세와 프롬프트는 언어별로 한 번만 준비하고, 같은 기능의 언어별 파이프라인은 함께 스케줄링됩니다.
+    limit은 처리할 기능 수이며 None이면 남은 모든 기능을 처리합니다. 처리 결과 요약(dict)을 반환합니다.
+    """
+    async with async_database(conn) as db:
+        contexts = await load_locale_contexts(db, locales, (options or {}).get('features_file'),
+                                              translate_from=(options or {}).get('translate_from'))
+        topics = plan_topics(contexts, limit)
+        jobs = [(context, tool, None) for group in topics for context, tool in group]
+
+        locale_label = ', '.join(locales)
+        if not jobs:
+            print(f"🎉 {locale_label} 언어에 대한 모든 주제의 글 작성이 완료되었습니다!")
+            return None
+
+        print(f"🚀 {locale_label} 콘텐츠 {len(jobs)}건(기능 {len(topics)}개)을 최대 {concurrency}개씩 동시에 작성합니다.")
+        return await run_jobs(db, model, jobs, locales, concurrency, options)
+
+async def run_resume(conn, model, locales=('ko',), concurrency=DEFAULT_CONCURRENCY, options=None):
+    """
+    최종 결정 전에 중단된 파이프라인을 마지막으로 저장된 단계부터 이어서 실행합니다.
+    처리 결과 요약(dict)을 반환하며, 이어서 할 작업이 없으면 None을 반환합니다.
+    """
+    async with async_database(conn) as db:
+        contexts = await load_locale_contexts(db, locales, (options or {}).get('features_file'),
+                                              translate_from=(options or {}).get('translate_from'))
+        jobs = []
+        for context in contexts:
+            features_by_name = {f.get('name'): f for f in context['features'] if isinstance(f, dict)}
+            for entry in await db.run(get_unfinished_pipelines, context['locale']):
+                tool = features_by_name.get(entry['tool_name'])
+                if tool is None:
+                    logger.warning(f"파이프라인 ID {entry['id']}: 기능 명세에서 '{entry['tool_name']}'을(를) 찾을 수 없어 재개하지 않습니다.")
+                    print(f"⚠️ 파이프라인 ID {entry['id']}: 기능 명세에 '{entry['tool_name']}'이(가) 없어 건너뜁니다.")
+                    continue
+                jobs.append((context, tool, entry))
+
+        locale_label = ', '.join(locales)
+        if not jobs:
+            print(f"✅ {locale_label} 언어에 이어서 진행할 파이프라인이 없습니다.")
+            return None
+
+        print(f"🔁 {locale_label} 언어의 중단된 파이프라인 {len(jobs)}건을 이어서 진행합니다.")
+        return await run_jobs(db, model, jobs, locales, concurrency, options)
+
+async def run_enqueue(conn, locales=('ko',), limit=None, options=None):
+    """
+    발행되지 않았거나 명세가 바뀐 주제를 언어별로 작업 큐에 넣습니다. (worker가 나눠서 처리)
+    limit은 기능 수 기준이며, 새로 추가된 작업 수를 반환합니다.
+    """
+    async with async_database(conn) as db:
+        contexts = await load_locale_contexts(db, locales, (options or {}).get('features_file'))
+        tool_names = {}
+        for group in plan_topics(contexts, limit):
+            for context, tool in group:
+                tool_names.setdefault(context['locale'], []).append(tool['name'])
+        added = 0
+        for locale, names in tool_names.items():
+            added += await db.run(enqueue_jobs, locale, names)
+        counts = await db.run(get_job_counts, locales)
+    print(f"📥 작업 큐에 {added}건을 추가했습니다. (대기 {counts.get('queued', 0)}건 / 진행 중 {counts.get('leased', 0)}건)")
+    return added
+
+def default_worker_id():
+    """여러 호스트의 worker를 구분할 수 있도록 '호스트명:프로세스ID' 형태의 이름을 만듭니다."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+async def keep_lease(db, job, worker_id, lease_seconds):
+    """작업이 끝날 때까지 lease를 주기적으로 연장합니다. lease를 잃으면 반환합니다."""
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        if not await db.run(renew_job_lease, job['id'], worker_id, lease_seconds):
+            return
+
+async def run_worker(conn, model, locales=('ko',), concurrency=DEFAULT_CONCURRENCY, options=None,
+                     worker_id=None, lease_seconds=JOB_LEASE_SECONDS, poll_interval=DEFAULT_POLL_SECONDS,
+                     max_jobs=None, exit_when_empty=False):
+    """
+    작업 큐('jobs' 테이블)에서 작업을 가져와 처리하는 오래 실행되는 worker입니다.
+    모델, DB 연결, 프롬프트를 한 번만 준비해 두고 작업마다 재사용하며,
+    같은 DB를 쓰는 여러 worker 프로세스가 lease로 작업을 나눠 가지므로 같은 주제를 두 번 처리하지 않습니다.
+    중단된 worker의 작업은 lease가 만료되면 다른 worker가 마지막으로 저장된 단계부터 이어서 진행합니다.
+    SIGINT/SIGTERM을 받으면 새 작업을 가져오지 않고, 진행 중인 작업을 마친 뒤 종료합니다.
+    max_jobs개를 가져왔거나, exit_when_empty가 참이고 대기열이 비었으면 종료합니다. 처리 결과 요약(dict)을 반환합니다.
+    """
+    worker_id = worker_id or default_worker_id()
+    summary = {
+        'total': 0, 'approved': 0, 'rejected': 0, 'failed': 0, 'elapsed_seconds': 0.0,
+        'by_locale': {locale: {'approved': 0, 'rejected': 0, 'failed': 0} for locale in locales},
+    }
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    installed_signals = []
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+            installed_signals.append(signum)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Windows나 메인 스레드가 아닌 경우에는 Ctrl+C(KeyboardInterrupt)로 종료합니다.
+            pass
+
+    async with async_database(conn) as db:
+        state = {'contexts': {}, 'loaded_at': 0.0, 'claimed': 0}
+        refresh_lock = asyncio.Lock()
+
+        async def refresh_contexts(force=False):
+            # 다른 worker가 발행한 글과 바뀐 기능 명세를 반영하도록 주기적으로 다시 불러옵니다.
+            async with refresh_lock:
+                if force or time.monotonic() - state['loaded_at'] >= CONTEXT_REFRESH_SECONDS:
+                    contexts = await load_locale_contexts(db, locales, (options or {}).get('features_file'),
+                                                          translate_from=(options or {}).get('translate_from'))
+                    state['contexts'] = {context['locale']: context for context in contexts}
+                    state['loaded_at'] = time.monotonic()
+            return state['contexts']
+
+        async def find_tool(job):
+            for force in (False, True):
+                context = (await refresh_contexts(force))[job['locale']]
+                for feature in context['features']:
+                    if isinstance(feature, dict) and feature.get('name') == job['tool_name']:
+                        return context, feature
+            return context, None
+
+        async def process_job(job):
+            context, tool = await find_tool(job)
+            if tool is None:
+                await db.run(fail_job, job['id'], worker_id, "기능 명세에서 도구를 찾을 수 없습니다", permanent=True)
+                print(f"⚠️ 작업 {job['id']}: 기능 명세에 '{job['tool_name']}'이(가) 없어 실패 처리합니다.")
+                return 'FAILED'
+            # 이전 시도가 중간에 멈췄다면 저장된 단계부터 이어서 진행합니다.
+            resume_entry = next((entry for entry in await db.run(get_unfinished_pipelines, job['locale'])
+                                 if entry['tool_name'] == job['tool_name']), None)
+            print(f"\n📦 [{worker_id}] 작업 {job['id']} 시작: '{job['tool_name']}' ({job['locale']}, {job['attempts']}번째 시도)")
+            pipeline = asyncio.create_task(process_topic_with_metrics(
+                db, model, tool, context['prompts'], context['duplicates'], job['locale'], resume_entry,
+                context_options(context, options)))
+            lease = asyncio.create_task(keep_lease(db, job, worker_id, lease_seconds))
+
+            async def stop_pipeline():
+                # 취소된 파이프라인이 정리를 마칠 때까지 기다립니다. 쓰기 스레드에 이미 넘긴 쓰기는
+                # 취소되지 않으므로, 그 쓰기까지 끝난 뒤에 작업을 넘겨야 같은 주제를 두 번 저장하지 않습니다.
+                pipeline.cancel()
+                await asyncio.gather(pipeline, return_exceptions=True)
+
+            try:
+                await asyncio.wait({pipeline, lease}, return_when=asyncio.FIRST_COMPLETED)
+                if not pipeline.done():
+                    # 다른 worker가 작업을 가져갔으므로 같은 주제를 두 번 처리하지 않도록 중단합니다.
+                    await stop_pipeline()
+                    await db.drain()
+                    logger.warning(f"작업 {job['id']}: lease를 잃어 처리를 중단합니다.")
+                    print(f"⚠️ 작업 {job['id']}: lease가 만료되어 다른 worker에게 넘어갔습니다.")
+                    return 'FAILED'
+                result = pipeline.result()
+            except asyncio.CancelledError:
+                try:
+                    await stop_pipeline()
+                finally:
+                    # 쓰기 스레드는 순서대로 처리하므로 남은 쓰기가 끝난 뒤에 작업을 놓습니다.
+                    db.submit(release_job, job['id'], worker_id)
+                raise
+            except Exception as e:
+                status = await db.run(fail_job, job['id'], worker_id, e)
+                logger.error(f"작업 {job['id']} ('{job['tool_name']}', {job['locale']}) 실패 ({status}): {e}", exc_info=True)
+                print(f"\n[작업 실패] '{job['tool_name']}' ({job['locale']}): {e}"
+                      + (" — 잠시 후 다시 시도합니다." if status == 'queued' else ""))
+                return 'FAILED'
+            finally:
+                lease.cancel()
+            await db.run(finish_job, job['id'], worker_id, result)
+            return result
+
+        async def worker_slot():
+            while not stop.is_set() and (max_jobs is None or state['claimed'] < max_jobs):
+                state['claimed'] += 1
+                job = await db.run(claim_job, worker_id, locales, lease_seconds)
+                if job is None:
+                    state['claimed'] -= 1
+                    if exit_when_empty:
+                        return
+                    try:
+                        await asyncio.wait_for(stop.wait(), poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                try:
+                    result = await process_job(job)
+                except Exception as e:
+                    # 기능 명세를 불러오지 못한 경우 등: 작업을 실패로 기록하고 worker는 계속 실행합니다.
+                    logger.error(f"작업 {job['id']} 준비 중 오류 발생: {e}", exc_info=True)
+                    await db.run(fail_job, job['id'], worker_id, e)
+                    result = 'FAILED'
+                key = {'APPROVED': 'approved', 'REJECTED': 'rejected'}.get(result, 'failed')
+                summary['total'] += 1
+                summary[key] += 1
+                summary['by_locale'][job['locale']][key] += 1
+
+        await refresh_contexts(force=True)
+        counts = await db.run(get_job_counts, locales)
+        print(f"👷 worker '{worker_id}' 시작: {', '.join(locales)} 언어, 동시 작업 {concurrency}개 "
+              f"(대기 {counts.get('queued', 0)}건 / 진행 중 {counts.get('leased', 0)}건)")
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(worker_slot() for _ in range(concurrency)))
+        finally:
+            for signum in installed_signals:
+                loop.remove_signal_handler(signum)
+            summary['elapsed_seconds'] = time.perf_counter() - started
+
+    if stop.is_set():
+        print(f"\n🛑 worker '{worker_id}'가 종료 신호를 받아 진행 중인 작업을 마치고 종료했습니다.")
+    print_batch_summary(summary)
+    return summary
+
+async def run_dry_run(conn, locales=('ko',), options=None):
+    """
+    글을 생성하지 않고, 언어별로 기능 명세와 발행된 글을 비교한 결과만 출력합니다.
+    언어별 diff_catalog 결과를 {locale: diff} 형태로 반환합니다.
+    """
+    async with async_database(conn) as db:
+        contexts = await load_locale_contexts(db, locales, (options or {}).get('features_file'),
+                                              record_baseline=False)
+    diffs = {}
+    for context in contexts:
+        diff = diff_catalog(context['features'], context['published_hashes'])
+        diffs[context['locale']] = diff
+        print_catalog_diff(context['locale'], diff)
+    return diffs
+
+def print_catalog_diff(locale, diff):
+    """기능 명세 비교 결과(새 기능, 변경된 기능, 사라진 기능)를 출력합니다."""
+    print("\n" + "="*50)
+    print(f"🔍 {locale} 기능 명세 변경 사항")
+    print(f"   - 새 기능: {len(diff['new'])}건 / 변경: {len(diff['changed'])}건 / "
+          f"변경 없음: {len(diff['unchanged'])}건 / 명세에서 사라짐: {len(diff['removed'])}건")
+    for label, names in (('+', [f['name'] for f in diff['new']]),
+                         ('~', [f['name'] for f in diff['changed']]),
+                         ('-', diff['removed'])):
+        for name in names:
+            print(f"     {label} {name}")
+    print("="*50)
+
+def run_report(conn, output_format='text', output=None, since_days=None):
+    """
+    저장된 계측 기록을 Agent/언어별로 요약합니다.
+    text는 화면에 출력하고, json/prometheus는 파일로 내보냅니다.
+    """
+    summary = metrics.summarize(metrics.load_metric_rows(conn, since_days))
+    if output_format == 'text':
+        metrics.print_report(summary)
+        return summary
+    path = output or DEFAULT_REPORT_FILES[output_format]
+    if output_format == 'json':
+        metrics.export_json(summary, path)
+    else:
+        metrics.export_prometheus(summary, path)
+    print(f"📈 계측 보고서({output_format})를 {path} 파일로 저장했습니다. (항목 {len(summary)}개)")
+    return summary
+
+def run_export(conn, locales=None, output_dir=EXPORT_DIR, formats=EXPORT_FORMATS, base_url=DEFAULT_BASE_URL,
+               workers=None, force=False):
+    """승인된 글을 정적 파일(Markdown/HTML)과 sitemap으로 내보내고 결과 요약(dict)을 반환합니다."""
+    print(f"📤 {', '.join(locales) if locales else '모든'} 언어의 글을 '{output_dir}' 폴더로 내보냅니다...")
+    summary = export_articles(conn, output_dir, locales, formats, base_url, workers, force)
+    print("\n" + "="*50)
+    print("📦 내보내기 요약")
+    print(f"   - 글: {summary['articles']}건 ({summary['elapsed_seconds']:.1f}초)")
+    print(f"   - 새로 쓴 파일: {summary['written']}개 / 변경 없음: {summary['skipped']}개 / 삭제: {summary['removed']}개")
+    print(f"   - sitemap: {summary['sitemap_urls']}개 URL ({os.path.join(output_dir, 'sitemap.xml')})")
+    print("="*50)
+    return summary
+
+def format_bytes(size):
+    """바이트 수를 읽기 쉬운 단위(B, KB, MB, GB)로 바꿉니다."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+def run_db_stats(conn):
+    """데이터베이스 파일 크기, 테이블별 행 수와 크기, 실행 기록 상태와 압축 현황을 출력하고 통계(dict)를 반환합니다."""
+    stats = get_db_stats(conn)
+    print("\n" + "="*50)
+    print(f"🗄️ 데이터베이스 통계 ({stats['path'] or '메모리'})")
+    print(f"   - 파일 크기: {format_bytes(stats['file_bytes'])} (빈 공간: {format_bytes(stats['free_bytes'])}, "
+          f"WAL: {format_bytes(stats['wal_bytes'])})")
+    size_label = '크기' if stats['size_source'] == 'dbstat' else '저장된 값 크기'
+    for table, info in sorted(stats['tables'].items(), key=lambda item: item[1]['bytes'], reverse=True):
+        print(f"     · {table}: {info['rows']}행 / {size_label} {format_bytes(info['bytes'])}")
+    if stats['pipeline_statuses']:
+        print("   - 실행 기록 상태: " + ', '.join(f"{status} {count}" for status, count in stats['pipeline_statuses'].items()))
+    print(f"   - 실행 기록 본문: {format_bytes(stats['payload_bytes'])} (압축된 값 {stats['compressed_values']}개)")
+    print(f"   - {DEFAULT_RETENTION_DAYS}일이 지나 정리할 수 있는 반려/중단 시도: {stats['prunable']}건")
+    print("="*50)
+    return stats
+
+def run_db_prune(conn, older_than_days=DEFAULT_RETENTION_DAYS, archive_path=ARCHIVE_DB_NAME, vacuum=False):
+    """보존 기간이 지난 반려/중단 시도를 보관 파일로 옮기고(archive_path가 None이면 삭제만) 정리한 행 수를 반환합니다."""
+    pruned = prune_pipeline_logs(conn, older_than_days, archive_path)
+    if not pruned:
+        print(f"🧹 {older_than_days:g}일이 지난 반려/중단 시도가 없어 정리할 기록이 없습니다.")
+    elif archive_path:
+        print(f"🧹 {older_than_days:g}일이 지난 반려/중단 시도 {pruned}건을 '{archive_path}' 파일로 옮겼습니다.")
+    else:
+        print(f"🧹 {older_than_days:g}일이 지난 반려/중단 시도 {pruned}건을 삭제했습니다.")
+    if vacuum:
+        before = get_db_stats(conn)['file_bytes']
+        vacuum_database(conn)
+        print(f"🗜️ 데이터베이스 파일을 {format_bytes(before)}에서 {format_bytes(get_db_stats(conn)['file_bytes'])}로 줄였습니다.")
+    return pruned
+
+def run_db_compress(conn, codec, vacuum=False):
+    """이미 저장된 실행 기록 본문을 codec으로 압축하고 압축한 값의 수를 반환합니다."""
+    compressed = compress_pipeline_payloads(conn, codec)
+    print(f"🗜️ 실행 기록 본문 {compressed}개를 {codec}로 압축했습니다.")
+    if vacuum:
+        before = get_db_stats(conn)['file_bytes']
+        vacuum_database(conn)
+        print(f"🗜️ 데이터베이스 파일을 {format_bytes(before)}에서 {format_bytes(get_db_stats(conn)['file_bytes'])}로 줄였습니다.")
+    return compressed
+
+def print_batch_summary(summary):
+    """배치 실행 결과(처리량, 실패, 반려)를 출력합니다."""
+    minutes = summary['elapsed_seconds'] / 60
+    throughput = summary['approved'] / minutes if minutes > 0 else 0.0
+    print("\n" + "="*50)
+    print("📊 배치 실행 요약")
+    print(f"   - 처리한 주제: {summary['total']}건 ({summary['elapsed_seconds']:.1f}초)")
+    print(f"   - 승인: {summary['approved']}건 / 반려: {summary['rejected']}건 / 실패: {summary['failed']}건")
+    if len(summary['by_locale']) > 1:
+        for locale, counts in summary['by_locale'].items():
+            print(f"     · {locale}: 승인 {counts['approved']} / 반려 {counts['rejected']} / 실패 {counts['failed']}")
+    print(f"   - 처리량: 분당 {throughput:.2f}건")
+    print("="*50)
+
+def parse_locales(value):
+    """'ko,en' 형식의 언어 목록을 파싱하고 지원 여부를 검증합니다."""
+    locales = []
+    for locale in value.split(','):
+        locale = locale.strip()
+        if not locale:
+            continue
+        if locale not in SUPPORTED_LOCALES:
+            raise argparse.ArgumentTypeError(
+                f"지원하지 않는 언어입니다: {locale} (지원: {', '.join(SUPPORTED_LOCALES)})")
+        if locale not in locales:
+            locales.append(locale)
+    if not locales:
+        raise argparse.ArgumentTypeError("언어를 하나 이상 지정해야 합니다.")
+    return locales
+
 def main():
     """
     프로그램의 진입점(Entry Point).
@@ -127,27 +1092,226 @@ def main():
     """
     # 명령행 인자 파싱
     parser = argparse.ArgumentParser(description='EasyTool 가이드 작성기')
-    parser.add_argument('--locale', '-l', type=str, default='ko', 
-                        choices=['ko', 'en'], help='콘텐츠 언어 (기본값: ko)')
+    parser.add_argument('command', nargs='?', default='run',
+                        choices=('run', 'report', 'enqueue', 'worker', 'export', 'db'),
+                        help='run: 콘텐츠 생성 (기본값), report: Agent/언어별 계측 보고서 출력, '
+                             'enqueue: 새 주제를 작업 큐에 추가, worker: 작업 큐를 계속 처리, '
+                             'export: 승인된 글을 Markdown/HTML 파일과 sitemap으로 내보내기, '
+                             'db: 데이터베이스 관리 (stats, prune, compress)')
+    parser.add_argument('db_action', nargs='?', choices=('stats', 'prune', 'compress'),
+                        help='db 명령의 작업. stats: 테이블별 크기 출력 (기본값), '
+                             'prune: 보존 기간이 지난 반려/중단 시도 정리, compress: 저장된 실행 기록 본문 압축')
+    parser.add_argument('--locale', '-l', type=str, default=None,
+                        choices=SUPPORTED_LOCALES, help='콘텐츠 언어 (기본값: ko)')
+    parser.add_argument('--locales', type=parse_locales, metavar='ko,en',
+                        help='여러 언어를 한 번에 생성 (예: ko,en). 지정하면 --locale 대신 사용')
+    batch_group = parser.add_mutually_exclusive_group()
+    batch_group.add_argument('--batch', type=int, metavar='N',
+                             help='발행되지 않은 주제 N개를 한 번에 처리 (enqueue: N개만 큐에 추가)')
+    batch_group.add_argument('--all', action='store_true',
+                             help='발행되지 않은 모든 주제를 한 번에 처리')
+    batch_group.add_argument('--resume', action='store_true',
+                             help='중단된 파이프라인을 마지막으로 저장된 단계부터 이어서 처리')
+    parser.add_argument('--model', choices=MODEL_PROVIDERS, default='gemini',
+                        help='사용할 모델: gemini (기본값) 또는 fake (API 키 없이 합성 응답으로 실행)')
+    parser.add_argument('--model-name', default=DEFAULT_MODEL_NAME,
+                        help=f'Gemini 모델 이름 (기본값: {DEFAULT_MODEL_NAME})')
+    parser.add_argument('--fake-latency', type=float, default=0.0, metavar='SECONDS',
+                        help='fake 모델의 호출당 지연 시간(초)')
+    parser.add_argument('--fake-error-rate', type=float, default=0.0, metavar='RATE',
+                        help='fake 모델이 일시적 오류를 낼 확률 (0~1)')
+    parser.add_argument('--fake-malformed-rate', type=float, default=0.0, metavar='RATE',
+                        help='fake 모델이 깨진 JSON을 돌려줄 확률 (0~1)')
+    parser.add_argument('--fake-approve-rate', type=float, default=1.0, metavar='RATE',
+                        help='fake 모델의 최종결정자가 승인할 확률 (0~1, 기본값: 1)')
+    parser.add_argument('--fake-responses', metavar='DIR',
+                        help='fake 모델이 재생할 녹화 응답 폴더 (creator/, editor/, decider/)')
+    parser.add_argument('--concurrency', '-c', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'배치/worker 모드에서 동시에 처리할 주제 수 (기본값: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--rpm', type=int,
+                        help=f'분당 최대 API 요청 수 (기본값: {DEFAULT_REQUESTS_PER_MINUTE}, fake 모델은 제한 없음)')
+    parser.add_argument('--tpm', type=int,
+                        help=f'분당 최대 토큰 수 (기본값: {DEFAULT_TOKENS_PER_MINUTE}, fake 모델은 제한 없음)')
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help=f'동시에 진행할 수 있는 최대 API 호출 수 (기본값: {DEFAULT_MAX_IN_FLIGHT})')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT_SECONDS,
+                        help=f'API 호출 1회의 시간 제한(초) (기본값: {DEFAULT_TIMEOUT_SECONDS})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='저장된 AI 응답 캐시를 사용하지 않고 항상 새로 생성')
+    parser.add_argument('--stream', action='store_true',
+                        help='작성자 응답을 스트리밍으로 받아 초안을 중간 저장하고, 본문이 완성되면 편집을 바로 시작')
+    parser.add_argument('--candidates', type=int, default=1, metavar='K',
+                        help='새 주제마다 후보 글 K개를 동시에 만들어 먼저 승인된 글을 쓰고 나머지 호출은 취소 '
+                             '(API 호출이 최대 K배까지 늘어남, 기본값: 1)')
+    parser.add_argument('--sections', action='store_true',
+                        help='개요를 먼저 만들고 섹션을 동시에 작성해 이어 붙이기 (실패한 섹션만 다시 요청, --stream보다 우선)')
+    parser.add_argument('--editor-diff', action='store_true',
+                        help='편집자가 글 전체 대신 고칠 문단만 돌려주고 컴퓨터에서 적용 (적용되지 않으면 전체 다시 쓰기)')
+    parser.add_argument('--translate-from', choices=SUPPORTED_LOCALES, metavar='LOCALE',
+                        help='이 언어로 승인된 글이 있으면 새로 쓰지 않고 번역한 뒤 최종결정자 확인만 받기 (예: ko)')
+    parser.add_argument('--no-validation', action='store_true',
+                        help='최종결정자 호출 전 링크, 분량, 브랜드 언급, 섹션, FAQ 구조화 데이터 로컬 검사 끄기')
+    parser.add_argument('--no-duplicate-check', action='store_true',
+                        help='발행된 글과 거의 같은 주제/편집본을 모델 호출 전에 반려하는 로컬 중복 검사 끄기')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='글을 생성하지 않고 새 기능과 명세가 바뀐 기능 목록만 출력')
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='text',
+                        help='report 출력 형식: text(화면), json, prometheus (기본값: text)')
+    parser.add_argument('--output', metavar='PATH',
+                        help=f'report를 json/prometheus로 저장할 파일 경로, export의 출력 폴더 (기본값: {EXPORT_DIR})')
+    parser.add_argument('--since-days', type=float, metavar='N',
+                        help='report에 최근 N일 동안의 기록만 포함')
+    parser.add_argument('--export-format', choices=('markdown', 'html', 'both'), default='both',
+                        help='export로 만들 파일 형식 (기본값: both)')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL,
+                        help=f'export의 sitemap과 canonical 링크에 사용할 주소 (기본값: {DEFAULT_BASE_URL})')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='export에서 파일을 만들 프로세스 수 (기본값: CPU 수)')
+    parser.add_argument('--force', action='store_true',
+                        help='export에서 바뀌지 않은 글도 다시 만들기')
+    parser.add_argument('--worker-id', metavar='NAME',
+                        help='worker 이름 (기본값: 호스트명:프로세스ID)')
+    parser.add_argument('--lease-seconds', type=float, default=JOB_LEASE_SECONDS,
+                        help=f'worker가 가져간 작업을 다른 worker가 다시 가져가기 전까지의 시간(초) (기본값: {JOB_LEASE_SECONDS})')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_SECONDS,
+                        help=f'대기열이 비었을 때 다시 확인하는 간격(초) (기본값: {DEFAULT_POLL_SECONDS})')
+    parser.add_argument('--max-jobs', type=int, metavar='N',
+                        help='worker가 작업 N개를 처리한 뒤 종료')
+    parser.add_argument('--exit-when-empty', action='store_true',
+                        help='worker가 대기열이 비면 기다리지 않고 종료')
+    parser.add_argument('--compress-payloads', choices=PAYLOAD_CODECS,
+                        help='실행 기록의 초안/편집본/판단 본문을 압축해서 저장 (zstd는 zstandard 패키지 필요)')
+    parser.add_argument('--older-than-days', type=float, default=DEFAULT_RETENTION_DAYS, metavar='N',
+                        help=f'db prune에서 N일 넘게 갱신되지 않은 반려/중단 시도만 정리 (기본값: {DEFAULT_RETENTION_DAYS})')
+    parser.add_argument('--archive-file', default=ARCHIVE_DB_NAME, metavar='PATH',
+                        help=f'db prune에서 정리한 시도를 옮겨 둘 SQLite 파일 (기본값: {ARCHIVE_DB_NAME})')
+    parser.add_argument('--no-archive', action='store_true',
+                        help='db prune에서 보관 파일로 옮기지 않고 삭제만 하기')
+    parser.add_argument('--vacuum', action='store_true',
+                        help='db prune/compress 뒤에 VACUUM으로 데이터베이스 파일 크기 줄이기')
+    parser.add_argument('--features-file', metavar='PATH',
+                        help='기능 명세를 URL 대신 로컬 파일에서 불러오기. 경로의 {locale}은 언어 코드로 바뀜 (예: specs/{locale}.json)')
     args = parser.parse_args()
-    
+    configure_logging()
+    if args.batch is not None and args.batch < 1:
+        parser.error('--batch 값은 1 이상이어야 합니다.')
+    for option in ('concurrency', 'rpm', 'tpm', 'max_in_flight', 'candidates'):
+        if getattr(args, option) is not None and getattr(args, option) < 1:
+            parser.error(f"--{option.replace('_', '-')} 값은 1 이상이어야 합니다.")
+    if args.timeout <= 0:
+        parser.error('--timeout 값은 0보다 커야 합니다.')
+    for option in ('lease_seconds', 'poll_interval'):
+        if getattr(args, option) <= 0:
+            parser.error(f"--{option.replace('_', '-')} 값은 0보다 커야 합니다.")
+    if args.max_jobs is not None and args.max_jobs < 1:
+        parser.error('--max-jobs 값은 1 이상이어야 합니다.')
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers 값은 1 이상이어야 합니다.')
+    for option in ('fake_error_rate', 'fake_malformed_rate', 'fake_approve_rate'):
+        if not 0 <= getattr(args, option) <= 1:
+            parser.error(f"--{option.replace('_', '-')} 값은 0에서 1 사이여야 합니다.")
+    if args.db_action and args.command != 'db':
+        parser.error(f"'{args.db_action}' 작업은 db 명령에서만 사용할 수 있습니다. (예: python main.py db {args.db_action})")
+    if args.older_than_days < 0:
+        parser.error('--older-than-days 값은 0 이상이어야 합니다.')
+    if args.command == 'db' and args.db_action == 'compress' and not args.compress_payloads:
+        parser.error('db compress에는 압축 방식(--compress-payloads zlib 또는 zstd)이 필요합니다.')
+    try:
+        set_payload_compression(args.compress_payloads)
+    except ValueError as e:
+        parser.error(str(e))
+
+    locales = args.locales or [args.locale or 'ko']
+    options = {'stream': args.stream, 'features_file': args.features_file,
+               'duplicate_check': not args.no_duplicate_check, 'validation': not args.no_validation,
+               'candidates': args.candidates,
+               'translate_from': args.translate_from, 'sections': args.sections,
+               'editor_diff': args.editor_diff}
+
     conn = db_connect()
+    response_cache = None
     try:
-        print(f"🌍 {args.locale} 언어로 콘텐츠를 생성합니다.")
-        gemini_model = setup_gemini()
-        run_pipeline(conn, gemini_model, args.locale)
+        migrate(conn)
+        if args.command == 'report':
+            run_report(conn, args.format, args.output, args.since_days)
+            return
+        if args.command == 'db':
+            if args.db_action == 'prune':
+                run_db_prune(conn, args.older_than_days, None if args.no_archive else args.archive_file, args.vacuum)
+            elif args.db_action == 'compress':
+                run_db_compress(conn, args.compress_payloads, args.vacuum)
+            else:
+                run_db_stats(conn)
+            return
+        if args.command == 'export':
+            # --locale/--locales를 지정하지 않으면 모든 언어를 내보냅니다.
+            formats = EXPORT_FORMATS if args.export_format == 'both' else (args.export_format,)
+            run_export(conn, args.locales or ([args.locale] if args.locale else None), args.output or EXPORT_DIR,
+                       formats, args.base_url, args.workers, args.force)
+            return
+        if args.dry_run:
+            # 모델 호출 없이 변경 사항만 확인하므로 API 키가 필요 없습니다.
+            asyncio.run(run_dry_run(conn, locales, options))
+            return
+        if args.command == 'enqueue':
+            asyncio.run(run_enqueue(conn, locales, args.batch, options))
+            return
+        print(f"🌍 {', '.join(locales)} 언어로 콘텐츠를 생성합니다.")
+        # 모든 언어의 프롬프트를 미리 불러와 검증합니다. (잘못된 템플릿은 API 호출 전에 발견)
+        get_registry().load(locales, PROMPT_NAMES + (TRANSLATION_PROMPT_NAMES if args.translate_from else ())
+                            + (SECTION_PROMPT_NAMES if args.sections else ())
+                            + (EDITOR_DIFF_PROMPT_NAMES if args.editor_diff else ()))
+        fake_options = {}
+        if args.model == 'fake':
+            fake_options = {
+                'latency': args.fake_latency,
+                'error_rate': args.fake_error_rate,
+                'malformed_rate': args.fake_malformed_rate,
+                'approve_rate': args.fake_approve_rate,
+                'responses_dir': args.fake_responses,
+            }
+        gemini_model = RateLimitedModel(
+            setup_model(args.model, args.model_name, **fake_options),
+            # fake 모델은 API 할당량이 없으므로 직접 지정하지 않으면 속도 제한 없이 실행합니다.
+            requests_per_minute=args.rpm or (None if args.model == 'fake' else DEFAULT_REQUESTS_PER_MINUTE),
+            tokens_per_minute=args.tpm or (None if args.model == 'fake' else DEFAULT_TOKENS_PER_MINUTE),
+            max_in_flight=args.max_in_flight,
+            timeout=args.timeout,
+        )
+        # fake 모델의 합성 응답은 캐시에 저장하지 않습니다.
+        if not args.no_cache and args.model != 'fake':
+            response_cache = ResponseCache()
+            gemini_model = CachedModel(gemini_model, response_cache)
+        if args.command == 'worker':
+            asyncio.run(run_worker(conn, gemini_model, locales, args.concurrency, options,
+                                   worker_id=args.worker_id, lease_seconds=args.lease_seconds,
+                                   poll_interval=args.poll_interval, max_jobs=args.max_jobs,
+                                   exit_when_empty=args.exit_when_empty))
+        elif args.resume:
+            asyncio.run(run_resume(conn, gemini_model, locales, args.concurrency, options))
+        elif args.batch is not None or args.all:
+            asyncio.run(run_batch(conn, gemini_model, locales, args.batch, args.concurrency, options))
+        elif len(locales) > 1:
+            # 같은 기능 하나를 여러 언어로 동시에 생성
+            asyncio.run(run_batch(conn, gemini_model, locales, 1, args.concurrency, options))
+        else:
+            run_pipeline(conn, gemini_model, locales[0], options)
 
     except PipelineError as e:
         error_msg = f"파이프라인 중단: {e}"
         logger.error(error_msg)
         print(f"\n[파이프라인 중단] {e}")
-    
+
     except Exception as e:
         error_msg = f"알 수 없는 치명적 오류 발생: {str(e)}"
         logger.critical(error_msg, exc_info=True)
         print(f"\n[알 수 없는 치명적 오류 발생] {e}")
 
     finally:
+        if response_cache:
+            if response_cache.hits:
+                print(f"\n♻️ 응답 캐시 재사용: {response_cache.hits}건 (새로 생성: {response_cache.misses}건)")
+            response_cache.close()
         if conn:
             conn.close()
             print("\n데이터베이스 연결이 종료되었습니다.")
@@ -0,0 +1,289 @@
+# metrics.py
+"""
+파이프라인 계측(metrics) 모듈입니다.
+Agent 호출과 DB 작업마다 지연 시간, 토큰 사용량, 재시도 횟수, JSON 복구 경로를 기록하고,
+저장된 기록을 Agent/언어별 p50·p95로 요약하거나 JSON·Prometheus 텍스트 형식으로 내보냅니다.
+
+기록은 contextvars로 현재 파이프라인(asyncio Task)에 묶이므로,
+여러 파이프라인이 동시에 실행돼도 서로의 기록이 섞이지 않습니다.
+"""
+import asyncio
+import contextlib
+import contextvars
+import datetime
+import json
+import time
+
+# 토큰 100만 개당 예상 비용(USD, Gemini 2.5 Flash 유료 등급 기준)
+PRICE_PER_MILLION_TOKENS = {'prompt': 0.30, 'response': 2.50}
+
+# 보고서에 표시하는 백분위수
+REPORT_QUANTILES = (0.5, 0.95)
+
+# 현재 파이프라인의 기록 모음 ({'pipeline_id', 'locale', 'calls': [...]})
+_collector = contextvars.ContextVar('easytool_metrics_collector', default=None)
+
+# 현재 진행 중인 Agent 호출 기록
+_current_call = contextvars.ContextVar('easytool_metrics_call', default=None)
+
+def start_collecting(locale=None):
+    """현재 Task에서 발생하는 기록을 모을 collector를 만들고 반환합니다."""
+    collector = {'pipeline_id': None, 'locale': locale, 'calls': []}
+    _collector.set(collector)
+    return collector
+
+def current_collector():
+    """현재 Task의 collector를 반환합니다. (없으면 None)"""
+    return _collector.get()
+
+def bind_pipeline(pipeline_id, locale):
+    """현재 collector에 파이프라인 ID와 언어를 기록합니다."""
+    collector = _collector.get()
+    if collector is not None:
+        collector['pipeline_id'] = pipeline_id
+        collector['locale'] = locale
+
+def new_record(kind, step):
+    """비어 있는 계측 기록을 만듭니다. kind는 'agent' 또는 'db'입니다."""
+    return {
+        'kind': kind,
+        'step': step,
+        'latency_ms': 0.0,
+        'prompt_tokens': 0,
+        'response_tokens': 0,
+        'tokens_estimated': False,
+        'retries': 0,
+        'json_path': None,
+        'schema_errors': 0,
+        'cached': False,
+        'status': 'ok',
+        'created_at': datetime.datetime.now(),
+    }
+
+@contextlib.contextmanager
+def agent_call(agent_name):
+    """
+    Agent 호출 하나를 계측합니다. 블록 안에서 호출한 record_* 함수의 값이 이 기록에 모입니다.
+    블록이 끝나면 지연 시간과 성공 여부를 채워 현재 collector에 추가합니다.
+    """
+    record = new_record('agent', agent_name)
+    token = _current_call.set(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except asyncio.CancelledError:
+        # 다른 후보 글이 먼저 승인되는 등으로 취소된 호출은 실패와 따로 셉니다.
+        record['status'] = 'cancelled'
+        raise
+    except BaseException:
+        record['status'] = 'error'
+        raise
+    finally:
+        record['latency_ms'] = (time.perf_counter() - started) * 1000
+        _current_call.reset(token)
+        collector = _collector.get()
+        if collector is not None:
+            collector['calls'].append(record)
+
+def record_db_call(collector, func_name, latency_ms, failed=False):
+    """DB 작업 하나의 실행 시간을 collector에 추가합니다. (쓰기 스레드에서 호출)"""
+    if collector is None:
+        return
+    record = new_record('db', func_name)
+    record['latency_ms'] = latency_ms
+    record['status'] = 'error' if failed else 'ok'
+    collector['calls'].append(record)
+
+def record_retry():
+    """현재 Agent 호출의 재시도 횟수를 늘립니다."""
+    record = _current_call.get()
+    if record is not None:
+        record['retries'] += 1
+
+def record_usage(response):
+    """모델 응답의 사용량 메타데이터(usage_metadata)에서 토큰 수를 더합니다."""
+    record = _current_call.get()
+    usage = getattr(response, 'usage_metadata', None)
+    if record is None or usage is None:
+        return
+    record['prompt_tokens'] += getattr(usage, 'prompt_token_count', 0) or 0
+    record['response_tokens'] += getattr(usage, 'candidates_token_count', 0) or 0
+
+def record_estimated_usage(prompt_tokens, response_tokens):
+    """사용량 메타데이터가 없을 때(스트리밍 등) 추정한 토큰 수를 기록합니다."""
+    record = _current_call.get()
+    if record is None or record['cached'] or record['prompt_tokens'] or record['response_tokens']:
+        return
+    record['prompt_tokens'] = prompt_tokens
+    record['response_tokens'] = response_tokens
+    record['tokens_estimated'] = True
+
+def record_cache_hit():
+    """현재 Agent 호출이 응답 캐시에서 처리되었음을 기록합니다."""
+    record = _current_call.get()
+    if record is not None:
+        record['cached'] = True
+
+def record_schema_error():
+    """현재 Agent 호출에서 응답이 스키마와 맞지 않았던 횟수를 늘립니다."""
+    record = _current_call.get()
+    if record is not None:
+        record['schema_errors'] += 1
+
+def record_json_path(path):
+    """JSON 응답을 파싱한 경로(strict, repaired, model_fix, failed)를 기록합니다."""
+    record = _current_call.get()
+    if record is not None:
+        record['json_path'] = path
+
+def estimate_cost(prompt_tokens, response_tokens):
+    """토큰 수로 예상 비용(USD)을 계산합니다."""
+    return (prompt_tokens * PRICE_PER_MILLION_TOKENS['prompt']
+            + response_tokens * PRICE_PER_MILLION_TOKENS['response']) / 1_000_000
+
+# --- 보고서 및 내보내기 ---
+
+def load_metric_rows(conn, since_days=None):
+    """'agent_metrics' 테이블의 기록을 dict 리스트로 불러옵니다. since_days가 있으면 최근 기록만 불러옵니다."""
+    query = "SELECT * FROM agent_metrics"
+    params = ()
+    if since_days is not None:
+        query += " WHERE created_at >= ?"
+        params = (datetime.datetime.now() - datetime.timedelta(days=since_days),)
+    cursor = conn.execute(query, params)
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def percentile(sorted_values, quantile):
+    """정렬된 값에서 선형 보간으로 백분위수를 구합니다."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * quantile
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def summarize(rows):
+    """
+    기록을 (종류, 단계, 언어)별로 묶어 호출 수, 지연 시간 백분위수, 토큰, 재시도, 캐시 적중,
+    JSON 복구 경로, 스키마 위반, 예상 비용을 계산합니다.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['kind'], row['step'], row['locale']), []).append(row)
+
+    summary = []
+    for (kind, step, locale), group in sorted(groups.items(), key=lambda item: tuple(str(k) for k in item[0])):
+        latencies = sorted(row['latency_ms'] for row in group)
+        prompt_tokens = sum(row['prompt_tokens'] or 0 for row in group)
+        response_tokens = sum(row['response_tokens'] or 0 for row in group)
+        json_paths = {}
+        for row in group:
+            if row['json_path']:
+                json_paths[row['json_path']] = json_paths.get(row['json_path'], 0) + 1
+        summary.append({
+            'kind': kind,
+            'step': step,
+            'locale': locale,
+            'count': len(group),
+            'errors': sum(1 for row in group if row['status'] == 'error'),
+            'cancelled': sum(1 for row in group if row['status'] == 'cancelled'),
+            'latency_ms': {str(q): round(percentile(latencies, q), 1) for q in REPORT_QUANTILES},
+            'latency_ms_sum': round(sum(latencies), 1),
+            'prompt_tokens': prompt_tokens,
+            'response_tokens': response_tokens,
+            'retries': sum(row['retries'] or 0 for row in group),
+            'cache_hits': sum(1 for row in group if row['cached']),
+            'json_paths': json_paths,
+            'schema_errors': sum(row.get('schema_errors') or 0 for row in group),
+            'cost_usd': round(estimate_cost(prompt_tokens, response_tokens), 6),
+        })
+    return summary
+
+def print_report(summary):
+    """요약 결과를 표 형태로 출력합니다."""
+    print("\n" + "="*50)
+    print("📈 파이프라인 계측 보고서")
+    if not summary:
+        print("   - 아직 기록된 계측 데이터가 없습니다.")
+        print("="*50)
+        return
+    for kind, title in (('agent', 'Agent 호출'), ('db', 'DB 작업')):
+        rows = [item for item in summary if item['kind'] == kind]
+        if not rows:
+            continue
+        print(f"\n[{title}]")
+        for item in rows:
+            line = (f"   - {item['step']} ({item['locale']}): {item['count']}회, "
+                    f"p50 {item['latency_ms']['0.5']:.0f}ms / p95 {item['latency_ms']['0.95']:.0f}ms")
+            if kind == 'agent':
+                line += (f", 토큰 {item['prompt_tokens']}+{item['response_tokens']}, "
+                         f"재시도 {item['retries']}, 캐시 {item['cache_hits']}, ${item['cost_usd']:.4f}")
+                if item['json_paths']:
+                    line += f", JSON {item['json_paths']}"
+                if item['schema_errors']:
+                    line += f", 스키마 위반 {item['schema_errors']}"
+            if item['errors']:
+                line += f", 실패 {item['errors']}"
+            if item['cancelled']:
+                line += f", 취소 {item['cancelled']}"
+            print(line)
+    total_cost = sum(item['cost_usd'] for item in summary)
+    print(f"\n   💰 예상 비용 합계: ${total_cost:.4f}")
+    print("="*50)
+
+def export_json(summary, path):
+    """요약 결과를 JSON 파일로 저장합니다."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'generated_at': datetime.datetime.now().isoformat(timespec='seconds'), 'metrics': summary},
+                  f, ensure_ascii=False, indent=2)
+
+def prometheus_labels(**labels):
+    """Prometheus 라벨 문자열을 만듭니다. (역슬래시, 따옴표, 줄바꿈은 이스케이프)"""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+def format_prometheus(summary):
+    """요약 결과를 Prometheus 텍스트 형식(textfile collector용)으로 변환합니다."""
+    lines = [
+        "# HELP easytool_step_latency_seconds Agent 호출 및 DB 작업 지연 시간",
+        "# TYPE easytool_step_latency_seconds summary",
+    ]
+    for item in summary:
+        labels = {'kind': item['kind'], 'step': item['step'], 'locale': item['locale']}
+        for quantile, value in item['latency_ms'].items():
+            lines.append(f"easytool_step_latency_seconds{prometheus_labels(**labels, quantile=quantile)} {value / 1000:.6f}")
+        lines.append(f"easytool_step_latency_seconds_sum{prometheus_labels(**labels)} {item['latency_ms_sum'] / 1000:.6f}")
+        lines.append(f"easytool_step_latency_seconds_count{prometheus_labels(**labels)} {item['count']}")
+
+    agent_items = [item for item in summary if item['kind'] == 'agent']
+    counters = (
+        ('easytool_agent_tokens_total', 'Agent 호출 토큰 수',
+         lambda item: [({'direction': 'prompt'}, item['prompt_tokens']),
+                       ({'direction': 'response'}, item['response_tokens'])]),
+        ('easytool_agent_retries_total', 'Agent 호출 재시도 횟수', lambda item: [({}, item['retries'])]),
+        ('easytool_agent_cache_hits_total', '응답 캐시 적중 횟수', lambda item: [({}, item['cache_hits'])]),
+        ('easytool_agent_errors_total', 'Agent 호출 실패 횟수', lambda item: [({}, item['errors'])]),
+        ('easytool_agent_cancelled_total', '취소된 Agent 호출 횟수', lambda item: [({}, item['cancelled'])]),
+        ('easytool_agent_json_parse_total', 'JSON 파싱 경로별 횟수',
+         lambda item: [({'path': path}, count) for path, count in item['json_paths'].items()]),
+        ('easytool_agent_schema_errors_total', '응답이 스키마와 맞지 않은 횟수',
+         lambda item: [({}, item['schema_errors'])]),
+        ('easytool_agent_cost_usd_total', '예상 비용(USD)', lambda item: [({}, item['cost_usd'])]),
+    )
+    for name, help_text, values in counters:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for item in agent_items:
+            for extra_labels, value in values(item):
+                labels = prometheus_labels(step=item['step'], locale=item['locale'], **extra_labels)
+                lines.append(f"{name}{labels} {value}")
+    return '\n'.join(lines) + '\n'
+
+def export_prometheus(summary, path):
+    """요약 결과를 Prometheus 텍스트 파일로 저장합니다."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(format_prometheus(summary))
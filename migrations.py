@@ -0,0 +1,191 @@
+# migrations.py
+"""
+데이터베이스 스키마 마이그레이션 모듈입니다.
+적용된 버전을 'schema_version' 테이블에 기록하고, 아직 적용되지 않은 마이그레이션만 순서대로 실행합니다.
+모든 마이그레이션은 여러 번 실행해도 안전하도록(idempotent) 작성되어 있어
+기존 데이터베이스를 지우지 않고 최신 스키마로 올릴 수 있습니다.
+"""
+import datetime
+import logging
+from db_handler import batch_writes
+
+logger = logging.getLogger('easytool')
+
+def create_base_tables(cursor):
+    """pipeline_logs(작업 로그)와 articles(승인된 콘텐츠) 테이블을 생성합니다."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS pipeline_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tool_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        locale TEXT NOT NULL DEFAULT 'ko',
+        creator_draft TEXT,
+        editor_revision TEXT,
+        decider_judgment_json TEXT,
+        rejection_reason TEXT,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pipeline_log_id INTEGER,
+        tool_name TEXT NOT NULL,
+        title TEXT NOT NULL,
+        meta_description TEXT,
+        content_markdown TEXT NOT NULL,
+        structured_data_json TEXT,
+        published_at DATETIME,
+        locale TEXT NOT NULL DEFAULT 'ko',
+        FOREIGN KEY (pipeline_log_id) REFERENCES pipeline_logs (id)
+    )
+    ''')
+
+def add_column_if_missing(cursor, table, column, definition):
+    """테이블에 컬럼이 없을 때만 추가합니다."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def add_creator_meta_column(cursor):
+    """재개 시 작성자 메타데이터(제목, 설명, FAQ)를 복원할 수 있도록 컬럼을 추가합니다."""
+    add_column_if_missing(cursor, 'pipeline_logs', 'creator_meta_json', 'TEXT')
+
+def add_lookup_indexes(cursor):
+    """
+    발행 목록 조회(locale)와 재개/리포트 조회(status, tool_name)용 인덱스를 만들고,
+    같은 도구와 언어의 글이 중복 저장되지 않도록 유니크 인덱스를 추가합니다.
+    유니크 인덱스를 만들기 전에 기존 중복 글은 가장 최근 것만 남기고, 나머지는 'articles_duplicates' 테이블로 옮깁니다.
+    """
+    older = "SELECT id FROM articles WHERE id NOT IN (SELECT MAX(id) FROM articles GROUP BY locale, tool_name)"
+    cursor.execute(f"SELECT COUNT(*) FROM ({older})")
+    duplicates = cursor.fetchone()[0]
+    if duplicates:
+        # 지운 글을 나중에 확인하거나 되살릴 수 있도록 같은 컬럼의 보관 테이블에 먼저 복사합니다.
+        cursor.execute("CREATE TABLE IF NOT EXISTS articles_duplicates AS SELECT * FROM articles WHERE 0")
+        cursor.execute("PRAGMA table_info(articles_duplicates)")
+        columns = ', '.join(row[1] for row in cursor.fetchall())
+        cursor.execute(f"INSERT INTO articles_duplicates ({columns}) SELECT {columns} FROM articles WHERE id IN ({older})")
+        cursor.execute(f"DELETE FROM articles WHERE id IN ({older})")
+        logger.warning(f"중복된 articles {duplicates}건을 articles_duplicates 테이블로 옮겼습니다. (도구/언어별 최신 글만 유지)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_locale_tool ON articles (locale, tool_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pipeline_logs_locale_tool ON pipeline_logs (locale, tool_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pipeline_logs_status_locale ON pipeline_logs (status, locale)")
+
+def add_article_spec_hash(cursor):
+    """글을 만들 때 사용한 기능 명세의 해시를 저장해, 명세가 바뀐 글만 다시 생성할 수 있게 합니다."""
+    add_column_if_missing(cursor, 'articles', 'spec_hash', 'TEXT')
+
+def create_agent_metrics_table(cursor):
+    """Agent 호출과 DB 작업의 계측 기록(지연 시간, 토큰, 재시도, JSON 복구 경로)을 저장하는 테이블을 만듭니다."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS agent_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pipeline_log_id INTEGER,
+        locale TEXT,
+        kind TEXT NOT NULL,
+        step TEXT NOT NULL,
+        latency_ms REAL NOT NULL,
+        prompt_tokens INTEGER NOT NULL DEFAULT 0,
+        response_tokens INTEGER NOT NULL DEFAULT 0,
+        tokens_estimated INTEGER NOT NULL DEFAULT 0,
+        retries INTEGER NOT NULL DEFAULT 0,
+        json_path TEXT,
+        cached INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL,
+        created_at DATETIME NOT NULL,
+        FOREIGN KEY (pipeline_log_id) REFERENCES pipeline_logs (id)
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_metrics_pipeline ON agent_metrics (pipeline_log_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_metrics_created_at ON agent_metrics (created_at)")
+
+def create_jobs_table(cursor):
+    """
+    worker 모드가 사용하는 작업 큐 테이블을 만듭니다.
+    여러 worker가 같은 DB를 나눠 쓰므로, 작업을 가져갈 때 lease(소유자와 만료 시각)를 기록하고
+    대기/진행 중인 작업은 도구와 언어별로 하나만 있도록 부분 고유 인덱스를 둡니다.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tool_name TEXT NOT NULL,
+        locale TEXT NOT NULL DEFAULT 'ko',
+        status TEXT NOT NULL DEFAULT 'queued',
+        result TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3,
+        lease_owner TEXT,
+        lease_expires_at DATETIME,
+        available_at DATETIME NOT NULL,
+        last_error TEXT,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )
+    ''')
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_locale_tool
+        ON jobs (locale, tool_name) WHERE status IN ('queued', 'leased')
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_available ON jobs (status, available_at)")
+
+def add_editor_diff_column(cursor):
+    """diff 편집 모드(--editor-diff)에서 편집자가 돌려준 편집 목록을 저장합니다."""
+    add_column_if_missing(cursor, 'pipeline_logs', 'editor_diff_json', 'TEXT')
+
+def add_schema_errors_column(cursor):
+    """응답이 스키마와 맞지 않았던 횟수를 JSON 파싱 경로와 따로 기록합니다. (모델 수정으로 복구된 경우 포함)"""
+    add_column_if_missing(cursor, 'agent_metrics', 'schema_errors', 'INTEGER NOT NULL DEFAULT 0')
+
+def add_pipeline_spec_hash(cursor):
+    """중복으로 반려한 시도에 기능 명세의 해시를 남겨, 명세가 그대로인 동안 같은 주제를 다시 고르지 않게 합니다."""
+    add_column_if_missing(cursor, 'pipeline_logs', 'spec_hash', 'TEXT')
+
+# (버전, 설명, 마이그레이션 함수) — 이미 배포된 항목은 수정하지 말고 새 버전을 뒤에 추가하세요.
+MIGRATIONS = [
+    (1, "기본 테이블 생성", create_base_tables),
+    (2, "pipeline_logs.creator_meta_json 컬럼 추가", add_creator_meta_column),
+    (3, "조회 인덱스 및 도구/언어별 글 중복 방지", add_lookup_indexes),
+    (4, "articles.spec_hash 컬럼 추가", add_article_spec_hash),
+    (5, "agent_metrics 계측 테이블 생성", create_agent_metrics_table),
+    (6, "jobs 작업 큐 테이블 생성", create_jobs_table),
+    (7, "pipeline_logs.editor_diff_json 컬럼 추가", add_editor_diff_column),
+    (8, "agent_metrics.schema_errors 컬럼 추가", add_schema_errors_column),
+    (9, "pipeline_logs.spec_hash 컬럼 추가", add_pipeline_spec_hash),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """현재 적용된 스키마 버전을 반환합니다. (기록이 없으면 0)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+def migrate(conn):
+    """
+    아직 적용되지 않은 마이그레이션을 순서대로 실행합니다.
+    각 마이그레이션은 버전 기록과 함께 하나의 트랜잭션으로 적용되며, 적용한 개수를 반환합니다.
+    """
+    current = get_schema_version(conn)
+    applied = 0
+    for version, description, func in MIGRATIONS:
+        if version <= current:
+            continue
+        with batch_writes(conn):
+            # DDL도 트랜잭션에 포함되도록 명시적으로 시작합니다.
+            conn.execute("BEGIN")
+            cursor = conn.cursor()
+            func(cursor)
+            cursor.execute("INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                           (version, description, datetime.datetime.now()))
+        logger.info(f"스키마 마이그레이션 v{version} 적용: {description}")
+        applied += 1
+    return applied
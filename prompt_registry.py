@@ -0,0 +1,190 @@
+# prompt_registry.py
+"""
+프롬프트 템플릿 레지스트리입니다.
+prompts/{locale}/*.md 파일을 시작할 때 한 번만 읽어 필수 플레이스홀더를 검증하고,
+str.format을 매번 다시 해석하지 않도록 미리 조각(문자열, 필드) 단위로 컴파일해 둡니다.
+오래 실행되는 동안 파일이 수정되면(mtime 변경) 다음 사용 시점에 다시 불러옵니다.
+"""
+import os
+import string
+import threading
+import time
+from agents import PipelineError, logger
+
+PROMPTS_DIR = "prompts"
+
+# 파이프라인에서 사용하는 프롬프트 이름
+PROMPT_NAMES = ('creator', 'editor', 'decider')
+
+# 번역 모드(--translate-from)에서만 사용하는 프롬프트 이름
+TRANSLATION_PROMPT_NAMES = ('translator',)
+
+# 섹션 모드(--sections)에서만 사용하는 프롬프트 이름
+SECTION_PROMPT_NAMES = ('outline', 'section', 'faq')
+
+# diff 편집 모드(--editor-diff)에서만 사용하는 프롬프트 이름
+EDITOR_DIFF_PROMPT_NAMES = ('editor_diff',)
+
+# 프롬프트별로 반드시 있어야 하는 플레이스홀더
+REQUIRED_PLACEHOLDERS = {
+    'creator': ('name', 'endpoint', 'description'),
+    'editor': ('draft_content',),
+    'decider': ('name', 'endpoint', 'description', 'edited_content', 'existing_articles_list'),
+    'translator': ('source_language', 'content'),
+    'outline': ('name', 'endpoint', 'description'),
+    'section': ('title', 'outline', 'heading', 'key_points'),
+    'faq': ('title', 'outline', 'key_points'),
+    'editor_diff': ('draft_content',),
+}
+
+# 파일 변경 여부(mtime)를 확인하는 최소 간격(초)
+RELOAD_CHECK_SECONDS = 2.0
+
+class CompiledTemplate:
+    """
+    미리 해석해 둔 프롬프트 템플릿입니다. str.format과 같은 결과를 돌려주는 format(**values)를 제공합니다.
+    서식 지정자나 속성 접근({x.y}, {x:>10})이 없는 단순 필드만 있으면 조각을 이어 붙이기만 하고,
+    그 밖의 경우에는 str.format으로 처리합니다.
+    """
+
+    def __init__(self, text, path=None):
+        self.text = text
+        self.path = path
+        self.segments = []
+        self.fields = set()
+        self.simple = True
+        for literal, field, format_spec, conversion in string.Formatter().parse(text):
+            if field is not None:
+                self.fields.add(field)
+                if format_spec or conversion or not field.isidentifier():
+                    self.simple = False
+            self.segments.append((literal, field))
+
+    def format(self, **values):
+        if not self.simple:
+            return self.text.format(**values)
+        parts = []
+        for literal, field in self.segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(str(values[field]))
+        return ''.join(parts)
+
+def find_prompt_path(name, locale, base_dir=PROMPTS_DIR):
+    """언어별 프롬프트 파일 경로를 반환합니다. 없으면 기본 파일(prompts/{name}.md), 그것도 없으면 None."""
+    for path in (os.path.join(base_dir, locale, f"{name}.md"), os.path.join(base_dir, f"{name}.md")):
+        if os.path.exists(path):
+            return path
+    return None
+
+def compile_prompt(name, path):
+    """프롬프트 파일을 읽어 컴파일하고, 형식 오류나 빠진 필수 플레이스홀더가 있으면 PipelineError를 발생시킵니다."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        template = CompiledTemplate(text, path)
+    except ValueError as e:
+        raise PipelineError(f"프롬프트 형식 오류 ({path}): {e} (중괄호는 {{{{ }}}}로 써야 합니다)")
+    missing = [field for field in REQUIRED_PLACEHOLDERS.get(name, ()) if field not in template.fields]
+    if missing:
+        raise PipelineError(f"프롬프트에 필요한 플레이스홀더가 없습니다 ({path}): "
+                            + ', '.join(f'{{{field}}}' for field in missing))
+    return template
+
+class PromptRegistry:
+    """언어별 프롬프트 템플릿을 한 번만 불러와 보관하고, 파일이 바뀌면 다시 불러옵니다."""
+
+    def __init__(self, base_dir=PROMPTS_DIR, names=PROMPT_NAMES, auto_reload=True):
+        self.base_dir = base_dir
+        self.names = names
+        self.auto_reload = auto_reload
+        self._templates = {}
+        self._mtimes = {}
+        self._last_check = {}
+        self._lock = threading.Lock()
+
+    def load(self, locales, names=None):
+        """
+        지정된 언어의 모든 프롬프트(names가 없으면 레지스트리의 기본 이름 목록)를 불러와 검증합니다.
+        문제가 하나라도 있으면 모든 문제를 모아 PipelineError로 알려줍니다.
+        """
+        errors = []
+        for locale in locales:
+            for name in names or self.names:
+                try:
+                    self._load(name, locale)
+                except PipelineError as e:
+                    errors.append(str(e))
+        if errors:
+            for error in errors:
+                logger.error(error)
+            raise PipelineError("프롬프트 검증 실패:\n  - " + "\n  - ".join(errors))
+
+    def _load(self, name, locale):
+        path = find_prompt_path(name, locale, self.base_dir)
+        if path is None:
+            raise PipelineError(f"프롬프트 파일을 찾을 수 없습니다: "
+                                f"{os.path.join(self.base_dir, locale, name + '.md')} 또는 "
+                                f"{os.path.join(self.base_dir, name + '.md')}")
+        if os.path.dirname(path) == self.base_dir:
+            logger.warning(f"{locale} 언어 프롬프트 파일이 없어 기본 파일을 사용합니다: {path}")
+        mtime = os.path.getmtime(path)
+        template = compile_prompt(name, path)
+        with self._lock:
+            self._templates[(name, locale)] = template
+            self._mtimes[(name, locale)] = (path, mtime)
+            self._last_check[(name, locale)] = time.monotonic()
+        return template
+
+    def _is_stale(self, key):
+        """마지막 확인 후 RELOAD_CHECK_SECONDS가 지났고 파일 경로나 mtime이 바뀌었으면 참입니다."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_check.get(key, 0) < RELOAD_CHECK_SECONDS:
+                return False
+            self._last_check[key] = now
+            path, mtime = self._mtimes[key]
+        current_path = find_prompt_path(key[0], key[1], self.base_dir)
+        try:
+            return current_path != path or os.path.getmtime(path) != mtime
+        except OSError:
+            return True
+
+    def get(self, name, locale):
+        """컴파일된 템플릿을 반환합니다. 처음 요청되었거나 파일이 바뀌었으면 다시 불러옵니다."""
+        key = (name, locale)
+        template = self._templates.get(key)
+        if template is None:
+            return self._load(name, locale)
+        if self.auto_reload and self._is_stale(key):
+            try:
+                template = self._load(name, locale)
+                logger.info(f"프롬프트가 변경되어 다시 불러왔습니다: {template.path}")
+                print(f"🔄 프롬프트 변경 감지: {template.path}")
+            except (OSError, PipelineError) as e:
+                # 수정 중인 파일이 잘못되었으면 이전 템플릿을 계속 사용합니다.
+                logger.error(f"프롬프트 다시 불러오기 실패, 이전 버전을 사용합니다: {e}")
+        return template
+
+    def for_locale(self, locale):
+        """prompts['creator']처럼 이름으로 템플릿을 꺼낼 수 있는 언어별 보기를 반환합니다."""
+        return LocalePrompts(self, locale)
+
+class LocalePrompts:
+    """한 언어의 프롬프트 보기. 꺼낼 때마다 레지스트리에서 최신 템플릿을 가져옵니다."""
+
+    def __init__(self, registry, locale):
+        self.registry = registry
+        self.locale = locale
+
+    def __getitem__(self, name):
+        return self.registry.get(name, self.locale)
+
+_default_registry = None
+
+def get_registry():
+    """프로그램 전체에서 공유하는 기본 레지스트리를 반환합니다."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = PromptRegistry()
+    return _default_registry
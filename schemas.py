@@ -0,0 +1,191 @@
+# schemas.py
+"""
+작성자, 편집자(diff 모드), 최종결정자, 번역가, 개요/FAQ 작성자 JSON 응답의 스키마입니다.
+Gemini 요청의 response_schema로 넘겨 모델이 이 형태로만 답하게 하고,
+받은 응답도 같은 스키마로 검사해 필드가 빠졌거나 형식이 다르면 복구 단계로 넘깁니다.
+스키마는 Gemini가 지원하는 OpenAPI 부분집합(type, properties, items, required, enum)만 사용합니다.
+"""
+
+# 언어별 최종결정자 결정 값 (승인, 반려)
+DECISION_VALUES = {
+    'ko': ('승인', '반려'),
+    'en': ('approval', 'rejection'),
+}
+
+# 본문에 FAQ가 없으면 빈 객체({})도 허용합니다.
+FAQ_JSON_LD_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "@context": {"type": "STRING"},
+        "@type": {"type": "STRING"},
+        "mainEntity": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "@type": {"type": "STRING"},
+                    "name": {"type": "STRING"},
+                    "acceptedAnswer": {
+                        "type": "OBJECT",
+                        "properties": {
+                            "@type": {"type": "STRING"},
+                            "text": {"type": "STRING"},
+                        },
+                        "required": ["text"],
+                    },
+                },
+                "required": ["name", "acceptedAnswer"],
+            },
+        },
+    },
+}
+
+def build_faq_json_ld(questions):
+    """[{'question', 'answer'}, ...] 목록으로 FAQ_JSON_LD_SCHEMA를 따르는 FAQPage JSON-LD를 만듭니다."""
+    return {
+        "@context": "https://schema.org",
+        "@type": "FAQPage",
+        "mainEntity": [
+            {"@type": "Question", "name": item['question'],
+             "acceptedAnswer": {"@type": "Answer", "text": item['answer']}}
+            for item in questions
+        ],
+    }
+
+CREATOR_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "title": {"type": "STRING"},
+        "meta_description": {"type": "STRING"},
+        "article_markdown": {"type": "STRING"},
+        "faq_json_ld": FAQ_JSON_LD_SCHEMA,
+    },
+    "required": ["title", "meta_description", "article_markdown"],
+}
+
+# 번역 단계에서 제목, 메타 설명, FAQ를 한 번에 번역할 때의 응답 스키마
+TRANSLATION_META_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "title": {"type": "STRING"},
+        "meta_description": {"type": "STRING"},
+        "faq_json_ld": FAQ_JSON_LD_SCHEMA,
+    },
+    "required": ["title", "meta_description"],
+}
+
+# 섹션 모드(--sections)에서 개요가 가져야 하는 섹션 종류 (작성 순서)
+SECTION_KINDS = ('introduction', 'concept', 'benefits', 'usage', 'tips', 'faq', 'conclusion')
+
+OUTLINE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "title": {"type": "STRING"},
+        "meta_description": {"type": "STRING"},
+        "sections": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "kind": {"type": "STRING", "format": "enum", "enum": list(SECTION_KINDS)},
+                    "heading": {"type": "STRING"},
+                    "key_points": {"type": "ARRAY", "items": {"type": "STRING"}},
+                },
+                "required": ["kind", "heading"],
+            },
+        },
+    },
+    "required": ["title", "meta_description", "sections"],
+}
+
+FAQ_SECTION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "questions": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "question": {"type": "STRING"},
+                    "answer": {"type": "STRING"},
+                },
+                "required": ["question", "answer"],
+            },
+        },
+    },
+    "required": ["questions"],
+}
+
+# diff 편집 모드에서 편집자가 돌려주는 블록 단위 편집 목록
+EDITOR_DIFF_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "edits": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "block": {"type": "INTEGER"},
+                    "original": {"type": "STRING"},
+                    "replacement": {"type": "STRING"},
+                },
+                "required": ["block", "replacement"],
+            },
+        },
+    },
+    "required": ["edits"],
+}
+
+def decider_schema(locale='ko'):
+    """언어별 결정 값을 enum으로 가진 최종결정자 응답 스키마를 반환합니다."""
+    return {
+        "type": "OBJECT",
+        "properties": {
+            "decision": {"type": "STRING", "format": "enum", "enum": list(DECISION_VALUES[locale])},
+            "reason": {"type": "STRING"},
+            "final_title": {"type": "STRING"},
+        },
+        "required": ["decision", "reason"],
+    }
+
+class SchemaError(ValueError):
+    """JSON 응답이 스키마와 맞지 않을 때 발생합니다. errors에 위반 항목 목록이 들어 있습니다."""
+
+    def __init__(self, errors):
+        super().__init__("응답이 스키마와 맞지 않습니다: " + "; ".join(errors))
+        self.errors = errors
+
+TYPE_CHECKS = {
+    "OBJECT": lambda value: isinstance(value, dict),
+    "ARRAY": lambda value: isinstance(value, list),
+    "STRING": lambda value: isinstance(value, str),
+    "INTEGER": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "NUMBER": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "BOOLEAN": lambda value: isinstance(value, bool),
+}
+
+def validate(value, schema, path='$'):
+    """value가 schema를 따르는지 검사하고 위반 항목을 문자열 리스트로 반환합니다. (없으면 빈 리스트)"""
+    expected = schema.get("type")
+    if expected and not TYPE_CHECKS[expected](value):
+        return [f"{path}: {expected} 형식이어야 합니다 (받은 값: {type(value).__name__})"]
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {schema['enum']} 중 하나여야 합니다 (받은 값: {value!r})")
+    if expected == "OBJECT":
+        for key in schema.get("required", ()):
+            if key not in value:
+                errors.append(f"{path}.{key}: 필수 필드가 없습니다")
+        for key, property_schema in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate(value[key], property_schema, f"{path}.{key}"))
+    elif expected == "ARRAY" and "items" in schema:
+        for index, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{index}]"))
+    return errors
+
+def check(value, schema):
+    """value가 schema를 따르지 않으면 SchemaError를 발생시킵니다."""
+    errors = validate(value, schema)
+    if errors:
+        raise SchemaError(errors)
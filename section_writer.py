@@ -0,0 +1,91 @@
+# section_writer.py
+"""
+개요를 먼저 만들고 섹션을 동시에 작성하는 작성자 모드입니다. (--sections)
+긴 가이드 전체를 하나의 JSON 응답으로 받는 대신 제목, 메타 설명, 섹션 개요를 먼저 받고
+섹션 본문을 동시에 요청해 이어 붙입니다. 글 하나의 작성 시간은 가장 오래 걸린 섹션 정도로 줄고,
+실패한 섹션은 그 섹션만 다시 요청합니다. FAQ는 질문/답변 JSON으로 받아 본문과 FAQPage JSON-LD를 함께 만듭니다.
+"""
+import asyncio
+from agents import run_ai_agent_async, PipelineError, logger
+from schemas import OUTLINE_SCHEMA, FAQ_SECTION_SCHEMA, build_faq_json_ld
+
+# 섹션 하나를 다시 요청하는 최대 횟수 (API 오류 재시도와 별개로, 응답 내용이 잘못된 경우)
+SECTION_MAX_ATTEMPTS = 3
+
+def format_outline(outline):
+    """섹션 프롬프트에 넣을 전체 개요(번호 목록)를 만듭니다."""
+    lines = []
+    for number, section in enumerate(outline['sections'], 1):
+        lines.append(f"{number}. {section['heading']}")
+        lines.extend(f"   - {point}" for point in section.get('key_points') or ())
+    return '\n'.join(lines)
+
+def format_key_points(section):
+    return '\n'.join(f"  - {point}" for point in section.get('key_points') or ())
+
+def ensure_heading(markdown, heading):
+    """섹션 본문이 소제목으로 시작하지 않으면 '## 소제목'을 붙입니다."""
+    text = markdown.strip()
+    return text if text.startswith('#') else f"## {heading}\n\n{text}"
+
+def build_faq(section, questions):
+    """FAQ 질문/답변으로 본문 섹션과 FAQPage JSON-LD를 함께 만들어 (마크다운, JSON-LD)를 반환합니다."""
+    parts = [f"## {section['heading']}"]
+    parts.extend(f"### {item['question']}\n\n{item['answer']}" for item in questions)
+    return '\n\n'.join(parts), build_faq_json_ld(questions)
+
+async def write_section(model, prompts, selected_tool, outline, section):
+    """
+    섹션 하나를 작성해 (마크다운, FAQ JSON-LD 또는 None)을 반환합니다.
+    실패하면 이 섹션만 SECTION_MAX_ATTEMPTS번까지 다시 요청합니다.
+    """
+    values = {
+        **selected_tool,
+        'title': outline['title'],
+        'outline': format_outline(outline),
+        'heading': section['heading'],
+        'key_points': format_key_points(section),
+    }
+    for attempt in range(1, SECTION_MAX_ATTEMPTS + 1):
+        try:
+            if section['kind'] == 'faq':
+                result = await run_ai_agent_async(model, "섹션 작성자", prompts['faq'].format(**values),
+                                                  is_json_output=True, response_schema=FAQ_SECTION_SCHEMA)
+                return build_faq(section, result['questions'])
+            text = await run_ai_agent_async(model, "섹션 작성자", prompts['section'].format(**values))
+            return ensure_heading(text, section['heading']), None
+        except PipelineError as e:
+            if attempt == SECTION_MAX_ATTEMPTS:
+                raise
+            logger.warning(f"'{selected_tool['name']}' 섹션 '{section['heading']}' 작성 실패 "
+                           f"({attempt}/{SECTION_MAX_ATTEMPTS}), 이 섹션만 다시 요청합니다: {e}")
+            print(f"   ↻ '{selected_tool['name']}' 섹션 '{section['heading']}'을(를) 다시 요청합니다.")
+
+async def write_article(model, prompts, selected_tool, generation_config=None):
+    """
+    개요 → 섹션 동시 작성 → 이어 붙이기로 작성자 응답과 같은 형태의 dict
+    ({'title', 'meta_description', 'article_markdown', 'faq_json_ld'})를 반환합니다.
+    generation_config는 개요 요청에만 적용합니다. (후보 글마다 다른 개요를 받기 위해)
+    섹션 하나가 끝내 실패하면 나머지 섹션 요청을 취소하고 PipelineError를 발생시킵니다.
+    """
+    outline = await run_ai_agent_async(model, "개요 작성자", prompts['outline'].format(**selected_tool),
+                                       is_json_output=True, generation_config=generation_config,
+                                       response_schema=OUTLINE_SCHEMA)
+    if not outline['sections']:
+        raise PipelineError("개요에 섹션이 없습니다.")
+    print(f"   📑 '{selected_tool['name']}' 개요 완료: 섹션 {len(outline['sections'])}개를 동시에 작성합니다.")
+    tasks = [asyncio.create_task(write_section(model, prompts, selected_tool, outline, section))
+             for section in outline['sections']]
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # 취소된 요청의 계측 기록이 마무리되도록 모두 끝날 때까지 기다립니다.
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        'title': outline['title'],
+        'meta_description': outline['meta_description'],
+        'article_markdown': '\n\n'.join(markdown for markdown, _ in results),
+        'faq_json_ld': next((json_ld for _, json_ld in results if json_ld), {}),
+    }
@@ -0,0 +1,212 @@
+# similarity.py
+"""
+발행된 글의 중복 검사용 로컬 유사도 인덱스입니다.
+제목과 본문으로 TF-IDF 벡터를 만들어, 최종결정자 프롬프트에는 발행된 글 전체 목록 대신
+가장 비슷한 글 k개만 넣고, 명세가 같은 주제는 모델을 호출하기 전에 미리 걸러냅니다.
+외부 패키지 없이 역색인(inverted index)으로 질의하므로 비교 비용은 겹치는 단어 수에 비례합니다.
+"""
+import math
+import re
+
+# 본문은 앞부분만 색인합니다. (주제 판별에는 도입부와 소제목이면 충분)
+MAX_BODY_CHARS = 6000
+
+# 제목은 본문보다 주제를 더 잘 나타내므로 여러 번 반영합니다.
+TITLE_WEIGHT = 3
+
+# 최종결정자 프롬프트에 넣을 비슷한 글 수
+DECIDER_CONTEXT_K = 10
+
+# 명세가 이 값 이상 비슷하면 경고합니다. (코사인 유사도, 정규화한 명세가 똑같을 때만 반려)
+SPEC_DUPLICATE_THRESHOLD = 0.9
+# 편집본이 이 값 이상 비슷하면 최종결정자 호출 없이 중복으로 반려합니다.
+ARTICLE_DUPLICATE_THRESHOLD = 0.9
+
+# 문서 수가 이 비율 이상 바뀌면 모든 문서의 벡터 크기(norm)를 새 IDF로 다시 계산합니다.
+# 그 사이에 추가된 문서는 추가 시점의 IDF로 계산합니다. (IDF는 문서가 조금 늘어서는 거의 변하지 않음)
+NORM_REFRESH_RATE = 0.1
+
+WORD_PATTERN = re.compile(r'\w+')
+HANGUL_PATTERN = re.compile(r'[가-힣]')
+PATH_PATTERN = re.compile(r'/\S*')
+
+def tokenize(text):
+    """
+    텍스트를 색인용 토큰으로 나눕니다.
+    한글 단어는 조사가 붙어도 비교되도록 글자 2개씩(bigram) 나누고, 그 밖의 단어는 소문자로 씁니다.
+    """
+    tokens = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        if len(word) > 2 and HANGUL_PATTERN.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+def spec_tokenize(text):
+    """
+    기능 명세를 색인용 토큰으로 나눕니다.
+    단어만으로는 순서를 알 수 없어 'CSV to JSON'과 'JSON to CSV'가 같아지므로,
+    이어진 단어 쌍과 경로(endpoint) 전체도 토큰으로 넣어 변환 방향이 다른 명세를 구분합니다.
+    """
+    paths = PATH_PATTERN.findall(text.lower())
+    words = WORD_PATTERN.findall(PATH_PATTERN.sub(' ', text.lower()))
+    tokens = tokenize(text)
+    tokens.extend(f'{first} {second}' for first, second in zip(words, words[1:]))
+    tokens.extend('path:' + path.rstrip('/') for path in paths)
+    return tokens
+
+def term_frequencies(text, tokenizer=tokenize):
+    counts = {}
+    for token in tokenizer(text):
+        counts[token] = counts.get(token, 0) + 1
+    # 긴 글에서 자주 나오는 단어가 지나치게 커지지 않도록 로그 스케일을 사용합니다.
+    return {token: 1 + math.log(count) for token, count in counts.items()}
+
+def article_text(title, meta_description, content_markdown):
+    """글 하나를 색인할 텍스트를 만듭니다."""
+    return ' '.join([(title or '') + ' '] * TITLE_WEIGHT
+                    + [meta_description or '', (content_markdown or '')[:MAX_BODY_CHARS]])
+
+def feature_text(feature):
+    """기능 명세 하나를 색인할 텍스트를 만듭니다."""
+    return ' '.join(str(feature.get(key) or '') for key in ('name', 'description', 'endpoint'))
+
+def normalized_spec(feature):
+    """
+    이름을 뺀 명세(설명과 경로)를 대소문자, 문장 부호, 공백 차이를 무시하고 비교할 수 있게 만듭니다.
+    단어 순서는 그대로 둡니다.
+    """
+    text = ' '.join(str(feature.get(key) or '') for key in ('description', 'endpoint'))
+    return ' '.join(WORD_PATTERN.findall(text.lower()))
+
+class SimilarityIndex:
+    """TF-IDF 코사인 유사도로 가장 비슷한 문서를 찾는 역색인"""
+
+    def __init__(self, tokenizer=tokenize):
+        self.tokenizer = tokenizer
+        self.documents = {}   # key -> (label, {token: tf})
+        self.postings = {}    # token -> {key: tf}
+        self._norms = {}
+        self._norms_size = 0
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, key, text, label=None):
+        """문서를 추가합니다. 같은 key가 있으면 교체합니다."""
+        self.remove(key)
+        frequencies = term_frequencies(text, self.tokenizer)
+        self.documents[key] = (label if label is not None else key, frequencies)
+        for token, frequency in frequencies.items():
+            self.postings.setdefault(token, {})[key] = frequency
+
+    def remove(self, key):
+        document = self.documents.pop(key, None)
+        if document is None:
+            return
+        for token in document[1]:
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self.postings[token]
+        self._norms.pop(key, None)
+
+    def idf(self, token):
+        return math.log((1 + len(self.documents)) / (1 + len(self.postings.get(token, ())))) + 1
+
+    def _norm(self, frequencies):
+        return math.sqrt(sum((frequency * self.idf(token)) ** 2 for token, frequency in frequencies.items())) or 1.0
+
+    def _document_norms(self):
+        """문서별 벡터 크기를 반환합니다. 전체 재계산은 문서 수가 NORM_REFRESH_RATE 이상 바뀌었을 때만 합니다."""
+        size = len(self.documents)
+        if abs(size - self._norms_size) > self._norms_size * NORM_REFRESH_RATE:
+            self._norms = {key: self._norm(frequencies) for key, (_, frequencies) in self.documents.items()}
+            self._norms_size = size
+        elif len(self._norms) != size:
+            for key, (_, frequencies) in self.documents.items():
+                if key not in self._norms:
+                    self._norms[key] = self._norm(frequencies)
+        return self._norms
+
+    def query(self, text, k=DECIDER_CONTEXT_K, exclude=None):
+        """text와 가장 비슷한 문서를 [(key, label, 유사도), ...] 형태로 최대 k개 반환합니다."""
+        if not self.documents:
+            return []
+        norms = self._document_norms()
+        query_weights = {token: frequency * self.idf(token)
+                         for token, frequency in term_frequencies(text, self.tokenizer).items()
+                         if token in self.postings}
+        query_norm = math.sqrt(sum(weight ** 2 for weight in query_weights.values()))
+        if not query_norm:
+            return []
+        scores = {}
+        for token, query_weight in query_weights.items():
+            idf = self.idf(token)
+            for key, frequency in self.postings[token].items():
+                scores[key] = scores.get(key, 0.0) + query_weight * frequency * idf
+        ranked = sorted(
+            ((key, score / (query_norm * norms[key])) for key, score in scores.items() if key != exclude),
+            key=lambda item: item[1], reverse=True
+        )
+        return [(key, self.documents[key][0], score) for key, score in ranked[:k]]
+
+class DuplicateDetector:
+    """
+    한 언어의 발행된 글에 대한 중복 검사기입니다.
+    - specs: 발행된 기능의 명세(이름, 설명, 경로) — 글을 쓰기 전 사전 검사에 사용
+    - articles: 발행된 글의 제목과 본문 — 최종결정자 컨텍스트 선택과 편집본 검사에 사용
+    """
+
+    def __init__(self):
+        self.specs = SimilarityIndex(tokenizer=spec_tokenize)
+        self.spec_signatures = {}   # tool_name -> normalized_spec
+        self.articles = SimilarityIndex()
+
+    def add_spec(self, feature):
+        self.specs.add(feature['name'], feature_text(feature))
+        self.spec_signatures[feature['name']] = normalized_spec(feature)
+
+    @classmethod
+    def from_archive(cls, article_rows, features):
+        """
+        article_rows: [(tool_name, title, meta_description, content_markdown), ...]
+        features: 기능 명세 목록 (발행된 기능의 명세만 색인합니다)
+        """
+        detector = cls()
+        published = set()
+        for tool_name, title, meta_description, content_markdown in article_rows:
+            detector.articles.add(tool_name, article_text(title, meta_description, content_markdown), label=title)
+            published.add(tool_name)
+        for feature in features:
+            if isinstance(feature, dict) and feature.get('name') in published:
+                detector.add_spec(feature)
+        return detector
+
+    def find_duplicate_feature(self, feature, threshold=SPEC_DUPLICATE_THRESHOLD):
+        """
+        명세가 거의 같은 다른 발행된 기능이 있으면 (기능 이름, 유사도, 정규화한 명세가 똑같은지)를,
+        없으면 None을 반환합니다.
+        """
+        matches = self.specs.query(feature_text(feature), k=1, exclude=feature.get('name'))
+        if matches and matches[0][2] >= threshold:
+            name, score = matches[0][0], matches[0][2]
+            return name, score, self.spec_signatures.get(name) == normalized_spec(feature)
+        return None
+
+    def review_article(self, tool_name, title, content, k=DECIDER_CONTEXT_K, threshold=ARTICLE_DUPLICATE_THRESHOLD):
+        """
+        편집본과 비교해 (비슷한 발행된 글 제목 최대 k개, 중복 여부)를 한 번의 질의로 반환합니다.
+        중복 여부는 내용이 거의 같은 다른 글이 있으면 (글 제목, 유사도), 없으면 None입니다.
+        """
+        matches = self.articles.query(article_text(title, '', content), k=max(k, 1), exclude=tool_name)
+        duplicate = (matches[0][1], matches[0][2]) if matches and matches[0][2] >= threshold else None
+        return [label for _, label, _ in matches[:k]], duplicate
+
+    def add_article(self, tool_name, title, meta_description, content, feature=None):
+        """방금 승인된 글을 색인에 추가해, 같은 실행 안의 다음 결정에도 반영되게 합니다."""
+        self.articles.add(tool_name, article_text(title, meta_description, content), label=title)
+        if feature is not None:
+            self.add_spec(feature)
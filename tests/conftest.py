@@ -0,0 +1,13 @@
+# tests/conftest.py
+"""테스트 공통 설정: 저장소 최상위 모듈을 불러오고, 프롬프트 폴더를 찾을 수 있게 작업 폴더를 맞춥니다."""
+import os
+import sys
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    # prompts/ 폴더는 작업 폴더 기준 경로로 불러옵니다.
+    monkeypatch.chdir(ROOT_DIR)
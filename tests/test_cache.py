@@ -0,0 +1,91 @@
+# tests/test_cache.py
+"""응답 캐시가 반려된 주제의 응답을 다음 실행에서 다시 쓰지 않는지 확인합니다."""
+import asyncio
+import json
+import sqlite3
+import threading
+from agents import RateLimitedModel
+from cache import CachedModel, ResponseCache
+from db_handler import db_connect
+from fake_model import FakeModel
+from main import run_pipeline
+from migrations import migrate
+
+def write_features(path):
+    features = [{"name": "Cron Parser", "endpoint": "/cron", "description": "크론 표현식을 해석합니다",
+                 "targetAudience": "개발자"}]
+    path.write_text(json.dumps({"features": features}, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+def sqlite_statuses(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute("SELECT status FROM pipeline_logs ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+def test_rejected_topic_calls_model_again(tmp_path):
+    features_file = write_features(tmp_path / 'features.json')
+    fake = FakeModel(approve_rate=0.0)
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    model = CachedModel(RateLimitedModel(fake, requests_per_minute=None, tokens_per_minute=None), cache)
+    conn = db_connect(str(tmp_path / 'content.db'))
+    migrate(conn)
+    options = {'features_file': features_file}
+    try:
+        run_pipeline(conn, model, 'ko', options)
+        first_calls = dict(fake.calls)
+        run_pipeline(conn, model, 'ko', options)
+    finally:
+        conn.close()
+        cache.close()
+
+    assert first_calls['decider'] == 1
+    # 같은 주제를 다시 고르더라도 캐시된 초안/편집본/판단을 재사용하지 않고 모델을 다시 호출해야 합니다.
+    assert fake.calls['creator'] == 2 * first_calls['creator']
+    assert fake.calls['editor'] == 2 * first_calls['editor']
+    assert fake.calls['decider'] == 2
+    statuses = [row[0] for row in sqlite_statuses(tmp_path / 'content.db')]
+    assert statuses == ['AI_REJECTED', 'AI_REJECTED']
+
+def test_approved_topic_responses_stay_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    fake = FakeModel()
+    model = CachedModel(fake, cache)
+    model.generate_content("같은 요청")
+    model.generate_content("같은 요청")
+    cache.close()
+    assert sum(fake.calls.values()) == 1
+
+class ThreadRecordingCache(ResponseCache):
+    """get/put이 어느 스레드에서 실행됐는지 기록합니다."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def put(self, key, model_name, response_text):
+        self.threads.append(threading.get_ident())
+        super().put(key, model_name, response_text)
+
+def test_async_cache_io_runs_off_event_loop(tmp_path):
+    cache = ThreadRecordingCache(str(tmp_path / 'cache.db'))
+    model = CachedModel(FakeModel(), cache)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        await model.generate_content_async("같은 요청")
+        await model.generate_content_async("같은 요청")
+        async for _ in model.stream_content_async("스트리밍 요청"):
+            pass
+        return loop_thread
+
+    loop_thread = asyncio.run(main())
+    cache.close()
+    # 조회 3번 + 저장 2번이 모두 이벤트 루프 밖에서 실행되어야 합니다.
+    assert len(cache.threads) == 5
+    assert loop_thread not in cache.threads
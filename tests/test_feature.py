@@ -0,0 +1,97 @@
+# tests/test_feature.py
+"""로컬 HTTP 서버로 기능 명세 내려받기의 정상 응답, HTTP 오류, 잘못된 JSON, 시간 초과 처리를 확인합니다."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import feature
+from agents import PipelineError
+
+FEATURES = {"features": [{"name": "Cron Parser", "endpoint": "/cron"}]}
+ETAG = '"v1"'
+SLOW_SECONDS = 1.0
+
+class FeaturesHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/ok.json':
+            if self.headers.get('If-None-Match') == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.reply(200, json.dumps(FEATURES).encode('utf-8'), {'ETag': ETAG})
+        elif self.path == '/error.json':
+            self.reply(500, b'{"error": "server"}')
+        elif self.path == '/bad.json':
+            self.reply(200, b'<html>not json</html>')
+        elif self.path == '/slow.json':
+            time.sleep(SLOW_SECONDS)
+            self.reply(200, json.dumps(FEATURES).encode('utf-8'))
+        else:
+            self.reply(404, b'')
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FeaturesHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture(autouse=True)
+def fresh_session(monkeypatch):
+    # 재시도 없이 짧은 시간 제한을 쓰는 새 세션으로 테스트합니다.
+    monkeypatch.setattr(feature, '_session', None)
+    monkeypatch.setattr(feature, 'MAX_RETRIES', 0)
+    monkeypatch.setattr(feature, 'REQUEST_TIMEOUT', (1, SLOW_SECONDS / 4))
+
+def save_cached_copy(cache_dir, url):
+    feature.write_cached_features('ko', json.dumps(FEATURES), {'url': url, 'fetched_at': '2026-01-01T00:00:00'},
+                                  cache_dir)
+
+def test_ok_response_is_parsed_and_cached(server, tmp_path):
+    url = server + '/ok.json'
+    assert feature.fetch_features_from_url('ko', url, str(tmp_path)) == FEATURES['features']
+    body, meta = feature.read_cached_features('ko', str(tmp_path))
+    assert json.loads(body) == FEATURES
+    assert meta['etag'] == ETAG
+    # 같은 ETag로 다시 요청하면 304를 받고 저장된 사본을 씁니다.
+    assert feature.fetch_features_from_url('ko', url, str(tmp_path)) == FEATURES['features']
+
+def test_http_error_without_cache_is_network_error(server, tmp_path):
+    with pytest.raises(PipelineError, match="네트워크 오류"):
+        feature.fetch_features_from_url('ko', server + '/error.json', str(tmp_path))
+
+def test_http_error_falls_back_to_cached_copy(server, tmp_path):
+    url = server + '/error.json'
+    save_cached_copy(str(tmp_path), url)
+    assert feature.fetch_features_from_url('ko', url, str(tmp_path)) == FEATURES['features']
+
+def test_bad_json_is_parse_error_not_network_fallback(server, tmp_path):
+    url = server + '/bad.json'
+    save_cached_copy(str(tmp_path), url)
+    with pytest.raises(PipelineError, match="JSON 파싱 오류"):
+        feature.fetch_features_from_url('ko', url, str(tmp_path))
+
+def test_timeout_without_cache_is_network_error(server, tmp_path):
+    with pytest.raises(PipelineError, match="네트워크 오류"):
+        feature.fetch_features_from_url('ko', server + '/slow.json', str(tmp_path))
+
+def test_timeout_falls_back_to_cached_copy(server, tmp_path):
+    url = server + '/slow.json'
+    save_cached_copy(str(tmp_path), url)
+    assert feature.fetch_features_from_url('ko', url, str(tmp_path)) == FEATURES['features']
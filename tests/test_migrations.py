@@ -0,0 +1,40 @@
+# tests/test_migrations.py
+"""유니크 인덱스를 만드는 마이그레이션(v3)이 중복 글을 지우기 전에 보관 테이블로 옮기는지 확인합니다."""
+from db_handler import db_connect
+from migrations import MIGRATIONS, LATEST_VERSION, get_schema_version, migrate
+
+def migrate_to(conn, version):
+    """version까지의 마이그레이션만 적용합니다."""
+    cursor = conn.cursor()
+    for number, _, func in MIGRATIONS:
+        if number <= version:
+            func(cursor)
+    conn.commit()
+
+def insert_article(conn, tool_name, title, locale='ko'):
+    conn.execute("""
+        INSERT INTO articles (tool_name, title, content_markdown, locale) VALUES (?, ?, '본문', ?)
+    """, (tool_name, title, locale))
+
+def test_duplicate_articles_are_archived_before_unique_index(tmp_path):
+    conn = db_connect(str(tmp_path / 'content.db'))
+    migrate_to(conn, 2)
+    insert_article(conn, 'Cron Parser', '옛 글')
+    insert_article(conn, 'Cron Parser', '새 글')
+    insert_article(conn, 'Cron Parser', 'English', locale='en')
+    conn.commit()
+
+    migrate(conn)
+
+    assert get_schema_version(conn) == LATEST_VERSION
+    assert conn.execute("SELECT title FROM articles ORDER BY id").fetchall() == [('새 글',), ('English',)]
+    assert conn.execute("SELECT tool_name, title, locale FROM articles_duplicates").fetchall() == [
+        ('Cron Parser', '옛 글', 'ko')]
+    conn.close()
+
+def test_no_archive_table_without_duplicates(tmp_path):
+    conn = db_connect(str(tmp_path / 'content.db'))
+    migrate(conn)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert 'articles_duplicates' not in tables
@@ -0,0 +1,56 @@
+# tests/test_similarity.py
+"""기능 명세 중복 검사가 변환 방향이 다른 기능을 반려하지 않고, 반려된 주제를 다시 고르지 않는지 확인합니다."""
+import json
+from db_handler import db_connect
+from fake_model import FakeModel
+from feature import feature_spec_hash
+from main import run_pipeline, select_new_topics
+from migrations import migrate
+from similarity import DuplicateDetector
+
+CSV_TO_JSON = {"name": "CSV to JSON Converter", "endpoint": "/csv-to-json", "description": "CSV 파일을 JSON으로 변환합니다",
+               "targetAudience": "개발자"}
+JSON_TO_CSV = {"name": "JSON to CSV Converter", "endpoint": "/json-to-csv", "description": "JSON 파일을 CSV로 변환합니다",
+               "targetAudience": "개발자"}
+
+def detector_with(feature):
+    detector = DuplicateDetector()
+    detector.add_spec(feature)
+    return detector
+
+def test_reversed_conversion_is_not_an_exact_duplicate():
+    duplicate = detector_with(CSV_TO_JSON).find_duplicate_feature(JSON_TO_CSV)
+    assert duplicate is None or not duplicate[2]
+
+def test_same_spec_under_another_name_is_exact_duplicate():
+    renamed = dict(CSV_TO_JSON, name="CSV → JSON", description="csv 파일을 json으로 변환합니다.")
+    duplicate = detector_with(CSV_TO_JSON).find_duplicate_feature(renamed)
+    assert duplicate is not None
+    assert duplicate[0] == CSV_TO_JSON['name']
+    assert duplicate[2]
+
+def test_select_new_topics_skips_duplicate_rejected_spec():
+    rejected = {JSON_TO_CSV['name']: {feature_spec_hash(JSON_TO_CSV)}}
+    assert select_new_topics([JSON_TO_CSV], {}, rejected_hashes=rejected) == []
+    # 명세가 바뀌면 다시 고릅니다.
+    changed = dict(JSON_TO_CSV, description="JSON 배열을 CSV 표로 변환합니다")
+    assert select_new_topics([changed], {}, rejected_hashes=rejected) == [changed]
+
+def test_duplicate_rejected_topic_is_not_picked_again(tmp_path):
+    published = dict(CSV_TO_JSON)
+    renamed = dict(CSV_TO_JSON, name="CSV JSON Tool")
+    features_file = tmp_path / 'features.json'
+    features_file.write_text(json.dumps({"features": [published, renamed]}, ensure_ascii=False), encoding='utf-8')
+    options = {'features_file': str(features_file)}
+    conn = db_connect(str(tmp_path / 'content.db'))
+    migrate(conn)
+    try:
+        assert run_pipeline(conn, FakeModel(approve_rate=1.0), 'ko', options) == 'SUCCESS'
+        assert run_pipeline(conn, FakeModel(), 'ko', options) == 'SUCCESS'
+        assert run_pipeline(conn, FakeModel(), 'ko', options) == 'COMPLETE'
+        rows = conn.execute("SELECT tool_name, status, spec_hash FROM pipeline_logs ORDER BY id").fetchall()
+    finally:
+        conn.close()
+    assert [(row[0], row[1]) for row in rows] == [(published['name'], 'AUTO_APPROVED'),
+                                                   (renamed['name'], 'DUPLICATE_REJECTED')]
+    assert rows[1][2] == feature_spec_hash(renamed)
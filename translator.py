@@ -0,0 +1,99 @@
+# translator.py
+"""
+다른 언어로 이미 승인된 글을 번역해 새 언어의 글을 만드는 번역 단계입니다.
+작성자/편집자를 처음부터 다시 실행하는 대신, 본문을 마크다운 섹션 단위로 나눠 동시에 번역하고
+제목, 메타 설명, FAQ는 JSON 요청 한 번으로 번역합니다. 번역한 글은 최종결정자만 다시 확인합니다.
+"""
+import asyncio
+import json
+import re
+from agents import run_ai_agent_async
+from schemas import TRANSLATION_META_SCHEMA
+
+# 번역 요청 하나에 넣을 본문 최대 글자 수 (작은 섹션은 이 크기까지 합쳐 호출 수를 줄입니다)
+TRANSLATION_CHUNK_CHARS = 4000
+
+# 번역 프롬프트의 {source_language}에 넣을 언어 이름
+LANGUAGE_NAMES = {'ko': '한국어(Korean)', 'en': '영어(English)'}
+
+HEADING_PATTERN = re.compile(r'^#{1,6}\s')
+FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+
+def split_markdown_blocks(markdown):
+    """마크다운을 빈 줄 기준의 블록으로 나눕니다. 코드 블록은 빈 줄이 있어도 나누지 않습니다."""
+    blocks = []
+    current = []
+    in_fence = False
+    for line in markdown.splitlines(keepends=True):
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        if not in_fence and not line.strip():
+            if current:
+                blocks.append(''.join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append(''.join(current))
+    return blocks
+
+def split_markdown_sections(markdown, max_chars=TRANSLATION_CHUNK_CHARS):
+    """
+    번역 요청 단위로 마크다운을 나눕니다. 블록을 max_chars까지 이어 붙이되,
+    절반 이상 찼을 때 제목(#)이 나오면 새 조각을 시작해 되도록 섹션 경계에서 나눕니다.
+    블록 하나가 max_chars보다 길면 그 블록만으로 한 조각이 됩니다.
+    """
+    chunks = []
+    for block in split_markdown_blocks(markdown):
+        if chunks:
+            size = len(chunks[-1])
+            at_section = HEADING_PATTERN.match(block) and size >= max_chars // 2
+            if not at_section and size + len(block) + 2 <= max_chars:
+                chunks[-1] += '\n\n' + block.rstrip('\n')
+                continue
+        chunks.append(block.rstrip('\n'))
+    return chunks
+
+def load_faq(structured_data_json):
+    try:
+        faq = json.loads(structured_data_json or '{}')
+    except json.JSONDecodeError:
+        return {}
+    return faq if isinstance(faq, dict) else {}
+
+async def translate_article(model, prompts, selected_tool, source_article, source_locale):
+    """
+    원본 언어로 발행된 글(source_article: articles 행 dict)을 prompts의 언어로 번역합니다.
+    메타데이터와 본문 조각을 모두 동시에 요청하며, 하나라도 실패하면 나머지 요청을 취소하고 오류를 다시 발생시킵니다.
+    (번역된 본문, {'title', 'meta_description', 'faq_json_ld'})를 반환합니다.
+    """
+    template = prompts['translator']
+    values = {
+        'source_language': LANGUAGE_NAMES.get(source_locale, source_locale),
+        'name': selected_tool['name'],
+        'endpoint': selected_tool.get('endpoint', ''),
+    }
+    meta_source = {
+        'title': source_article['title'],
+        'meta_description': source_article['meta_description'] or '',
+        'faq_json_ld': load_faq(source_article['structured_data_json']),
+    }
+    chunks = split_markdown_sections(source_article['content_markdown'] or '')
+    tasks = [asyncio.create_task(run_ai_agent_async(
+        model, "번역가", template.format(content=json.dumps(meta_source, ensure_ascii=False, indent=2), **values),
+        is_json_output=True, response_schema=TRANSLATION_META_SCHEMA))]
+    tasks.extend(asyncio.create_task(run_ai_agent_async(model, "번역가", template.format(content=chunk, **values)))
+                 for chunk in chunks)
+    try:
+        meta, *sections = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # 취소된 요청의 계측 기록이 마무리되도록 모두 끝날 때까지 기다립니다.
+        await asyncio.gather(*tasks, return_exceptions=True)
+    article_meta_data = {
+        'title': meta.get('title') or meta_source['title'],
+        'meta_description': meta.get('meta_description', ''),
+        'faq_json_ld': meta.get('faq_json_ld', {}),
+    }
+    return '\n\n'.join(section.strip() for section in sections), article_meta_data
@@ -0,0 +1,179 @@
+# validation.py
+"""
+최종결정자를 호출하기 전에 컴퓨터에서 먼저 확인하는 규칙 검사입니다.
+최종결정자가 반려하는 이유 중 상당수는 기계적으로 확인할 수 있습니다.
+(명세와 다른 기능 링크, 분량 부족, 브랜드명 과다 언급, 필수 섹션 누락, 잘못된 FAQ 구조화 데이터)
+작성자 초안에서 찾은 문제는 편집자 프롬프트 끝에 붙여 함께 고치게 하고,
+편집 후에도 남은 문제는 편집자에게 한 번 더 고치게 한 뒤 그래도 남으면 최종결정자 호출 없이 반려합니다.
+"""
+import re
+from urllib.parse import urlsplit
+from schemas import FAQ_JSON_LD_SCHEMA, build_faq_json_ld, validate as validate_schema
+from translator import FENCE_PATTERN
+
+SITE_HOST = 'easytool.run'
+SITE_URL = 'https://easytool.run'
+
+# 언어별 최소 단어 수 (작성자/개요 프롬프트의 분량 지침과 같은 값)
+MIN_WORDS = {'ko': 800, 'en': 800}
+
+# 브랜드명 최대 언급 횟수 (지침은 도입과 결론에서 한 번씩이지만, 링크 텍스트까지 세므로 여유를 둡니다)
+MAX_BRAND_MENTIONS = 4
+
+# 최소 '##' 섹션 수 (필수 섹션 7개 중 일부를 한 섹션으로 합쳐 쓰는 경우를 허용)
+MIN_SECTIONS = 5
+
+URL_PATTERN = re.compile(r'https?://[^\s<>()\[\]"\'`]+')
+BRAND_PATTERN = re.compile(r'easy\s?tool(?:\.run)?', re.IGNORECASE)
+HEADING_LINE_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+FAQ_HEADING_PATTERN = re.compile(r'faq|자주\s*묻는\s*질문|frequently\s+asked', re.IGNORECASE)
+
+# 편집자에게 보여주는 문제 설명 (프롬프트 언어에 맞춤)
+MESSAGES = {
+    'ko': {
+        'missing_link': "본문에 기능 링크({url})가 없습니다. 사용 가이드와 결론에 [링크 텍스트]({url}) 형식의 마크다운 링크를 넣어주세요.",
+        'wrong_link': "명세와 다른 EasyTool.run 링크가 있습니다: {links}. 모두 {url}로 고쳐주세요.",
+        'too_short': "본문이 {count}단어로 너무 짧습니다. 최소 {minimum}단어 이상이 되도록 내용을 보강해주세요.",
+        'brand_mentions': "브랜드명 'EasyTool.run'이 {count}번 언급되었습니다. {maximum}번 이하로 줄이고 본문 중간에서는 '이 도구는' 같은 표현을 써주세요.",
+        'missing_sections': "'##' 섹션이 {count}개뿐입니다. 도입, 개념 설명, 핵심 장점, 사용 가이드, 활용 팁, FAQ, 결론 섹션을 모두 '##' 제목으로 갖춰주세요.",
+        'missing_faq': "자주 묻는 질문(FAQ) 섹션이 없습니다. '## 자주 묻는 질문' 아래에 '###' 질문과 답변을 3개 이상 넣어주세요.",
+        'faq_json_ld': "FAQ 구조화 데이터(JSON-LD)가 올바르지 않고 본문 FAQ로 다시 만들 수도 없습니다: {details}",
+    },
+    'en': {
+        'missing_link': "The article has no link to the feature ({url}). Add a markdown link in the form [link text]({url}) to the usage guide and the conclusion.",
+        'wrong_link': "The article links to EasyTool.run pages that do not match the specification: {links}. Change them all to {url}.",
+        'too_short': "The article is only {count} words long. Expand it to at least {minimum} words.",
+        'brand_mentions': "The brand name 'EasyTool.run' is mentioned {count} times. Reduce it to {maximum} or fewer and use expressions like 'this tool' in the main body.",
+        'missing_sections': "The article has only {count} '##' sections. Include the introduction, concept, key benefits, usage guide, advanced tips, FAQ and conclusion sections, each with a '##' heading.",
+        'missing_faq': "The article has no FAQ section. Add '## Frequently Asked Questions' with at least three '###' questions and answers.",
+        'faq_json_ld': "The FAQ structured data (JSON-LD) is invalid and could not be rebuilt from the article's FAQ section: {details}",
+    },
+}
+
+NOTES_HEADER = {
+    'ko': "**[반드시 고쳐야 할 문제]** 자동 검사에서 아래 문제가 발견되었어. 다른 지침을 지키면서 이 문제도 반드시 고쳐 줘.",
+    'en': "**[Problems you must fix]** An automated check found the problems below. Fix them as well while following the other instructions.",
+}
+
+def strip_code_blocks(markdown):
+    """코드 블록(```, ~~~) 안의 줄을 뺀 본문을 반환합니다."""
+    lines = []
+    in_fence = False
+    for line in markdown.splitlines():
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            continue
+        if not in_fence:
+            lines.append(line)
+    return '\n'.join(lines)
+
+def headings(markdown):
+    """코드 블록 밖의 제목을 [(수준, 제목), ...]으로 반환합니다."""
+    result = []
+    for line in strip_code_blocks(markdown).splitlines():
+        match = HEADING_LINE_PATTERN.match(line)
+        if match:
+            result.append((len(match.group(1)), match.group(2)))
+    return result
+
+def site_link_paths(markdown):
+    """본문에 있는 easytool.run 링크의 경로 목록을 반환합니다. (끝의 '/'는 떼고, 첫 페이지는 빈 문자열)"""
+    paths = []
+    for url in URL_PATTERN.findall(strip_code_blocks(markdown)):
+        parts = urlsplit(url.rstrip('.,;:!?'))
+        host = parts.hostname or ''
+        if host == SITE_HOST or host.endswith('.' + SITE_HOST):
+            paths.append(parts.path.rstrip('/'))
+    return paths
+
+def count_words(markdown):
+    """코드 블록과 URL을 뺀 본문에서 글자나 숫자를 포함한 공백 단위 토큰의 수를 셉니다."""
+    text = URL_PATTERN.sub(' ', strip_code_blocks(markdown))
+    return sum(1 for token in text.split() if any(char.isalnum() for char in token))
+
+def count_brand_mentions(markdown):
+    """URL을 뺀 본문에서 브랜드명(EasyTool, EasyTool.run)이 언급된 횟수를 셉니다."""
+    return len(BRAND_PATTERN.findall(URL_PATTERN.sub(' ', markdown)))
+
+def check_article(markdown, selected_tool, locale='ko'):
+    """
+    본문 마크다운을 규칙으로 검사해 문제를 [(규칙 이름, 설명), ...]으로 반환합니다. (문제가 없으면 빈 리스트)
+    설명은 locale 언어로 쓰여 있어 그대로 편집자 프롬프트에 붙일 수 있습니다.
+    """
+    messages = MESSAGES[locale]
+    problems = []
+    endpoint = selected_tool.get('endpoint', '').rstrip('/')
+    url = SITE_URL + endpoint
+    paths = site_link_paths(markdown)
+    wrong = sorted({SITE_URL + path for path in paths if path not in ('', endpoint)})
+    if wrong:
+        problems.append(('wrong_link', messages['wrong_link'].format(links=', '.join(wrong), url=url)))
+    if endpoint not in paths:
+        problems.append(('missing_link', messages['missing_link'].format(url=url)))
+    words = count_words(markdown)
+    if words < MIN_WORDS[locale]:
+        problems.append(('too_short', messages['too_short'].format(count=words, minimum=MIN_WORDS[locale])))
+    mentions = count_brand_mentions(markdown)
+    if mentions > MAX_BRAND_MENTIONS:
+        problems.append(('brand_mentions', messages['brand_mentions'].format(count=mentions, maximum=MAX_BRAND_MENTIONS)))
+    found = headings(markdown)
+    sections = sum(1 for level, _ in found if level == 2)
+    if sections < MIN_SECTIONS:
+        problems.append(('missing_sections', messages['missing_sections'].format(count=sections)))
+    if not any(FAQ_HEADING_PATTERN.search(title) for _, title in found):
+        problems.append(('missing_faq', messages['missing_faq']))
+    return problems
+
+def faq_questions(markdown):
+    """
+    본문의 FAQ 섹션에서 더 낮은 수준의 제목(보통 '###')을 질문, 그 아래 글을 답변으로 보고
+    [{'question', 'answer'}, ...]를 반환합니다. FAQ 섹션이 없으면 빈 리스트를 반환합니다.
+    """
+    questions = []
+    faq_level = None
+    for line in strip_code_blocks(markdown).splitlines():
+        match = HEADING_LINE_PATTERN.match(line)
+        if match:
+            level, title = len(match.group(1)), match.group(2)
+            if faq_level is None:
+                if FAQ_HEADING_PATTERN.search(title):
+                    faq_level = level
+            elif level <= faq_level:
+                break
+            else:
+                questions.append({'question': title.strip('*').strip(), 'answer': ''})
+        elif questions and line.strip():
+            answer = questions[-1]['answer']
+            questions[-1]['answer'] = f"{answer} {line.strip()}" if answer else line.strip()
+    return [item for item in questions if item['question'] and item['answer']]
+
+def faq_json_ld_errors(faq_json_ld):
+    """FAQ 구조화 데이터가 FAQPage 형식이고 질문이 하나 이상 있는지 검사해 위반 항목 리스트를 반환합니다."""
+    errors = validate_schema(faq_json_ld, FAQ_JSON_LD_SCHEMA)
+    if errors:
+        return errors
+    if faq_json_ld.get('@type') != 'FAQPage':
+        errors.append(f"$.@type: 'FAQPage'여야 합니다 (받은 값: {faq_json_ld.get('@type')!r})")
+    if not faq_json_ld.get('mainEntity'):
+        errors.append("$.mainEntity: 질문이 하나 이상 있어야 합니다")
+    return errors
+
+def ensure_faq_json_ld(markdown, article_meta_data, locale='ko'):
+    """
+    article_meta_data의 FAQ 구조화 데이터를 검사합니다. 잘못되었으면 본문 FAQ 섹션으로 다시 만들어
+    그 자리에서 바꾸고, 다시 만들 수 없으면 문제 (규칙 이름, 설명)을 반환합니다. (문제가 없으면 None)
+    """
+    errors = faq_json_ld_errors(article_meta_data.get('faq_json_ld'))
+    if not errors:
+        return None
+    questions = faq_questions(markdown)
+    if questions:
+        article_meta_data['faq_json_ld'] = build_faq_json_ld(questions)
+        return None
+    return ('faq_json_ld', MESSAGES[locale]['faq_json_ld'].format(details='; '.join(errors)))
+
+def format_problem_notes(problems, locale='ko'):
+    """편집자 프롬프트 끝에 붙일 문제 목록을 만듭니다. (문제가 없으면 빈 문자열)"""
+    if not problems:
+        return ''
+    return "\n\n---\n" + NOTES_HEADER[locale] + "\n" + '\n'.join(f"- {message}" for _, message in problems) + "\n"